@@ -0,0 +1,84 @@
+"""Compare full jsonschema validation with the compiled fast path on energy pages.
+
+Run from the repo root:
+
+    python benchmarks/bench_contract_validation.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ingestion.common.contract_validator import (
+    _get_validator,
+    validate_payload,
+    validate_records_batch,
+)
+
+ENERGY_CONTRACT_PATH = PROJECT_ROOT / "data-contracts" / "energy_schema.json"
+RECORD_COUNTS = (1_000, 10_000, 100_000)
+
+
+def _energy_payload(record_count: int) -> dict:
+    records = [
+        {
+            "_id": record_id,
+            "Timestamp": "2025-08-23T22:50:00",
+            "Demand": 2437.38,
+            "Generation": 347.47,
+            "Import": 2090.0,
+            "Solar": 12.65,
+            "Wind": 48.12,
+            "STOR": 103.16,
+            "Other": 183.66,
+        }
+        for record_id in range(1, record_count + 1)
+    ]
+    return {
+        "help": "https://connecteddata.nationalgrid.co.uk/",
+        "success": True,
+        "result": {
+            "resource_id": "92d3431c-15d7-4aa6-ad34-2335596a026c",
+            "records": records,
+            "limit": record_count,
+            "total": record_count,
+        },
+    }
+
+
+def _best_of(repeats: int, func) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    validator = _get_validator(str(ENERGY_CONTRACT_PATH.resolve()))
+    print(f"{'records':>8} {'jsonschema_s':>13} {'fast_payload_s':>15} {'fast_batch_s':>13} {'speedup':>8}")
+    for record_count in RECORD_COUNTS:
+        payload = _energy_payload(record_count)
+        records = payload["result"]["records"]
+        repeats = 3 if record_count < 100_000 else 1
+
+        full_seconds = _best_of(repeats, lambda: sorted(validator.iter_errors(payload), key=str))
+        fast_seconds = _best_of(
+            repeats, lambda: validate_payload(payload, ENERGY_CONTRACT_PATH, "energy")
+        )
+        batch_seconds = _best_of(
+            repeats, lambda: validate_records_batch(records, ENERGY_CONTRACT_PATH, "energy")
+        )
+        print(
+            f"{record_count:>8} {full_seconds:>13.4f} {fast_seconds:>15.4f} "
+            f"{batch_seconds:>13.4f} {full_seconds / fast_seconds:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Time the energy bronze-to-silver transform on a synthetic year of raw files.
+
+One raw file per day with 288 five-minute records, as the incremental fetch
+writes them. Run from the repo root:
+
+    python benchmarks/bench_energy_silver.py [days] [max_workers]
+
+Each worker count is timed on the same files.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from transformations.silver.clean_energy import transform_energy_files
+
+RECORDS_PER_DAY = 288
+
+
+def write_year_of_raw_files(raw_dir: Path, days: int) -> int:
+    start = datetime(2025, 1, 1)
+    record_id = 0
+    for day in range(days):
+        day_start = start + timedelta(days=day)
+        records = []
+        for slot in range(RECORDS_PER_DAY):
+            record_id += 1
+            event_time = day_start + timedelta(minutes=5 * slot)
+            records.append(
+                {
+                    "_id": record_id,
+                    "Timestamp": event_time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "Demand": 2400.0 + slot,
+                    "Generation": 340.5,
+                    "Import": 2090.0,
+                    "Solar": 12.65,
+                    "Wind": 48.12,
+                    "STOR": 103.16,
+                    "Other": 183.66,
+                }
+            )
+        payload = {"result": {"resource_id": "resource-bench", "records": records}}
+        file_name = f"energy_{(day_start + timedelta(days=1)).strftime('%Y%m%d')}_000500.json"
+        (raw_dir / file_name).write_text(json.dumps(payload))
+    return record_id
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    worker_counts = sorted(
+        {1, max_workers, *(count for count in (2, 4, 8, 16) if count < max_workers)}
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir = Path(tmp)
+        record_count = write_year_of_raw_files(raw_dir, days)
+
+        print(
+            f"{'workers':>7} {'files':>6} {'records':>9} {'rows_out':>9} "
+            f"{'seconds':>8} {'records/s':>10}"
+        )
+        for workers in worker_counts:
+            started = time.perf_counter()
+            df = transform_energy_files(raw_dir, workers=workers)
+            seconds = time.perf_counter() - started
+            print(
+                f"{workers:>7} {days:>6} {record_count:>9} {len(df):>9} "
+                f"{seconds:>8.2f} {record_count / seconds:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Compare the range-join and hour-bucketed plans for gold_weather_demand_join in Spark.
+
+Builds synthetic silver_energy (5-minute readings per resource) and
+silver_weather (hourly readings per city) temp views, runs both queries,
+checks that they match every energy row to the same weather timestamp, and
+prints their timings. Needs pyspark; run from the repo root, or in a Fabric
+notebook with the repo files attached:
+
+    python benchmarks/bench_gold_join_spark.py [days] [resources] [cities]
+"""
+
+import runpy
+import sys
+import time
+from pathlib import Path
+
+from pyspark.sql import SparkSession
+from pyspark.sql import functions as F
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+NOTEBOOK_PATH = PROJECT_ROOT / "fabric" / "notebooks" / "03_build_gold_tables.py"
+START_SECONDS = 1735689600  # 2025-01-01T00:00:00Z
+
+# The join as it was before bucketing: every energy row against all weather.
+RANGE_JOIN_SQL = """
+    WITH candidate_pairs AS (
+        SELECT
+            e.resource_id,
+            e.source_record_id,
+            e.event_timestamp_utc,
+            w.city,
+            w.event_timestamp_utc AS weather_event_timestamp_utc,
+            w.temperature_c,
+            ROW_NUMBER() OVER (
+                PARTITION BY e.resource_id, e.source_record_id, e.event_timestamp_utc
+                ORDER BY
+                    ABS(unix_timestamp(e.event_timestamp_utc) - unix_timestamp(w.event_timestamp_utc)),
+                    w.event_timestamp_utc DESC
+            ) AS match_rank
+        FROM silver_energy e
+        LEFT JOIN silver_weather w
+            ON w.event_timestamp_utc BETWEEN e.event_timestamp_utc - INTERVAL 6 HOURS
+                                         AND e.event_timestamp_utc + INTERVAL 1 HOUR
+    )
+    SELECT * FROM candidate_pairs WHERE match_rank = 1
+"""
+
+MATCH_COLUMNS = [
+    "resource_id",
+    "source_record_id",
+    "event_timestamp_utc",
+    "weather_event_timestamp_utc",
+]
+
+
+def create_synthetic_silver(spark, days: int, resources: int, cities: int) -> tuple[int, int]:
+    energy = (
+        spark.range(days * 288 * resources)
+        .select(
+            F.concat(F.lit("resource-"), (F.col("id") % resources).cast("string")).alias(
+                "resource_id"
+            ),
+            F.col("id").alias("source_record_id"),
+            F.expr(f"timestamp_seconds({START_SECONDS} + (id DIV {resources}) * 300)").alias(
+                "event_timestamp_utc"
+            ),
+            (F.rand(1) * 3000).alias("demand_mw"),
+        )
+        .withColumn("event_date_utc", F.to_date("event_timestamp_utc"))
+        .withColumn("ingestion_timestamp_utc", F.current_timestamp())
+    )
+    for column in ("generation_mw", "import_mw", "solar_mw", "wind_mw", "stor_mw", "other_mw"):
+        energy = energy.withColumn(column, F.rand(2) * 500)
+
+    # Weather arrives a few minutes past each hour, with some readings missing.
+    weather = (
+        spark.range(days * 24 * cities)
+        .where(F.rand(3) > 0.05)
+        .select(
+            F.concat(F.lit("city-"), (F.col("id") % cities).cast("string")).alias("city"),
+            F.lit("GB").alias("country_code"),
+            F.expr(
+                f"timestamp_seconds({START_SECONDS} + (id DIV {cities}) * 3600 + (id % 7) * 60)"
+            ).alias("event_timestamp_utc"),
+            (F.rand(4) * 20).alias("temperature_c"),
+        )
+        .withColumn("ingestion_timestamp_utc", F.current_timestamp())
+    )
+    for column in (
+        "feels_like_c",
+        "humidity_pct",
+        "pressure_hpa",
+        "cloud_cover_pct",
+        "wind_speed_mps",
+    ):
+        weather = weather.withColumn(column, F.rand(5) * 100)
+    weather = weather.withColumn("weather_main", F.lit("Clouds")).withColumn(
+        "weather_description", F.lit("overcast clouds")
+    )
+
+    energy.cache().createOrReplaceTempView("silver_energy")
+    weather.cache().createOrReplaceTempView("silver_weather")
+    return energy.count(), weather.count()
+
+
+def time_query(spark, sql: str):
+    started = time.perf_counter()
+    result = spark.sql(sql).select(*MATCH_COLUMNS).cache()
+    rows = result.count()
+    return result, rows, time.perf_counter() - started
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    resources = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    cities = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    spark = SparkSession.builder.appName("bench_gold_join").getOrCreate()
+    spark.conf.set("spark.sql.session.timeZone", "UTC")
+    notebook = runpy.run_path(str(NOTEBOOK_PATH), run_name="bench_gold_join")
+    bucketed_sql = notebook["weather_demand_join_sql"]()
+    energy_rows, weather_rows = create_synthetic_silver(spark, days, resources, cities)
+    print(f"energy rows: {energy_rows}, weather rows: {weather_rows}")
+
+    range_result, range_rows, range_seconds = time_query(spark, RANGE_JOIN_SQL)
+    bucket_result, bucket_rows, bucket_seconds = time_query(spark, bucketed_sql)
+
+    # Cities can report at the same instant, so compare the matched reading time,
+    # not which of the tied cities the window ranking happened to keep.
+    mismatches = range_result.exceptAll(bucket_result).count()
+    mismatches += bucket_result.exceptAll(range_result).count()
+
+    print(f"{'plan':>10} {'rows':>9} {'seconds':>8}")
+    print(f"{'range':>10} {range_rows:>9} {range_seconds:>8.2f}")
+    print(f"{'bucketed':>10} {bucket_rows:>9} {bucket_seconds:>8.2f}")
+    print(f"speedup: {range_seconds / bucket_seconds:.1f}x, mismatched rows: {mismatches}")
+    if mismatches:
+        raise SystemExit("Bucketed join does not match the range join.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Compare in-memory and Parquet bytes per row for the silver schema modes.
+
+Uses the same synthetic raw files as bench_energy_silver.py. Run from the
+repo root:
+
+    python benchmarks/bench_silver_memory.py [days]
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.bench_energy_silver import write_year_of_raw_files
+from transformations.silver.clean_energy import (
+    ENERGY_CATEGORICAL_COLUMNS,
+    ENERGY_FLOAT_COLUMNS,
+    transform_energy_files,
+)
+from transformations.silver.dtypes import compact_frame
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir = Path(tmp) / "raw"
+        raw_dir.mkdir()
+        write_year_of_raw_files(raw_dir, days)
+        df = transform_energy_files(raw_dir)
+
+        modes = {
+            "default": df,
+            "compact": compact_frame(df, ENERGY_CATEGORICAL_COLUMNS, ENERGY_FLOAT_COLUMNS),
+            "compact+float32": compact_frame(
+                df, ENERGY_CATEGORICAL_COLUMNS, ENERGY_FLOAT_COLUMNS, float32=True
+            ),
+        }
+        print(f"{'mode':>16} {'rows':>8} {'mem B/row':>10} {'parquet B/row':>14}")
+        for mode, frame in modes.items():
+            memory_bytes = frame.memory_usage(deep=True).sum()
+            parquet_path = Path(tmp) / f"{mode}.parquet"
+            frame.to_parquet(parquet_path, index=False)
+            rows = len(frame)
+            print(
+                f"{mode:>16} {rows:>8} {memory_bytes / rows:>10.1f} "
+                f"{parquet_path.stat().st_size / rows:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,18 @@
 # Attach the Lakehouse `weather_energy_lakehouse` before running.
 # Pipeline parameters may override the defaults below.
 
+import asyncio
+import gzip
+import hashlib
 import json
 import os
+import re
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from functools import lru_cache
 from datetime import datetime, timezone
 from pathlib import Path
@@ -12,19 +22,48 @@ from typing import Any
 
 import requests
 from jsonschema import Draft202012Validator
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 DATASET = "all"  # all, weather, or energy
 WEATHER_CITY = "London,GB"
+WEATHER_CITIES = ""  # semicolon-separated, e.g. "London,GB;Leeds,GB"; overrides WEATHER_CITY
+WEATHER_REQUESTS_PER_MINUTE = 60
+WEATHER_MAX_CONCURRENCY = 8
 OPENWEATHER_API_KEY = ""
 NATIONAL_GRID_API_TOKEN = ""
 NATIONAL_GRID_RESOURCE_ID = ""
 ENERGY_LIMIT = 1000
+ENERGY_BACKFILL = False
+ENERGY_MAX_WORKERS = 4
+ENERGY_BACKFILL_MAX_PAGES = 0  # pages per backfill, counting the first; 0 reads all
+ENERGY_INCREMENTAL = False
+ENERGY_WATERMARK_KEY = "_id"  # _id or Timestamp
+ENERGY_INCREMENTAL_MAX_PAGES = 10
 LAKEHOUSE_FILES_ROOT = "/lakehouse/default/Files"
+BRONZE_FORMAT = "json"  # json, ndjson.gz, or ndjson.zst
 CONTRACTS_ROOT = ""
+VALIDATION_MODE = "payload"  # payload or record (quarantine invalid energy records)
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_POOL_MAXSIZE = 8
+METRICS_ENABLED = True
 
 OPENWEATHER_BASE_URL = "https://api.openweathermap.org/data/2.5"
 NATIONAL_GRID_BASE_URL = "https://connecteddata.nationalgrid.co.uk/api/3/action"
+HTTP_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+HTTP_RETRY_AFTER_MAX_SECONDS = 120
+BRONZE_INDEX_MAX_ENTRIES = 500
+BRONZE_FORMATS = ("json", "ndjson.gz", "ndjson.zst")
+VALIDATION_MODES = ("payload", "record")
+METRICS_TABLE = "ingest_run_metrics"
+METRICS_SCHEMA = (
+    "run_id STRING, dataset STRING, stage STRING, started_at_utc TIMESTAMP, "
+    "duration_ms DOUBLE, status STRING, error STRING, status_code INT, "
+    "response_bytes BIGINT, retries INT, bytes_written BIGINT, detail STRING"
+)
+METRICS_COLUMNS = tuple(column.split()[0] for column in METRICS_SCHEMA.split(", "))
 CONTRACT_FILENAMES = {
     "weather": "weather_schema.json",
     "energy": "energy_schema.json",
@@ -35,6 +74,13 @@ def _get_parameter(name: str, default: Any) -> Any:
     return globals().get(name, default)
 
 
+def _flag_parameter(name: str, default: bool) -> bool:
+    value = _get_parameter(name, default)
+    if isinstance(value, str):
+        return value.strip().lower() in {"1", "true", "yes"}
+    return bool(value)
+
+
 def _required_secret(value: str, env_name: str) -> str:
     explicit_value = value or os.getenv(env_name, "")
     if explicit_value:
@@ -95,6 +141,71 @@ def _resolve_contract_path(dataset_name: str) -> Path:
     )
 
 
+_metrics_lock = threading.Lock()
+_metrics_events: list[dict[str, Any]] = []
+
+
+@contextmanager
+def _timed(stage: str, dataset_name: str, **fields: Any):
+    """Record the duration of a stage plus any fields the caller adds to the event."""
+    event = {
+        "stage": stage,
+        "dataset": dataset_name,
+        "started_at_utc": datetime.now(timezone.utc),
+        **fields,
+    }
+    start = time.perf_counter()
+    try:
+        yield event
+    except BaseException as exc:
+        event["status"] = "error"
+        event["error"] = type(exc).__name__
+        raise
+    else:
+        event["status"] = "ok"
+    finally:
+        event["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        with _metrics_lock:
+            _metrics_events.append(event)
+
+
+def _write_run_metrics(run_id: str, events: list[dict[str, Any]]) -> str | None:
+    """Append run events as JSON lines under Files/metrics and to the Delta table."""
+    if not _flag_parameter("METRICS_ENABLED", METRICS_ENABLED) or not events:
+        return None
+    rows = []
+    for event in events:
+        row = {column: event.get(column) for column in METRICS_COLUMNS}
+        row["run_id"] = run_id
+        extra = {key: value for key, value in event.items() if key not in METRICS_COLUMNS}
+        row["detail"] = json.dumps(extra, default=str, sort_keys=True) if extra else None
+        rows.append(row)
+
+    started_at = rows[0]["started_at_utc"]
+    output_dir = (
+        Path(LAKEHOUSE_FILES_ROOT)
+        / "metrics"
+        / METRICS_TABLE
+        / f"ingestion_date={started_at.strftime('%Y-%m-%d')}"
+    )
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / f"run_{started_at.strftime('%Y%m%d_%H%M%S')}_{run_id}.jsonl"
+    with output_path.open("w") as f:
+        for row in rows:
+            f.write(json.dumps(row, default=str) + "\n")
+
+    spark_session = globals().get("spark")
+    if spark_session is not None:
+        (
+            spark_session.createDataFrame(rows, schema=METRICS_SCHEMA)
+            .write
+            .format("delta")
+            .mode("append")
+            .saveAsTable(METRICS_TABLE)
+        )
+    return str(output_path)
+
+
 @lru_cache(maxsize=8)
 def _get_validator(contract_path: str) -> Draft202012Validator:
     with Path(contract_path).open("r") as f:
@@ -105,6 +216,11 @@ def _get_validator(contract_path: str) -> Draft202012Validator:
 
 
 def _validate_payload(payload: dict[str, Any], dataset_name: str) -> None:
+    with _timed("validate", dataset_name, mode="payload"):
+        _check_payload(payload, dataset_name)
+
+
+def _check_payload(payload: dict[str, Any], dataset_name: str) -> None:
     contract_path = _resolve_contract_path(dataset_name)
     validator = _get_validator(str(contract_path.resolve()))
     errors = sorted(validator.iter_errors(payload), key=lambda err: list(err.absolute_path))
@@ -129,8 +245,194 @@ def _validate_payload(payload: dict[str, Any], dataset_name: str) -> None:
     raise ValueError("\n".join(lines))
 
 
-def _write_raw_json(dataset_name: str, payload: dict[str, Any]) -> str:
-    now_utc = datetime.now(timezone.utc)
+def _validation_mode() -> str:
+    mode = str(_get_parameter("VALIDATION_MODE", VALIDATION_MODE)).lower()
+    if mode not in VALIDATION_MODES:
+        raise ValueError(f"VALIDATION_MODE must be one of: {', '.join(VALIDATION_MODES)}")
+    return mode
+
+
+@lru_cache(maxsize=8)
+def _get_record_validator(contract_path: str) -> Draft202012Validator:
+    item_schema = _get_validator(contract_path).schema
+    for key in ("properties", "result", "properties", "records", "items"):
+        item_schema = item_schema[key]
+    return Draft202012Validator(item_schema)
+
+
+def _split_energy_records(payload: dict[str, Any]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Keep contract-valid energy records and return the rest with their errors."""
+    with _timed("validate", "energy", mode="record") as event:
+        clean_payload, quarantined = _split_records(payload)
+        event["quarantined_records"] = len(quarantined)
+    return clean_payload, quarantined
+
+
+def _split_records(payload: dict[str, Any]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    contract_path = _resolve_contract_path("energy")
+    validator = _get_record_validator(str(contract_path.resolve()))
+    valid_records = []
+    quarantined = []
+    for index, record in enumerate(payload["result"]["records"]):
+        errors = sorted(validator.iter_errors(record), key=lambda err: list(err.absolute_path))
+        if not errors:
+            valid_records.append(record)
+            continue
+        quarantined.append(
+            {
+                "index": index,
+                "record": record,
+                "errors": [
+                    (".".join(str(item) for item in err.absolute_path) or "<record>")
+                    + f": {err.message}"
+                    for err in errors
+                ],
+            }
+        )
+
+    clean_payload = dict(payload)
+    clean_payload["result"] = {**payload["result"], "records": valid_records}
+    return clean_payload, quarantined
+
+
+@lru_cache(maxsize=1)
+def _get_session() -> requests.Session:
+    max_retries = int(_get_parameter("HTTP_MAX_RETRIES", HTTP_MAX_RETRIES))
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        allowed_methods=frozenset({"GET"}),
+        status_forcelist=HTTP_RETRY_STATUS_CODES,
+        backoff_factor=float(_get_parameter("HTTP_BACKOFF_FACTOR", HTTP_BACKOFF_FACTOR)),
+        backoff_max=30,
+        backoff_jitter=0.5,
+        respect_retry_after_header=True,
+        retry_after_max=HTTP_RETRY_AFTER_MAX_SECONDS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=int(_get_parameter("HTTP_POOL_MAXSIZE", HTTP_POOL_MAXSIZE)),
+        pool_block=True,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+def _get_json(
+    url: str,
+    params: dict[str, Any],
+    headers: dict[str, str] | None = None,
+    dataset_name: str = "",
+) -> dict[str, Any]:
+    with _timed("fetch", dataset_name, url=url, offset=params.get("offset")) as event:
+        response = _get_session().get(url, params=params, headers=headers, timeout=30)
+        retries = response.raw.retries
+        event["status_code"] = response.status_code
+        event["response_bytes"] = len(response.content)
+        event["retries"] = len(retries.history) if retries else 0
+        response.raise_for_status()
+        return response.json()
+
+
+def _payload_digest(payload: Any) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _bronze_index_dir() -> Path:
+    return Path(LAKEHOUSE_FILES_ROOT) / "state" / "bronze_index"
+
+
+def _find_stored_payload(dataset_name: str, digest: str) -> str | None:
+    index_path = _bronze_index_dir() / f"{dataset_name}.json"
+    if not index_path.exists():
+        return None
+    with index_path.open("r") as f:
+        entries = json.load(f)
+    for entry in reversed(entries):
+        if entry["sha256"] == digest and Path(entry["path"]).exists():
+            return entry["path"]
+    return None
+
+
+def _record_bronze_write(dataset_name: str, digest: str, path: str, is_new: bool) -> None:
+    index_dir = _bronze_index_dir()
+    index_dir.mkdir(parents=True, exist_ok=True)
+    entry = {"sha256": digest, "path": path, "at_utc": datetime.now(timezone.utc).isoformat()}
+    if not is_new:
+        with (index_dir / f"{dataset_name}_pointers.jsonl").open("a") as f:
+            f.write(json.dumps(entry) + "\n")
+        return
+
+    index_path = index_dir / f"{dataset_name}.json"
+    entries = []
+    if index_path.exists():
+        with index_path.open("r") as f:
+            entries = json.load(f)
+    entries.append(entry)
+    tmp_path = index_path.with_name(f".{index_path.name}.tmp")
+    with tmp_path.open("w") as f:
+        json.dump(entries[-BRONZE_INDEX_MAX_ENTRIES:], f, indent=2)
+    os.replace(tmp_path, index_path)
+
+
+def _open_raw_file(path: Path):
+    if path.name.endswith(".ndjson.gz"):
+        return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    if path.name.endswith(".ndjson.zst"):
+        import zstandard
+
+        return zstandard.open(path, "wt", encoding="utf-8")
+    return path.open("w")
+
+
+def _ndjson_lines(dataset_name: str, payload: dict[str, Any]) -> list[dict[str, Any]]:
+    # Energy is one line per record, carrying the datastore resource as _resource_id.
+    if dataset_name != "energy":
+        return [payload]
+    resource_id = payload["result"]["resource_id"]
+    return [{"_resource_id": resource_id, **record} for record in payload["result"]["records"]]
+
+
+def _write_raw_json(
+    dataset_name: str,
+    payload: dict[str, Any],
+    now_utc: datetime | None = None,
+    part: int | str | None = None,
+) -> str:
+    """Write a raw capture, or point at the stored copy when the payload is unchanged."""
+    bronze_format = str(_get_parameter("BRONZE_FORMAT", BRONZE_FORMAT))
+    if bronze_format not in BRONZE_FORMATS:
+        raise ValueError(f"BRONZE_FORMAT must be one of: {', '.join(BRONZE_FORMATS)}")
+
+    with _timed("bronze_write", dataset_name, bronze_format=bronze_format, part=part) as event:
+        output_path, is_new = _store_raw_payload(
+            dataset_name, payload, bronze_format, now_utc, part
+        )
+        event["written"] = is_new
+        event["bytes_written"] = Path(output_path).stat().st_size if is_new else 0
+    return output_path
+
+
+def _store_raw_payload(
+    dataset_name: str,
+    payload: dict[str, Any],
+    bronze_format: str,
+    now_utc: datetime | None,
+    part: int | str | None,
+) -> tuple[str, bool]:
+    digest = _payload_digest(payload)
+    stored_path = _find_stored_payload(dataset_name, digest)
+    if stored_path is not None:
+        _record_bronze_write(dataset_name, digest, stored_path, is_new=False)
+        return stored_path, False
+
+    now_utc = now_utc or datetime.now(timezone.utc)
     timestamp = now_utc.strftime("%Y%m%d_%H%M%S")
     ingestion_date = now_utc.strftime("%Y-%m-%d")
     output_dir = (
@@ -140,30 +442,139 @@ def _write_raw_json(dataset_name: str, payload: dict[str, Any]) -> str:
         / f"ingestion_date={ingestion_date}"
     )
     output_dir.mkdir(parents=True, exist_ok=True)
-    output_path = output_dir / f"{dataset_name}_{timestamp}.json"
+    if part is None:
+        suffix = ""
+    elif isinstance(part, int):
+        suffix = f"_{part:05d}"
+    else:
+        suffix = f"_{part}"
+    output_path = output_dir / f"{dataset_name}_{timestamp}{suffix}.{bronze_format}"
+    with _open_raw_file(output_path) as f:
+        if bronze_format == "json":
+            json.dump(payload, f, indent=2)
+        else:
+            for line in _ndjson_lines(dataset_name, payload):
+                f.write(json.dumps(line, separators=(",", ":")) + "\n")
+    _record_bronze_write(dataset_name, digest, str(output_path), is_new=True)
+    return str(output_path), True
+
+
+def _write_quarantine(
+    dataset_name: str,
+    entries: list[dict[str, Any]],
+    now_utc: datetime,
+    part: int | str | None = None,
+) -> str:
+    ingestion_date = now_utc.strftime("%Y-%m-%d")
+    output_dir = (
+        Path(LAKEHOUSE_FILES_ROOT)
+        / "quarantine"
+        / dataset_name
+        / f"ingestion_date={ingestion_date}"
+    )
+    output_dir.mkdir(parents=True, exist_ok=True)
+    suffix = "" if part is None else f"_{part:05d}" if isinstance(part, int) else f"_{part}"
+    output_path = output_dir / f"{dataset_name}_{now_utc.strftime('%Y%m%d_%H%M%S')}{suffix}.json"
     with output_path.open("w") as f:
-        json.dump(payload, f, indent=2)
+        json.dump(
+            {
+                "dataset": dataset_name,
+                "contract": CONTRACT_FILENAMES[dataset_name],
+                "quarantined_at_utc": now_utc.isoformat(),
+                "record_count": len(entries),
+                "records": entries,
+            },
+            f,
+            indent=2,
+        )
     return str(output_path)
 
 
-def fetch_weather() -> dict[str, Any]:
+def _gate_energy_page(
+    payload: dict[str, Any],
+    now_utc: datetime,
+    part: int | None = None,
+) -> tuple[dict[str, Any], int]:
+    """In record mode, quarantine invalid records and return the clean page and count."""
+    if _validation_mode() != "record":
+        return payload, 0
+    clean_payload, quarantined = _split_energy_records(payload)
+    if quarantined:
+        quarantine_path = _write_quarantine("energy", quarantined, now_utc, part)
+        print(f"Quarantined {len(quarantined)} energy record(s) to {quarantine_path}")
+    return clean_payload, len(quarantined)
+
+
+def _weather_cities() -> list[str]:
+    configured = str(_get_parameter("WEATHER_CITIES", WEATHER_CITIES))
+    cities = [city.strip() for city in configured.split(";") if city.strip()]
+    return cities or [str(_get_parameter("WEATHER_CITY", WEATHER_CITY))]
+
+
+def _city_slug(city: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", city.lower()).strip("-")
+
+
+def _run_async(coroutine: Any) -> Any:
+    # Fabric notebooks already run an event loop, so asyncio.run needs its own thread there.
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def fetch_weather(city: str | None = None) -> dict[str, Any]:
     api_key = _required_secret(
         _get_parameter("OPENWEATHER_API_KEY", OPENWEATHER_API_KEY),
         "OPENWEATHER_API_KEY",
     )
-    city = _get_parameter("WEATHER_CITY", WEATHER_CITY)
-    response = requests.get(
+    city = city or _get_parameter("WEATHER_CITY", WEATHER_CITY)
+    payload = _get_json(
         f"{OPENWEATHER_BASE_URL}/weather",
         params={"q": city, "appid": api_key, "units": "metric"},
-        timeout=30,
+        dataset_name="weather",
     )
-    response.raise_for_status()
-    payload = response.json()
     _validate_payload(payload, "weather")
     return payload
 
 
-def fetch_energy() -> dict[str, Any]:
+async def _fetch_weather_cities_async(cities: list[str]) -> list[dict[str, Any] | Exception]:
+    requests_per_minute = float(
+        _get_parameter("WEATHER_REQUESTS_PER_MINUTE", WEATHER_REQUESTS_PER_MINUTE)
+    )
+    if requests_per_minute <= 0:
+        raise ValueError("WEATHER_REQUESTS_PER_MINUTE must be greater than 0.")
+    interval_seconds = 60.0 / requests_per_minute
+    semaphore = asyncio.Semaphore(
+        int(_get_parameter("WEATHER_MAX_CONCURRENCY", WEATHER_MAX_CONCURRENCY))
+    )
+    start_lock = asyncio.Lock()
+    next_start = {"at": 0.0}
+
+    async def fetch_city(city: str) -> dict[str, Any]:
+        async with semaphore:
+            async with start_lock:
+                loop = asyncio.get_running_loop()
+                wait_seconds = next_start["at"] - loop.time()
+                if wait_seconds > 0:
+                    await asyncio.sleep(wait_seconds)
+                next_start["at"] = max(loop.time(), next_start["at"]) + interval_seconds
+            return await asyncio.to_thread(fetch_weather, city)
+
+    return await asyncio.gather(*(fetch_city(city) for city in cities), return_exceptions=True)
+
+
+def fetch_weather_cities(cities: list[str]) -> list[dict[str, Any] | Exception]:
+    """Fetch all cities concurrently while spacing requests to the per-minute budget.
+
+    A city that fails its request or contract holds the exception in its slot.
+    """
+    return _run_async(_fetch_weather_cities_async(cities))
+
+
+def fetch_energy(offset: int = 0, extra_params: dict[str, Any] | None = None) -> dict[str, Any]:
     api_token = _required_secret(
         _get_parameter("NATIONAL_GRID_API_TOKEN", NATIONAL_GRID_API_TOKEN),
         "NATIONAL_GRID_API_TOKEN",
@@ -172,30 +583,252 @@ def fetch_energy() -> dict[str, Any]:
     if not resource_id:
         raise ValueError("Missing NATIONAL_GRID_RESOURCE_ID pipeline parameter.")
 
-    response = requests.get(
+    params = {
+        "resource_id": resource_id,
+        "limit": int(_get_parameter("ENERGY_LIMIT", ENERGY_LIMIT)),
+    }
+    params.update(extra_params or {})
+    if offset:
+        params["offset"] = offset
+
+    payload = _get_json(
         f"{NATIONAL_GRID_BASE_URL}/datastore_search",
-        params={"resource_id": resource_id, "limit": int(_get_parameter("ENERGY_LIMIT", ENERGY_LIMIT))},
+        params=params,
         headers={"Authorization": api_token},
-        timeout=30,
+        dataset_name="energy",
     )
-    response.raise_for_status()
-    payload = response.json()
-    _validate_payload(payload, "energy")
+    if _validation_mode() == "record":
+        # Records are checked one by one before the write; only the envelope gates here.
+        envelope = {**payload, "result": {**payload.get("result", {}), "records": []}}
+        _validate_payload(envelope, "energy")
+    else:
+        _validate_payload(payload, "energy")
+    return payload
+
+
+def iter_energy_pages() -> Iterator[tuple[int, dict[str, Any]]]:
+    """Yield (part, page) as pages arrive, at most 2 * ENERGY_MAX_WORKERS ahead.
+
+    A page that fails stops new requests; pages already in flight are yielded
+    before its error is raised, so the caller can keep what it has written.
+    """
+    first_page = fetch_energy()
+    page_size = int(first_page["result"]["limit"])
+    total = int(first_page["result"]["total"])
+    yield 0, first_page
+
+    offsets = range(page_size, total, page_size)
+    max_pages = int(_get_parameter("ENERGY_BACKFILL_MAX_PAGES", ENERGY_BACKFILL_MAX_PAGES))
+    if max_pages > 0:
+        offsets = offsets[: max_pages - 1]
+    pending = enumerate(offsets, start=1)
+
+    max_workers = max(int(_get_parameter("ENERGY_MAX_WORKERS", ENERGY_MAX_WORKERS)), 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+
+        def submit_next() -> None:
+            next_page = next(pending, None)
+            if next_page is not None:
+                part, offset = next_page
+                in_flight[executor.submit(fetch_energy, offset)] = part
+
+        for _ in range(2 * max_workers):
+            submit_next()
+        failed = None
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=in_flight.get):
+                part = in_flight.pop(future)
+                if future.exception() is not None:
+                    failed = failed or future
+                    continue
+                if failed is None:
+                    submit_next()
+                yield part, future.result()
+        if failed is not None:
+            failed.result()
+
+
+def _watermark_state_path() -> Path:
+    return Path(LAKEHOUSE_FILES_ROOT) / "state" / "energy_watermarks.json"
+
+
+def _load_watermarks() -> dict[str, dict[str, Any]]:
+    state_path = _watermark_state_path()
+    if not state_path.exists():
+        return {}
+    with state_path.open("r") as f:
+        return json.load(f)
+
+
+def _is_after_watermark(record: dict[str, Any], watermark: dict[str, Any] | None, key: str) -> bool:
+    if watermark is None:
+        return True
+    if key == "_id":
+        return record["_id"] > watermark["last_id"]
+    mark = watermark.get("last_timestamp")
+    return mark is None or str(record.get("Timestamp", "")) > mark
+
+
+def _newest_records(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Keep only the records _save_watermark reads the mark from."""
+    if not records:
+        return []
+    newest = [max(records, key=lambda record: record["_id"])]
+    timestamped = [record for record in records if record.get("Timestamp")]
+    if timestamped:
+        newest.append(max(timestamped, key=lambda record: record["Timestamp"]))
+    return newest
+
+
+def _save_watermark(resource_id: str, records: list[dict[str, Any]]) -> None:
+    if not records:
+        return
+    watermarks = _load_watermarks()
+    previous = watermarks.get(resource_id, {})
+    timestamps = [record["Timestamp"] for record in records if record.get("Timestamp")]
+    watermarks[resource_id] = {
+        "last_id": max([record["_id"] for record in records] + [previous.get("last_id", 0)]),
+        "last_timestamp": max(timestamps + [previous.get("last_timestamp") or ""]) or None,
+        "updated_at_utc": datetime.now(timezone.utc).isoformat(),
+    }
+    state_path = _watermark_state_path()
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state_path.with_name(f".{state_path.name}.tmp")
+    with tmp_path.open("w") as f:
+        json.dump(watermarks, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+
+def fetch_energy_incremental(resource_id: str) -> dict[str, Any]:
+    """Read pages newest-first until the stored high-water mark is reached."""
+    key = str(_get_parameter("ENERGY_WATERMARK_KEY", ENERGY_WATERMARK_KEY))
+    if key not in {"_id", "Timestamp"}:
+        raise ValueError("ENERGY_WATERMARK_KEY must be one of: _id, Timestamp")
+    max_pages = int(_get_parameter("ENERGY_INCREMENTAL_MAX_PAGES", ENERGY_INCREMENTAL_MAX_PAGES))
+    page_size = int(_get_parameter("ENERGY_LIMIT", ENERGY_LIMIT))
+    watermark = _load_watermarks().get(resource_id)
+
+    first_page = None
+    new_records = []
+    for page_number in range(max_pages):
+        page = fetch_energy(page_number * page_size, extra_params={"sort": f"{key} desc"})
+        first_page = first_page or page
+        records = page["result"]["records"]
+        fresh_records = [
+            record for record in records if _is_after_watermark(record, watermark, key)
+        ]
+        new_records.extend(fresh_records)
+        if watermark is None or len(fresh_records) < len(records) or len(records) < page_size:
+            break
+
+    payload = dict(first_page)
+    payload["result"] = dict(first_page["result"])
+    payload["result"]["records"] = sorted(new_records, key=lambda record: record["_id"])
     return payload
 
 
+def _ingest_weather() -> list[str]:
+    cities = _weather_cities()
+    if len(cities) == 1:
+        return [_write_raw_json("weather", fetch_weather(cities[0]))]
+
+    now_utc = datetime.now(timezone.utc)
+    written_paths: list[str] = []
+    failures: dict[str, Exception] = {}
+    for city, result in zip(cities, fetch_weather_cities(cities)):
+        if isinstance(result, Exception):
+            failures[city] = result
+            continue
+        written_paths.append(
+            _write_raw_json("weather", result, now_utc=now_utc, part=_city_slug(city))
+        )
+    if failures:
+        # Every city that validated is already in bronze; fail the activity once for the rest.
+        details = "; ".join(f"{city}: {exc}" for city, exc in failures.items())
+        raise RuntimeError(
+            f"Weather failed for {len(failures)} of {len(cities)} cities: {details}"
+        ) from next(iter(failures.values()))
+    return written_paths
+
+
+def _ingest_energy() -> tuple[list[str], int]:
+    incremental = _flag_parameter("ENERGY_INCREMENTAL", ENERGY_INCREMENTAL)
+    resource_id = str(_get_parameter("NATIONAL_GRID_RESOURCE_ID", NATIONAL_GRID_RESOURCE_ID))
+    now_utc = datetime.now(timezone.utc)
+    written_paths: list[str] = []
+    quarantined_records = 0
+    if _flag_parameter("ENERGY_BACKFILL", ENERGY_BACKFILL):
+        # Each page is gated and written as it arrives; a failed page leaves the
+        # earlier ones in bronze, and the mark only moves once every page landed.
+        watermark_records: list[dict[str, Any]] = []
+        for part, page in iter_energy_pages():
+            clean_page, quarantined = _gate_energy_page(page, now_utc, part)
+            quarantined_records += quarantined
+            written_paths.append(_write_raw_json("energy", clean_page, now_utc=now_utc, part=part))
+            watermark_records = _newest_records(
+                [*watermark_records, *page["result"]["records"]]
+            )
+        if incremental:
+            _save_watermark(resource_id, watermark_records)
+    elif incremental:
+        payload = fetch_energy_incremental(resource_id)
+        if payload["result"]["records"]:
+            clean_payload, quarantined_records = _gate_energy_page(payload, now_utc)
+            if clean_payload["result"]["records"]:
+                written_paths.append(_write_raw_json("energy", clean_payload, now_utc=now_utc))
+            # Quarantined records are kept with their errors, so the mark moves past them too.
+            _save_watermark(resource_id, payload["result"]["records"])
+        else:
+            print(f"No new energy records for {resource_id} beyond the stored watermark.")
+    else:
+        clean_payload, quarantined_records = _gate_energy_page(fetch_energy(), now_utc)
+        written_paths.append(_write_raw_json("energy", clean_payload, now_utc=now_utc))
+    return written_paths, quarantined_records
+
+
 def main() -> list[str]:
     dataset = str(_get_parameter("DATASET", DATASET)).lower()
     if dataset not in {"all", "weather", "energy"}:
         raise ValueError("DATASET must be one of: all, weather, energy")
 
+    # The two APIs are independent, so both sources are fetched side by side.
+    # Results are collected weather-first so written_paths keeps a stable order.
     written_paths: list[str] = []
-    if dataset in {"all", "weather"}:
-        written_paths.append(_write_raw_json("weather", fetch_weather()))
-    if dataset in {"all", "energy"}:
-        written_paths.append(_write_raw_json("energy", fetch_energy()))
-
-    print(json.dumps({"written_paths": written_paths}, indent=2))
+    quarantined_records = 0
+    run_id = uuid.uuid4().hex
+    with _metrics_lock:
+        _metrics_events.clear()
+    try:
+        with _timed("run", dataset):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                weather_future = (
+                    executor.submit(_ingest_weather) if dataset in {"all", "weather"} else None
+                )
+                energy_future = (
+                    executor.submit(_ingest_energy) if dataset in {"all", "energy"} else None
+                )
+                if weather_future is not None:
+                    written_paths.extend(weather_future.result())
+                if energy_future is not None:
+                    energy_paths, quarantined_records = energy_future.result()
+                    written_paths.extend(energy_paths)
+    finally:
+        # Failed runs keep their metrics too; that is when latency and retries matter most.
+        metrics_path = _write_run_metrics(run_id, list(_metrics_events))
+
+    print(
+        json.dumps(
+            {
+                "run_id": run_id,
+                "written_paths": written_paths,
+                "quarantined_records": quarantined_records,
+                "metrics_path": metrics_path,
+            },
+            indent=2,
+        )
+    )
     return written_paths
 
 
@@ -1,19 +1,77 @@
 # Fabric notebook source: 02_bronze_to_silver
 #
-# Reads immutable raw API captures from OneLake Files and rebuilds canonical
-# silver Delta tables in the attached Lakehouse.
+# Reads immutable raw API captures from OneLake Files into the canonical silver
+# Delta tables in the attached Lakehouse. By default only bronze files missing
+# from the bronze_file_log table are read, and their rows are merged into silver
+# on the dedup keys; SILVER_MODE="full" rebuilds silver from every raw file.
 
-from pyspark.sql import Window
+import json
+from datetime import datetime, timezone
+from functools import reduce
+from pathlib import Path
+from typing import Any
+
+from pyspark.sql import DataFrame, Window
 from pyspark.sql import functions as F
+from pyspark.sql.types import StructType
 
 
 spark.conf.set("spark.sql.session.timeZone", "UTC")
 
+SILVER_MODE = "incremental"
+SILVER_MODES = ("full", "incremental")
+
 WEATHER_RAW_PATH = "Files/raw/weather/ingestion_date=*/*.json"
 ENERGY_RAW_PATH = "Files/raw/energy/ingestion_date=*/*.json"
+# Compressed NDJSON captures (BRONZE_FORMAT=ndjson.gz / ndjson.zst in notebook 01).
+WEATHER_NDJSON_PATH = "Files/raw/weather/ingestion_date=*/*.ndjson.*"
+ENERGY_NDJSON_PATH = "Files/raw/energy/ingestion_date=*/*.ndjson.*"
 SILVER_WEATHER_TABLE = "silver_weather"
 SILVER_ENERGY_TABLE = "silver_energy"
 
+# Read schemas generated from data-contracts by ingestion/common/spark_schema.py.
+# Passing them to every read skips schema inference and keeps column types the
+# same whichever files a run happens to pick up.
+LAKEHOUSE_FILES_ROOT = "/lakehouse/default/Files"
+SPARK_SCHEMAS_ROOT = ""
+SPARK_SCHEMA_FILES = {
+    # dataset: (indented JSON schema, NDJSON schema)
+    "weather": ("weather_schema.json", "weather_schema.json"),
+    "energy": ("energy_schema.json", "energy_ndjson_schema.json"),
+}
+
+# Stamped on every row a run inserts or updates; 03_build_gold_tables picks up
+# silver changes by it rather than by the API fetch time, so late-landing bronze
+# files still reach gold.
+SILVER_WRITTEN_AT_COLUMN = "silver_written_at_utc"
+
+# Rows sharing these keys are one record; the latest ingestion wins.
+WEATHER_DEDUP_KEYS = ["city", "event_timestamp_utc"]
+ENERGY_DEDUP_KEYS = ["resource_id", "source_record_id", "event_timestamp_utc"]
+
+# One row per bronze file merged into silver. A file is read again only when
+# its modification time changes (e.g. it was rewritten).
+BRONZE_FILE_LOG_TABLE = "bronze_file_log"
+BRONZE_FILE_LOG_SCHEMA = (
+    "dataset STRING, "
+    "file_path STRING, "
+    "file_size BIGINT, "
+    "modification_time_ms BIGINT, "
+    "processed_at_utc TIMESTAMP"
+)
+
+
+def _get_parameter(name: str, default: Any) -> Any:
+    return globals().get(name, default)
+
+
+def _silver_mode(value: str | None = None) -> str:
+    mode = str(value if value is not None else _get_parameter("SILVER_MODE", "incremental"))
+    mode = mode.strip().lower()
+    if mode not in SILVER_MODES:
+        raise ValueError(f"SILVER_MODE must be one of {', '.join(SILVER_MODES)}.")
+    return mode
+
 
 def _filename_col() -> F.Column:
     return F.regexp_extract(F.input_file_name(), r"([^/]+)$", 1)
@@ -21,112 +79,305 @@ def _filename_col() -> F.Column:
 
 def _file_timestamp_col(prefix: str) -> F.Column:
     filename = _filename_col()
-    timestamp_text = F.regexp_extract(filename, rf"{prefix}_(\d{{8}}_\d{{6}})\.json$", 1)
+    timestamp_text = F.regexp_extract(filename, rf"{prefix}_(\d{{8}}_\d{{6}})(?:_[^.]+)?\.", 1)
     return F.to_timestamp(timestamp_text, "yyyyMMdd_HHmmss")
 
 
-weather_raw = spark.read.option("multiLine", "true").json(WEATHER_RAW_PATH)
-
-weather_event_ts = F.to_timestamp(F.from_unixtime(F.col("dt").cast("long")))
-weather_df = (
-    weather_raw
-    .withColumn("source_file", _filename_col())
-    .withColumn("event_timestamp_utc", weather_event_ts)
-    .withColumn("ingestion_timestamp_utc", _file_timestamp_col("weather"))
-    .select(
-        F.lit("weather").alias("source_dataset"),
-        F.col("source_file"),
-        F.col("id").cast("string").alias("source_record_id"),
-        F.col("event_timestamp_utc"),
-        F.col("ingestion_timestamp_utc"),
-        F.to_date("event_timestamp_utc").alias("event_date_utc"),
-        F.col("name").alias("city"),
-        F.col("sys.country").alias("country_code"),
-        F.col("coord.lat").cast("double").alias("latitude"),
-        F.col("coord.lon").cast("double").alias("longitude"),
-        F.col("main.temp").cast("double").alias("temperature_c"),
-        F.col("main.feels_like").cast("double").alias("feels_like_c"),
-        F.col("main.humidity").cast("double").alias("humidity_pct"),
-        F.col("main.pressure").cast("double").alias("pressure_hpa"),
-        F.col("clouds.all").cast("double").alias("cloud_cover_pct"),
-        F.col("wind.speed").cast("double").alias("wind_speed_mps"),
-        F.col("weather")[0]["main"].alias("weather_main"),
-        F.col("weather")[0]["description"].alias("weather_description"),
+def _list_files(path_glob: str) -> list[dict[str, Any]]:
+    hadoop_path = spark._jvm.org.apache.hadoop.fs.Path(path_glob)
+    file_system = hadoop_path.getFileSystem(spark._jsc.hadoopConfiguration())
+    statuses = file_system.globStatus(hadoop_path) or []
+    return [
+        {
+            "file_path": status.getPath().toString(),
+            "file_size": status.getLen(),
+            "modification_time_ms": status.getModificationTime(),
+        }
+        for status in statuses
+        if status.isFile()
+    ]
+
+
+def _processed_files(dataset: str) -> set[tuple[str, int]]:
+    if not spark.catalog.tableExists(BRONZE_FILE_LOG_TABLE):
+        return set()
+    rows = (
+        spark.table(BRONZE_FILE_LOG_TABLE)
+        .where(F.col("dataset") == dataset)
+        .select("file_path", "modification_time_ms")
+        .collect()
     )
-)
+    return {(row["file_path"], row["modification_time_ms"]) for row in rows}
 
-weather_window = Window.partitionBy("city", "event_timestamp_utc").orderBy(
-    F.col("ingestion_timestamp_utc").desc_nulls_last()
-)
-weather_df = (
-    weather_df
-    .withColumn("_rn", F.row_number().over(weather_window))
-    .where(F.col("_rn") == 1)
-    .drop("_rn")
-)
 
-(
-    weather_df.write
-    .format("delta")
-    .mode("overwrite")
-    .option("overwriteSchema", "true")
-    .partitionBy("event_date_utc")
-    .saveAsTable(SILVER_WEATHER_TABLE)
-)
+def _pending_files(files: list[dict[str, Any]], processed: set[tuple[str, int]]) -> list[dict]:
+    return [
+        file_info
+        for file_info in files
+        if (file_info["file_path"], file_info["modification_time_ms"]) not in processed
+    ]
 
 
-energy_raw = spark.read.option("multiLine", "true").json(ENERGY_RAW_PATH)
-
-energy_df = (
-    energy_raw
-    .withColumn("source_file", _filename_col())
-    .withColumn("ingestion_timestamp_utc", _file_timestamp_col("energy"))
-    .withColumn("record", F.explode_outer("result.records"))
-    .withColumn("event_timestamp_utc", F.to_timestamp(F.col("record.Timestamp")))
-    .select(
-        F.lit("energy").alias("source_dataset"),
-        F.col("source_file"),
-        F.col("result.resource_id").alias("resource_id"),
-        F.col("record._id").cast("string").alias("source_record_id"),
-        F.col("event_timestamp_utc"),
-        F.col("ingestion_timestamp_utc"),
-        F.to_date("event_timestamp_utc").alias("event_date_utc"),
-        F.col("record.Demand").cast("double").alias("demand_mw"),
-        F.col("record.Generation").cast("double").alias("generation_mw"),
-        F.col("record.Import").cast("double").alias("import_mw"),
-        F.col("record.Solar").cast("double").alias("solar_mw"),
-        F.col("record.Wind").cast("double").alias("wind_mw"),
-        F.col("record.STOR").cast("double").alias("stor_mw"),
-        F.col("record.Other").cast("double").alias("other_mw"),
+def _log_files(dataset: str, files: list[dict[str, Any]], mode: str):
+    """Record merged files; a full rebuild replaces the dataset's log entries."""
+    spark.sql(
+        f"CREATE TABLE IF NOT EXISTS {BRONZE_FILE_LOG_TABLE} "
+        f"({BRONZE_FILE_LOG_SCHEMA}) USING DELTA"
     )
-)
+    processed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    log_rows = [
+        {**file_info, "dataset": dataset, "processed_at_utc": processed_at} for file_info in files
+    ]
+    log_df = spark.createDataFrame(log_rows, BRONZE_FILE_LOG_SCHEMA)
+    writer = log_df.write.format("delta")
+    if mode == "full":
+        writer = writer.mode("overwrite").option("replaceWhere", f"dataset = '{dataset}'")
+    else:
+        writer = writer.mode("append")
+    writer.saveAsTable(BRONZE_FILE_LOG_TABLE)
 
-energy_window = Window.partitionBy(
-    "resource_id",
-    "source_record_id",
-    "event_timestamp_utc",
-).orderBy(F.col("ingestion_timestamp_utc").desc_nulls_last())
-
-energy_df = (
-    energy_df
-    .where(F.col("event_timestamp_utc").isNotNull())
-    .withColumn("_rn", F.row_number().over(energy_window))
-    .where(F.col("_rn") == 1)
-    .drop("_rn")
-)
 
-(
-    energy_df.write
-    .format("delta")
-    .mode("overwrite")
-    .option("overwriteSchema", "true")
-    .partitionBy("event_date_utc")
-    .saveAsTable(SILVER_ENERGY_TABLE)
-)
+def _spark_schemas_root() -> Path:
+    configured_root = str(_get_parameter("SPARK_SCHEMAS_ROOT", SPARK_SCHEMAS_ROOT)).strip()
+    if configured_root:
+        return Path(configured_root)
+    files_root = Path(str(_get_parameter("LAKEHOUSE_FILES_ROOT", LAKEHOUSE_FILES_ROOT)))
+    return files_root / "data-contracts" / "spark"
 
-print(
-    {
-        "silver_weather_rows": weather_df.count(),
-        "silver_energy_rows": energy_df.count(),
-    }
-)
+
+def _load_schema(file_name: str) -> StructType | None:
+    schema_path = _spark_schemas_root() / file_name
+    if not schema_path.exists():
+        print(
+            f"Missing Spark read schema {schema_path}; inferring the schema instead. "
+            "Upload data-contracts/spark or set SPARK_SCHEMAS_ROOT."
+        )
+        return None
+    with schema_path.open("r") as f:
+        return StructType.fromJson(json.load(f))
+
+
+def _json_reader(schema_file: str):
+    schema = _load_schema(schema_file)
+    return spark.read if schema is None else spark.read.schema(schema)
+
+
+def _read_raw(
+    json_files: list[dict[str, Any]],
+    ndjson_files: list[dict[str, Any]],
+    prefix: str,
+) -> list[DataFrame]:
+    """Read indented JSON and compressed NDJSON captures; Spark decompresses by extension."""
+    json_schema_file, ndjson_schema_file = SPARK_SCHEMA_FILES[prefix]
+    frames = []
+    if json_files:
+        json_paths = [file_info["file_path"] for file_info in json_files]
+        frames.append(_json_reader(json_schema_file).option("multiLine", "true").json(json_paths))
+    if ndjson_files:
+        ndjson_paths = [file_info["file_path"] for file_info in ndjson_files]
+        frames.append(_json_reader(ndjson_schema_file).json(ndjson_paths))
+    return [
+        frame
+        .withColumn("source_file", _filename_col())
+        .withColumn("ingestion_timestamp_utc", _file_timestamp_col(prefix))
+        for frame in frames
+    ]
+
+
+def _union(frames: list[DataFrame]) -> DataFrame:
+    return reduce(lambda left, right: left.unionByName(right, allowMissingColumns=True), frames)
+
+
+def _latest_per_key(df: DataFrame, dedup_keys: list[str]) -> DataFrame:
+    window = Window.partitionBy(*dedup_keys).orderBy(
+        F.col("ingestion_timestamp_utc").desc_nulls_last()
+    )
+    return df.withColumn("_rn", F.row_number().over(window)).where(F.col("_rn") == 1).drop("_rn")
+
+
+def build_weather_silver(frames: list[DataFrame]) -> DataFrame:
+    # Weather NDJSON lines hold the same document as the indented JSON captures.
+    weather_raw = _union(frames)
+    weather_event_ts = F.to_timestamp(F.from_unixtime(F.col("dt").cast("long")))
+    weather_df = (
+        weather_raw
+        .withColumn("event_timestamp_utc", weather_event_ts)
+        .select(
+            F.lit("weather").alias("source_dataset"),
+            F.col("source_file"),
+            F.col("id").cast("string").alias("source_record_id"),
+            F.col("event_timestamp_utc"),
+            F.col("ingestion_timestamp_utc"),
+            F.to_date("event_timestamp_utc").alias("event_date_utc"),
+            F.col("name").alias("city"),
+            F.col("sys.country").alias("country_code"),
+            F.col("coord.lat").cast("double").alias("latitude"),
+            F.col("coord.lon").cast("double").alias("longitude"),
+            F.col("main.temp").cast("double").alias("temperature_c"),
+            F.col("main.feels_like").cast("double").alias("feels_like_c"),
+            F.col("main.humidity").cast("double").alias("humidity_pct"),
+            F.col("main.pressure").cast("double").alias("pressure_hpa"),
+            F.col("clouds.all").cast("double").alias("cloud_cover_pct"),
+            F.col("wind.speed").cast("double").alias("wind_speed_mps"),
+            F.col("weather")[0]["main"].alias("weather_main"),
+            F.col("weather")[0]["description"].alias("weather_description"),
+        )
+        .where(F.col("event_timestamp_utc").isNotNull())
+    )
+    return _latest_per_key(weather_df, WEATHER_DEDUP_KEYS)
+
+
+def build_energy_silver(frames: list[DataFrame]) -> DataFrame:
+    # Flatten both layouts to one row per datastore record: indented JSON nests records
+    # under result.records, NDJSON already has one record per line plus _resource_id.
+    energy_record_frames = []
+    for energy_frame in frames:
+        if "result" in energy_frame.columns:
+            energy_frame = (
+                energy_frame
+                .withColumn("resource_id", F.col("result.resource_id"))
+                .withColumn("record", F.explode_outer("result.records"))
+                .select("source_file", "ingestion_timestamp_utc", "resource_id", "record.*")
+            )
+        else:
+            energy_frame = energy_frame.withColumnRenamed("_resource_id", "resource_id")
+        energy_record_frames.append(energy_frame)
+
+    energy_raw = _union(energy_record_frames)
+    energy_df = (
+        energy_raw
+        .withColumn("event_timestamp_utc", F.to_timestamp(F.col("Timestamp")))
+        .select(
+            F.lit("energy").alias("source_dataset"),
+            F.col("source_file"),
+            F.col("resource_id"),
+            F.col("_id").cast("string").alias("source_record_id"),
+            F.col("event_timestamp_utc"),
+            F.col("ingestion_timestamp_utc"),
+            F.to_date("event_timestamp_utc").alias("event_date_utc"),
+            F.col("Demand").cast("double").alias("demand_mw"),
+            F.col("Generation").cast("double").alias("generation_mw"),
+            F.col("Import").cast("double").alias("import_mw"),
+            F.col("Solar").cast("double").alias("solar_mw"),
+            F.col("Wind").cast("double").alias("wind_mw"),
+            F.col("STOR").cast("double").alias("stor_mw"),
+            F.col("Other").cast("double").alias("other_mw"),
+        )
+        .where(F.col("event_timestamp_utc").isNotNull())
+    )
+    return _latest_per_key(energy_df, ENERGY_DEDUP_KEYS)
+
+
+def merge_sql(table_name: str, source_view: str, dedup_keys: list[str], event_dates) -> str:
+    """MERGE new rows into silver; a stored row is only replaced by a later ingestion.
+
+    The literal event_date_utc list lets Delta skip partitions the batch does
+    not touch.
+    """
+    date_list = ", ".join(f"DATE'{event_date.isoformat()}'" for event_date in sorted(event_dates))
+    key_match = " AND ".join(f"t.{key} = s.{key}" for key in dedup_keys)
+    return f"""
+        MERGE INTO {table_name} t
+        USING {source_view} s
+        ON t.event_date_utc IN ({date_list})
+           AND t.event_date_utc = s.event_date_utc
+           AND {key_match}
+        WHEN MATCHED AND s.ingestion_timestamp_utc >= t.ingestion_timestamp_utc
+            THEN UPDATE SET *
+        WHEN NOT MATCHED
+            THEN INSERT *
+    """
+
+
+def _write_silver(df: DataFrame, table_name: str, dedup_keys: list[str], mode: str):
+    df = df.withColumn(SILVER_WRITTEN_AT_COLUMN, F.current_timestamp())
+    if mode == "full" or not spark.catalog.tableExists(table_name):
+        (
+            df.write
+            .format("delta")
+            .mode("overwrite")
+            .option("overwriteSchema", "true")
+            .partitionBy("event_date_utc")
+            .saveAsTable(table_name)
+        )
+        return
+
+    df = df.cache()
+    try:
+        event_dates = [
+            row["event_date_utc"] for row in df.select("event_date_utc").distinct().collect()
+        ]
+        if not event_dates:
+            return
+        if SILVER_WRITTEN_AT_COLUMN not in spark.table(table_name).columns:
+            # Tables written before the column existed; their rows stay NULL.
+            spark.sql(
+                f"ALTER TABLE {table_name} ADD COLUMNS ({SILVER_WRITTEN_AT_COLUMN} TIMESTAMP)"
+            )
+        source_view = f"{table_name}_increment"
+        df.createOrReplaceTempView(source_view)
+        spark.sql(merge_sql(table_name, source_view, dedup_keys, event_dates))
+    finally:
+        df.unpersist()
+
+
+def refresh_dataset(
+    dataset: str,
+    json_glob: str,
+    ndjson_glob: str,
+    table_name: str,
+    dedup_keys: list[str],
+    build,
+    mode: str,
+) -> int:
+    """Load new (or, in full mode, all) bronze files for one dataset into silver."""
+    json_files = _list_files(json_glob)
+    ndjson_files = _list_files(ndjson_glob)
+    if mode == "incremental":
+        processed = _processed_files(dataset)
+        json_files = _pending_files(json_files, processed)
+        ndjson_files = _pending_files(ndjson_files, processed)
+
+    file_count = len(json_files) + len(ndjson_files)
+    if file_count == 0:
+        print({"dataset": dataset, "mode": mode, "new_files": 0})
+        return 0
+
+    silver_df = build(_read_raw(json_files, ndjson_files, dataset))
+    _write_silver(silver_df, table_name, dedup_keys, mode)
+    _log_files(dataset, json_files + ndjson_files, mode)
+    print({"dataset": dataset, "mode": mode, "new_files": file_count})
+    return file_count
+
+
+def main():
+    mode = _silver_mode()
+    refresh_dataset(
+        "weather",
+        WEATHER_RAW_PATH,
+        WEATHER_NDJSON_PATH,
+        SILVER_WEATHER_TABLE,
+        WEATHER_DEDUP_KEYS,
+        build_weather_silver,
+        mode,
+    )
+    refresh_dataset(
+        "energy",
+        ENERGY_RAW_PATH,
+        ENERGY_NDJSON_PATH,
+        SILVER_ENERGY_TABLE,
+        ENERGY_DEDUP_KEYS,
+        build_energy_silver,
+        mode,
+    )
+    print(
+        {
+            f"{table_name}_rows": spark.table(table_name).count()
+            for table_name in (SILVER_WEATHER_TABLE, SILVER_ENERGY_TABLE)
+            if spark.catalog.tableExists(table_name)
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
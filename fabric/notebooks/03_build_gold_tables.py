@@ -1,17 +1,90 @@
 # Fabric notebook source: 03_build_gold_tables
 #
-# Rebuilds gold Delta tables from the canonical silver tables.
+# Builds gold Delta tables from the canonical silver tables. By default only the
+# event_date_utc partitions touched by silver rows written since the last run
+# are recomputed; GOLD_REFRESH_MODE="full" rebuilds everything.
 
+from datetime import date, timedelta
+from typing import Any
 
-spark.conf.set("spark.sql.session.timeZone", "UTC")
 
+GOLD_REFRESH_MODE = "incremental"
+REFRESH_MODES = ("append", "full", "incremental")
 
-spark.sql(
-    """
-    CREATE OR REPLACE TABLE gold_weather_demand_join
-    USING DELTA
-    AS
-    WITH candidate_pairs AS (
+SILVER_ENERGY_TABLE = "silver_energy"
+SILVER_WEATHER_TABLE = "silver_weather"
+GOLD_WEATHER_DEMAND_JOIN_TABLE = "gold_weather_demand_join"
+GOLD_FEATURE_ENGINEERING_TABLE = "gold_feature_engineering"
+GOLD_DEMAND_AGGREGATION_TABLE = "gold_demand_aggregation"
+GOLD_TABLES = [
+    GOLD_WEATHER_DEMAND_JOIN_TABLE,
+    GOLD_FEATURE_ENGINEERING_TABLE,
+    GOLD_DEMAND_AGGREGATION_TABLE,
+]
+# Set by 02_bronze_to_silver on every row it inserts or updates. Unlike
+# ingestion_timestamp_utc, the API fetch time, it orders rows by when they
+# reached silver, so a late-landing bronze file is still picked up.
+SILVER_WRITTEN_AT_COLUMN = "silver_written_at_utc"
+# Latest silver_written_at_utc the last refresh covered: one row per silver table.
+GOLD_REFRESH_STATE_TABLE = "gold_refresh_state"
+GOLD_REFRESH_STATE_COLUMNS = "source_table, watermark_silver_written_at_utc, refreshed_at_utc"
+PARTITION_COLUMN = "event_date_utc"
+# Last FEATURE_WINDOW_ROWS feature rows per (resource_id, city), so append runs can
+# featurise new join rows without re-running the windows over history.
+GOLD_FEATURE_STATE_TABLE = "gold_feature_state"
+FEATURE_WINDOW_ROWS = 12
+# Join rows that get features: the base filter of FEATURE_ENGINEERING_SQL, also used
+# to count the rows the feature windows see.
+FEATURE_ROW_PREDICATE = (
+    "demand_mw IS NOT NULL "
+    "AND city IS NOT NULL "
+    "AND COALESCE(temperature_c, feels_like_c) IS NOT NULL "
+    "AND humidity_pct IS NOT NULL"
+)
+# Mirrors transformations/gold/demand_sketch.py.
+DEMAND_SKETCH_RELATIVE_ACCURACY = 0.01
+DEMAND_SKETCH_GAMMA = (1 + DEMAND_SKETCH_RELATIVE_ACCURACY) / (1 - DEMAND_SKETCH_RELATIVE_ACCURACY)
+DEMAND_SKETCH_KEY_OFFSET = 1000
+
+
+def _get_parameter(name: str, default: Any) -> Any:
+    return globals().get(name, default)
+
+
+def _refresh_mode(value: str | None = None) -> str:
+    mode = str(value if value is not None else _get_parameter("GOLD_REFRESH_MODE", "incremental"))
+    mode = mode.strip().lower()
+    if mode not in REFRESH_MODES:
+        raise ValueError(f"GOLD_REFRESH_MODE must be one of {', '.join(REFRESH_MODES)}.")
+    return mode
+
+
+# Weather readings from 6h before to 1h after each energy row can match. Rather
+# than range-joining every energy row against all weather, each energy row is
+# expanded into the 8 hour buckets its window spans (FLOOR(unix_ts / 3600) - 6
+# to + 1) and equi-joined to weather on its own hour bucket. Every reading falls
+# in exactly one bucket, so the exact BETWEEN keeps the same candidate pairs as
+# the range join, and the ranking picks the same nearest reading. NULLS LAST
+# keeps empty buckets from outranking a real match.
+WEATHER_DEMAND_JOIN_SQL = """
+    WITH energy_buckets AS (
+        SELECT
+            e.*,
+            explode(
+                sequence(
+                    FLOOR(unix_timestamp(e.event_timestamp_utc) / 3600) - 6,
+                    FLOOR(unix_timestamp(e.event_timestamp_utc) / 3600) + 1
+                )
+            ) AS weather_bucket
+        FROM {energy_source} e
+    ),
+    weather_buckets AS (
+        SELECT
+            w.*,
+            FLOOR(unix_timestamp(w.event_timestamp_utc) / 3600) AS weather_bucket
+        FROM {weather_source} w
+    ),
+    candidate_pairs AS (
         SELECT
             e.resource_id,
             e.source_record_id,
@@ -42,12 +115,14 @@ spark.sql(
             ROW_NUMBER() OVER (
                 PARTITION BY e.resource_id, e.source_record_id, e.event_timestamp_utc
                 ORDER BY
-                    ABS(unix_timestamp(e.event_timestamp_utc) - unix_timestamp(w.event_timestamp_utc)),
+                    ABS(unix_timestamp(e.event_timestamp_utc) - unix_timestamp(w.event_timestamp_utc))
+                        ASC NULLS LAST,
                     w.event_timestamp_utc DESC
             ) AS match_rank
-        FROM silver_energy e
-        LEFT JOIN silver_weather w
-            ON w.event_timestamp_utc BETWEEN e.event_timestamp_utc - INTERVAL 6 HOURS
+        FROM energy_buckets e
+        LEFT JOIN weather_buckets w
+            ON w.weather_bucket = e.weather_bucket
+           AND w.event_timestamp_utc BETWEEN e.event_timestamp_utc - INTERVAL 6 HOURS
                                          AND e.event_timestamp_utc + INTERVAL 1 HOUR
     )
     SELECT
@@ -79,15 +154,10 @@ spark.sql(
         weather_ingestion_timestamp_utc
     FROM candidate_pairs
     WHERE match_rank = 1
-    """
-)
+"""
 
 
-spark.sql(
-    """
-    CREATE OR REPLACE TABLE gold_feature_engineering
-    USING DELTA
-    AS
+FEATURE_ENGINEERING_SQL = """
     WITH base AS (
         SELECT
             event_timestamp_utc,
@@ -109,12 +179,10 @@ spark.sql(
             wind_speed_mps,
             weather_main,
             weather_description,
-            weather_age_minutes
-        FROM gold_weather_demand_join
-        WHERE demand_mw IS NOT NULL
-          AND city IS NOT NULL
-          AND COALESCE(temperature_c, feels_like_c) IS NOT NULL
-          AND humidity_pct IS NOT NULL
+            weather_age_minutes,
+            FALSE AS is_state_context
+        FROM {join_source}
+        WHERE {feature_row_predicate}{state_context}
     ),
     features AS (
         SELECT
@@ -138,6 +206,7 @@ spark.sql(
             weather_main,
             weather_description,
             weather_age_minutes,
+            is_state_context,
             HOUR(event_timestamp_utc) AS hour_of_day_utc,
             DAYOFWEEK(event_timestamp_utc) AS day_of_week_utc,
             CASE
@@ -197,24 +266,146 @@ spark.sql(
         demand_rolling_mean_12,
         temperature_rolling_mean_12
     FROM features
-    """
-)
+    WHERE NOT is_state_context
+"""
 
+# Appended to the feature base in append runs: each key's stored recent rows lead
+# its window, so LAG and the rolling means continue from them. They are dropped
+# again after the windows.
+FEATURE_STATE_CONTEXT_SQL = """
+        UNION ALL
+        SELECT
+            recent.event_timestamp_utc,
+            NULL AS event_date_utc,
+            state.city,
+            NULL AS country_code,
+            state.resource_id,
+            recent.demand_mw,
+            NULL AS generation_mw,
+            NULL AS import_mw,
+            NULL AS solar_mw,
+            NULL AS wind_mw,
+            NULL AS stor_mw,
+            NULL AS other_mw,
+            recent.temperature,
+            NULL AS humidity,
+            NULL AS pressure_hpa,
+            NULL AS cloud_cover_pct,
+            NULL AS wind_speed_mps,
+            NULL AS weather_main,
+            NULL AS weather_description,
+            NULL AS weather_age_minutes,
+            TRUE AS is_state_context
+        FROM {state_source} state
+        LATERAL VIEW explode(state.recent_rows) recent_rows_view AS recent"""
 
-spark.sql(
-    """
-    CREATE OR REPLACE TABLE gold_demand_aggregation
-    USING DELTA
-    AS
+# The last FEATURE_WINDOW_ROWS rows per key, oldest first, with their running sums.
+FEATURE_STATE_SQL = """
+    WITH ranked AS (
+        SELECT
+            resource_id,
+            city,
+            event_timestamp_utc,
+            demand_mw,
+            temperature,
+            ROW_NUMBER() OVER (
+                PARTITION BY resource_id, city
+                ORDER BY event_timestamp_utc DESC
+            ) AS recency
+        FROM {feature_rows}
+    )
+    SELECT
+        resource_id,
+        city,
+        MAX(event_timestamp_utc) AS last_event_timestamp_utc,
+        array_sort(
+            collect_list(
+                named_struct(
+                    'event_timestamp_utc', event_timestamp_utc,
+                    'demand_mw', demand_mw,
+                    'temperature', temperature
+                )
+            )
+        ) AS recent_rows,
+        SUM(demand_mw) AS demand_window_sum,
+        SUM(temperature) AS temperature_window_sum,
+        current_timestamp() AS updated_at_utc
+    FROM ranked
+    WHERE recency <= {window_rows}
+    GROUP BY resource_id, city
+"""
+
+# Each key's feature rows within range_predicate, ranked outward from the edge
+# of the range nearest the rewritten partitions, and the date of the 11th. A
+# key's LAG and 12-row rolling means reach back 11 rows however many days those
+# span, so this finds how far an incremental rewrite has to look back, and how
+# far forward the rewritten rows still shift later windows. short_keys counts
+# keys with fewer than 11 rows in range.
+WINDOW_EDGE_SQL = """
+    WITH window_keys AS (
+        SELECT DISTINCT resource_id, city
+        FROM {join_source}
+        WHERE ({key_predicate}) AND {feature_row_predicate}
+    ),
+    ranked AS (
+        SELECT
+            k.resource_id,
+            k.city,
+            j.event_date_utc,
+            ROW_NUMBER() OVER (
+                PARTITION BY k.resource_id, k.city
+                ORDER BY j.event_timestamp_utc {direction}
+            ) AS edge_rank
+        FROM window_keys k
+        LEFT JOIN (
+            SELECT resource_id, city, event_date_utc, event_timestamp_utc
+            FROM {join_source}
+            WHERE ({range_predicate}) AND {feature_row_predicate}
+        ) j
+            ON j.resource_id = k.resource_id AND j.city = k.city
+    ),
+    per_key AS (
+        SELECT
+            resource_id,
+            city,
+            COUNT(event_date_utc) AS range_rows,
+            MAX(CASE WHEN edge_rank = {edge_rows} THEN event_date_utc END) AS edge_date
+        FROM ranked
+        GROUP BY resource_id, city
+    )
+    SELECT
+        COALESCE(SUM(CASE WHEN range_rows < {edge_rows} THEN 1 ELSE 0 END), 0) AS short_keys,
+        {edge_aggregate}(edge_date) AS edge_date
+    FROM per_key
+"""
+
+
+# Demand quantiles and standard deviation cannot be combined from finished hourly
+# values, so every level is finalised from mergeable state: counts, sums and sums
+# of squares, per-column sums and non-null counts for the averages, and a
+# DDSketch-style map of log-spaced bucket key -> row count for the quantiles.
+# Bucket keys are sign * (CEIL(LN(|v|) / LN(gamma)) + offset), so a quantile read
+# from the sketch is within DEMAND_SKETCH_RELATIVE_ACCURACY of the true value.
+# The feature rows are scanned once into hourly_state; daily_state adds up the
+# hourly state, and a coarser level would do the same from either of them.
+DEMAND_AGGREGATION_SQL = """
     WITH base AS (
         SELECT
             event_timestamp_utc,
             DATE_TRUNC('hour', event_timestamp_utc) AS hour_bucket_utc,
-            DATE_TRUNC('day', event_timestamp_utc) AS day_bucket_utc,
             city,
             country_code,
             resource_id,
             demand_mw,
+            CASE
+                WHEN demand_mw = 0 THEN 0
+                ELSE CAST(
+                    SIGN(demand_mw) * GREATEST(
+                        CEIL(LN(ABS(demand_mw)) / LN({sketch_gamma}D)) + {sketch_key_offset},
+                        1
+                    ) AS INT
+                )
+            END AS demand_sketch_key,
             generation_mw,
             import_mw,
             solar_mw,
@@ -237,86 +428,694 @@ spark.sql(
                     THEN (COALESCE(solar_mw, 0) + COALESCE(wind_mw, 0)) / generation_mw
                 ELSE NULL
             END AS renewable_share
-        FROM gold_feature_engineering
+        FROM {feature_source}
         WHERE city IS NOT NULL
           AND resource_id IS NOT NULL
           AND demand_mw IS NOT NULL
     ),
-    hourly AS (
+    hourly_cells AS (
         SELECT
-            'hourly' AS aggregation_level,
-            hour_bucket_utc AS bucket_start_utc,
-            hour_bucket_utc + INTERVAL 1 HOUR AS bucket_end_utc,
-            CAST(hour_bucket_utc AS DATE) AS event_date_utc,
+            hour_bucket_utc,
             city,
             country_code,
             resource_id,
+            demand_sketch_key,
             COUNT(*) AS sample_count,
-            AVG(demand_mw) AS demand_avg_mw,
+            SUM(demand_mw) AS demand_sum_mw,
+            SUM(demand_mw * demand_mw) AS demand_sum_squares_mw2,
             MIN(demand_mw) AS demand_min_mw,
             MAX(demand_mw) AS demand_max_mw,
-            percentile_approx(demand_mw, 0.95) AS demand_p95_mw,
-            stddev_samp(demand_mw) AS demand_stddev_mw,
-            AVG(generation_mw) AS generation_avg_mw,
-            AVG(import_mw) AS import_avg_mw,
-            AVG(solar_mw) AS solar_avg_mw,
-            AVG(wind_mw) AS wind_avg_mw,
-            AVG(renewable_share) AS renewable_share_avg,
-            AVG(temperature) AS temperature_avg_c,
+            SUM(generation_mw) AS generation_sum_mw,
+            COUNT(generation_mw) AS generation_count,
+            SUM(import_mw) AS import_sum_mw,
+            COUNT(import_mw) AS import_count,
+            SUM(solar_mw) AS solar_sum_mw,
+            COUNT(solar_mw) AS solar_count,
+            SUM(wind_mw) AS wind_sum_mw,
+            COUNT(wind_mw) AS wind_count,
+            SUM(renewable_share) AS renewable_share_sum,
+            COUNT(renewable_share) AS renewable_share_count,
+            SUM(temperature) AS temperature_sum_c,
+            COUNT(temperature) AS temperature_count,
             MIN(temperature) AS temperature_min_c,
             MAX(temperature) AS temperature_max_c,
-            AVG(humidity) AS humidity_avg_pct,
-            AVG(wind_speed_mps) AS wind_speed_avg_mps,
-            AVG(cloud_cover_pct) AS cloud_cover_avg_pct,
-            AVG(heating_degree_c) AS heating_degree_avg_c,
-            AVG(cooling_degree_c) AS cooling_degree_avg_c,
-            max_by(weather_main, event_timestamp_utc) AS latest_weather_main
+            SUM(humidity) AS humidity_sum_pct,
+            COUNT(humidity) AS humidity_count,
+            SUM(wind_speed_mps) AS wind_speed_sum_mps,
+            COUNT(wind_speed_mps) AS wind_speed_count,
+            SUM(cloud_cover_pct) AS cloud_cover_sum_pct,
+            COUNT(cloud_cover_pct) AS cloud_cover_count,
+            SUM(heating_degree_c) AS heating_degree_sum_c,
+            COUNT(heating_degree_c) AS heating_degree_count,
+            SUM(cooling_degree_c) AS cooling_degree_sum_c,
+            COUNT(cooling_degree_c) AS cooling_degree_count,
+            max_by(weather_main, event_timestamp_utc) AS latest_weather_main,
+            MAX(event_timestamp_utc) AS latest_event_timestamp_utc
         FROM base
+        GROUP BY hour_bucket_utc, city, country_code, resource_id, demand_sketch_key
+    ),
+    hourly_state AS (
+        SELECT
+            'hourly' AS aggregation_level,
+            hour_bucket_utc AS bucket_start_utc,
+            hour_bucket_utc + INTERVAL 1 HOUR AS bucket_end_utc,
+            city,
+            country_code,
+            resource_id,
+            SUM(sample_count) AS sample_count,
+            SUM(demand_sum_mw) AS demand_sum_mw,
+            SUM(demand_sum_squares_mw2) AS demand_sum_squares_mw2,
+            MIN(demand_min_mw) AS demand_min_mw,
+            MAX(demand_max_mw) AS demand_max_mw,
+            map_from_entries(
+                collect_list(struct(demand_sketch_key, sample_count))
+            ) AS demand_sketch,
+            SUM(generation_sum_mw) AS generation_sum_mw,
+            SUM(generation_count) AS generation_count,
+            SUM(import_sum_mw) AS import_sum_mw,
+            SUM(import_count) AS import_count,
+            SUM(solar_sum_mw) AS solar_sum_mw,
+            SUM(solar_count) AS solar_count,
+            SUM(wind_sum_mw) AS wind_sum_mw,
+            SUM(wind_count) AS wind_count,
+            SUM(renewable_share_sum) AS renewable_share_sum,
+            SUM(renewable_share_count) AS renewable_share_count,
+            SUM(temperature_sum_c) AS temperature_sum_c,
+            SUM(temperature_count) AS temperature_count,
+            MIN(temperature_min_c) AS temperature_min_c,
+            MAX(temperature_max_c) AS temperature_max_c,
+            SUM(humidity_sum_pct) AS humidity_sum_pct,
+            SUM(humidity_count) AS humidity_count,
+            SUM(wind_speed_sum_mps) AS wind_speed_sum_mps,
+            SUM(wind_speed_count) AS wind_speed_count,
+            SUM(cloud_cover_sum_pct) AS cloud_cover_sum_pct,
+            SUM(cloud_cover_count) AS cloud_cover_count,
+            SUM(heating_degree_sum_c) AS heating_degree_sum_c,
+            SUM(heating_degree_count) AS heating_degree_count,
+            SUM(cooling_degree_sum_c) AS cooling_degree_sum_c,
+            SUM(cooling_degree_count) AS cooling_degree_count,
+            max_by(latest_weather_main, latest_event_timestamp_utc) AS latest_weather_main,
+            MAX(latest_event_timestamp_utc) AS latest_event_timestamp_utc
+        FROM hourly_cells
         GROUP BY hour_bucket_utc, city, country_code, resource_id
     ),
-    daily AS (
+    daily_state AS (
         SELECT
             'daily' AS aggregation_level,
-            day_bucket_utc AS bucket_start_utc,
-            day_bucket_utc + INTERVAL 1 DAY AS bucket_end_utc,
-            CAST(day_bucket_utc AS DATE) AS event_date_utc,
+            DATE_TRUNC('day', bucket_start_utc) AS bucket_start_utc,
+            DATE_TRUNC('day', bucket_start_utc) + INTERVAL 1 DAY AS bucket_end_utc,
             city,
             country_code,
             resource_id,
-            COUNT(*) AS sample_count,
-            AVG(demand_mw) AS demand_avg_mw,
-            MIN(demand_mw) AS demand_min_mw,
-            MAX(demand_mw) AS demand_max_mw,
-            percentile_approx(demand_mw, 0.95) AS demand_p95_mw,
-            stddev_samp(demand_mw) AS demand_stddev_mw,
-            AVG(generation_mw) AS generation_avg_mw,
-            AVG(import_mw) AS import_avg_mw,
-            AVG(solar_mw) AS solar_avg_mw,
-            AVG(wind_mw) AS wind_avg_mw,
-            AVG(renewable_share) AS renewable_share_avg,
-            AVG(temperature) AS temperature_avg_c,
-            MIN(temperature) AS temperature_min_c,
-            MAX(temperature) AS temperature_max_c,
-            AVG(humidity) AS humidity_avg_pct,
-            AVG(wind_speed_mps) AS wind_speed_avg_mps,
-            AVG(cloud_cover_pct) AS cloud_cover_avg_pct,
-            AVG(heating_degree_c) AS heating_degree_avg_c,
-            AVG(cooling_degree_c) AS cooling_degree_avg_c,
-            max_by(weather_main, event_timestamp_utc) AS latest_weather_main
-        FROM base
-        GROUP BY day_bucket_utc, city, country_code, resource_id
+            SUM(sample_count) AS sample_count,
+            SUM(demand_sum_mw) AS demand_sum_mw,
+            SUM(demand_sum_squares_mw2) AS demand_sum_squares_mw2,
+            MIN(demand_min_mw) AS demand_min_mw,
+            MAX(demand_max_mw) AS demand_max_mw,
+            aggregate(
+                collect_list(demand_sketch),
+                CAST(map() AS MAP<INT, BIGINT>),
+                (merged, sketch) -> map_zip_with(
+                    merged, sketch, (bucket_key, left_count, right_count) ->
+                        COALESCE(left_count, 0) + COALESCE(right_count, 0)
+                )
+            ) AS demand_sketch,
+            SUM(generation_sum_mw) AS generation_sum_mw,
+            SUM(generation_count) AS generation_count,
+            SUM(import_sum_mw) AS import_sum_mw,
+            SUM(import_count) AS import_count,
+            SUM(solar_sum_mw) AS solar_sum_mw,
+            SUM(solar_count) AS solar_count,
+            SUM(wind_sum_mw) AS wind_sum_mw,
+            SUM(wind_count) AS wind_count,
+            SUM(renewable_share_sum) AS renewable_share_sum,
+            SUM(renewable_share_count) AS renewable_share_count,
+            SUM(temperature_sum_c) AS temperature_sum_c,
+            SUM(temperature_count) AS temperature_count,
+            MIN(temperature_min_c) AS temperature_min_c,
+            MAX(temperature_max_c) AS temperature_max_c,
+            SUM(humidity_sum_pct) AS humidity_sum_pct,
+            SUM(humidity_count) AS humidity_count,
+            SUM(wind_speed_sum_mps) AS wind_speed_sum_mps,
+            SUM(wind_speed_count) AS wind_speed_count,
+            SUM(cloud_cover_sum_pct) AS cloud_cover_sum_pct,
+            SUM(cloud_cover_count) AS cloud_cover_count,
+            SUM(heating_degree_sum_c) AS heating_degree_sum_c,
+            SUM(heating_degree_count) AS heating_degree_count,
+            SUM(cooling_degree_sum_c) AS cooling_degree_sum_c,
+            SUM(cooling_degree_count) AS cooling_degree_count,
+            max_by(latest_weather_main, latest_event_timestamp_utc) AS latest_weather_main,
+            MAX(latest_event_timestamp_utc) AS latest_event_timestamp_utc
+        FROM hourly_state
+        GROUP BY DATE_TRUNC('day', bucket_start_utc), city, country_code, resource_id
+    ),
+    rollup_state AS (
+        SELECT * FROM hourly_state
+        UNION ALL
+        SELECT * FROM daily_state
+    )
+    SELECT
+        aggregation_level,
+        bucket_start_utc,
+        bucket_end_utc,
+        CAST(bucket_start_utc AS DATE) AS event_date_utc,
+        city,
+        country_code,
+        resource_id,
+        sample_count,
+        demand_sum_mw / sample_count AS demand_avg_mw,
+        demand_min_mw,
+        demand_max_mw,
+        aggregate(
+            array_sort(map_entries(demand_sketch)),
+            named_struct('seen', CAST(0 AS BIGINT), 'sketch_key', CAST(NULL AS INT)),
+            (acc, bucket) -> named_struct(
+                'seen', acc.seen + bucket.value,
+                'sketch_key', COALESCE(
+                    acc.sketch_key,
+                    IF(acc.seen + bucket.value > 0.95D * (sample_count - 1), bucket.key, NULL)
+                )
+            ),
+            acc -> SIGN(acc.sketch_key) * 2
+                * POWER({sketch_gamma}D, ABS(acc.sketch_key) - {sketch_key_offset})
+                / ({sketch_gamma}D + 1)
+        ) AS demand_p95_mw,
+        CASE
+            WHEN sample_count > 1 THEN SQRT(GREATEST(
+                (demand_sum_squares_mw2 - demand_sum_mw * demand_sum_mw / sample_count)
+                / (sample_count - 1),
+                0
+            ))
+        END AS demand_stddev_mw,
+        generation_sum_mw / NULLIF(generation_count, 0) AS generation_avg_mw,
+        import_sum_mw / NULLIF(import_count, 0) AS import_avg_mw,
+        solar_sum_mw / NULLIF(solar_count, 0) AS solar_avg_mw,
+        wind_sum_mw / NULLIF(wind_count, 0) AS wind_avg_mw,
+        renewable_share_sum / NULLIF(renewable_share_count, 0) AS renewable_share_avg,
+        temperature_sum_c / NULLIF(temperature_count, 0) AS temperature_avg_c,
+        temperature_min_c,
+        temperature_max_c,
+        humidity_sum_pct / NULLIF(humidity_count, 0) AS humidity_avg_pct,
+        wind_speed_sum_mps / NULLIF(wind_speed_count, 0) AS wind_speed_avg_mps,
+        cloud_cover_sum_pct / NULLIF(cloud_cover_count, 0) AS cloud_cover_avg_pct,
+        heating_degree_sum_c / NULLIF(heating_degree_count, 0) AS heating_degree_avg_c,
+        cooling_degree_sum_c / NULLIF(cooling_degree_count, 0) AS cooling_degree_avg_c,
+        latest_weather_main,
+        demand_sum_mw,
+        demand_sum_squares_mw2,
+        demand_sketch
+    FROM rollup_state
+"""
+
+
+def weather_demand_join_sql(
+    energy_source: str = SILVER_ENERGY_TABLE,
+    weather_source: str = SILVER_WEATHER_TABLE,
+) -> str:
+    return WEATHER_DEMAND_JOIN_SQL.format(
+        energy_source=energy_source, weather_source=weather_source
+    )
+
+
+def feature_engineering_sql(
+    join_source: str = GOLD_WEATHER_DEMAND_JOIN_TABLE,
+    state_source: str | None = None,
+) -> str:
+    state_context = (
+        FEATURE_STATE_CONTEXT_SQL.format(state_source=state_source) if state_source else ""
+    )
+    return FEATURE_ENGINEERING_SQL.format(
+        join_source=join_source,
+        feature_row_predicate=FEATURE_ROW_PREDICATE,
+        state_context=state_context,
+    )
+
+
+def feature_state_sql(feature_rows: str = GOLD_FEATURE_ENGINEERING_TABLE) -> str:
+    return FEATURE_STATE_SQL.format(feature_rows=feature_rows, window_rows=FEATURE_WINDOW_ROWS)
+
+
+def window_edge_sql(key_predicate: str, range_predicate: str, step: int) -> str:
+    """WINDOW_EDGE_SQL ranking forward (step 1) or back (step -1) from the range edge."""
+    return WINDOW_EDGE_SQL.format(
+        join_source=GOLD_WEATHER_DEMAND_JOIN_TABLE,
+        key_predicate=key_predicate,
+        range_predicate=range_predicate,
+        feature_row_predicate=FEATURE_ROW_PREDICATE,
+        direction="ASC" if step > 0 else "DESC",
+        edge_aggregate="MAX" if step > 0 else "MIN",
+        edge_rows=FEATURE_WINDOW_ROWS - 1,
+    )
+
+
+def demand_aggregation_sql(feature_source: str = GOLD_FEATURE_ENGINEERING_TABLE) -> str:
+    return DEMAND_AGGREGATION_SQL.format(
+        feature_source=feature_source,
+        sketch_gamma=repr(DEMAND_SKETCH_GAMMA),
+        sketch_key_offset=DEMAND_SKETCH_KEY_OFFSET,
+    )
+
+
+def create_table_sql(table_name: str, select_sql: str) -> str:
+    return f"""
+    CREATE OR REPLACE TABLE {table_name}
+    USING DELTA
+    PARTITIONED BY ({PARTITION_COLUMN})
+    AS
+{select_sql}"""
+
+
+def _shift_dates(dates: set[date], *offsets: int) -> set[date]:
+    return {event_date + timedelta(days=offset) for event_date in dates for offset in offsets}
+
+
+def join_refresh_dates(energy_dates: set[date], weather_dates: set[date]) -> set[date]:
+    """Join partitions to recompute for changed energy and weather event dates.
+
+    A reading matches energy from 1h before to 6h after it, which can fall on
+    the day before or after the reading.
+    """
+    return set(energy_dates) | _shift_dates(weather_dates, -1, 0, 1)
+
+
+def _date_range(first: date, last: date) -> set[date]:
+    return {first + timedelta(days=offset) for offset in range((last - first).days + 1)}
+
+
+def _date_list_sql(dates: set[date]) -> str:
+    return ", ".join(f"DATE'{event_date.isoformat()}'" for event_date in sorted(dates))
+
+
+def _partition_predicate(dates: set[date]) -> str:
+    return f"{PARTITION_COLUMN} IN ({_date_list_sql(dates)})"
+
+
+def _date_range_predicate(first: date, last: date) -> str:
+    return (
+        f"{PARTITION_COLUMN} BETWEEN DATE'{first.isoformat()}' AND DATE'{last.isoformat()}'"
+    )
+
+
+def _create_partition_view(spark_session, view_name: str, table_name: str, dates: set[date]):
+    spark_session.sql(
+        f"SELECT * FROM {table_name} WHERE {_partition_predicate(dates)}"
+    ).createOrReplaceTempView(view_name)
+
+
+def _replace_partitions(spark_session, table_name: str, select_sql: str, dates: set[date]):
+    predicate = _partition_predicate(dates)
+    (
+        spark_session.sql(f"SELECT * FROM ({select_sql}) WHERE {predicate}")
+        .write
+        .format("delta")
+        .mode("overwrite")
+        .option("replaceWhere", predicate)
+        .saveAsTable(table_name)
     )
-    SELECT * FROM hourly
-    UNION ALL
-    SELECT * FROM daily
+
+
+def _silver_watermarks(spark_session) -> dict[str, str]:
+    """Latest silver write time per silver table, as text in the session time zone."""
+    watermarks = {}
+    for table_name in (SILVER_ENERGY_TABLE, SILVER_WEATHER_TABLE):
+        watermark = spark_session.sql(
+            f"SELECT CAST(MAX({SILVER_WRITTEN_AT_COLUMN}) AS STRING) AS watermark "
+            f"FROM {table_name}"
+        ).collect()[0]["watermark"]
+        if watermark is not None:
+            watermarks[table_name] = watermark
+    return watermarks
+
+
+def _saved_watermarks(spark_session) -> dict[str, str]:
+    if not spark_session.catalog.tableExists(GOLD_REFRESH_STATE_TABLE):
+        return {}
+    # A state table from before silver_written_at_utc holds fetch times, which
+    # cannot be compared with write times; the next run rebuilds gold in full.
+    if "watermark_silver_written_at_utc" not in spark_session.table(
+        GOLD_REFRESH_STATE_TABLE
+    ).columns:
+        return {}
+    rows = spark_session.sql(
+        f"""
+        SELECT source_table, CAST(MAX(watermark_silver_written_at_utc) AS STRING) AS watermark
+        FROM {GOLD_REFRESH_STATE_TABLE}
+        GROUP BY source_table
+        """
+    ).collect()
+    return {row["source_table"]: row["watermark"] for row in rows}
+
+
+def _save_watermarks(spark_session, watermarks: dict[str, str]):
+    """Replace gold_refresh_state with one row per silver table."""
+    if not watermarks:
+        return
+    values = ", ".join(
+        f"('{table_name}', TIMESTAMP'{watermark}', current_timestamp())"
+        for table_name, watermark in sorted(watermarks.items())
+    )
+    spark_session.sql(
+        f"CREATE OR REPLACE TABLE {GOLD_REFRESH_STATE_TABLE} USING DELTA AS "
+        f"SELECT * FROM VALUES {values} AS state({GOLD_REFRESH_STATE_COLUMNS})"
+    )
+
+
+def _changed_dates(spark_session, table_name: str, since: str, until: str) -> set[date]:
+    rows = spark_session.sql(
+        f"""
+        SELECT DISTINCT {PARTITION_COLUMN}
+        FROM {table_name}
+        WHERE {SILVER_WRITTEN_AT_COLUMN} > TIMESTAMP'{since}'
+          AND {SILVER_WRITTEN_AT_COLUMN} <= TIMESTAMP'{until}'
+        """
+    ).collect()
+    return {row[PARTITION_COLUMN] for row in rows}
+
+
+def _join_date_bounds(spark_session) -> tuple[date, date]:
+    row = spark_session.sql(
+        f"SELECT MIN({PARTITION_COLUMN}) AS first_date, MAX({PARTITION_COLUMN}) AS last_date "
+        f"FROM {GOLD_WEATHER_DEMAND_JOIN_TABLE}"
+    ).collect()[0]
+    return row["first_date"], row["last_date"]
+
+
+def _window_edge_date(
+    spark_session, key_predicate: str, edge: date, step: int, bound: date
+) -> date:
+    """Date past edge that covers 11 feature rows of every key matching key_predicate.
+
+    Each key's 11th feature row after edge (step 1) or before it (step -1);
+    the latest of those dates going forward, the earliest going back. The
+    range searched starts at one day and doubles until every key has 11 rows
+    in it, and stops at bound, the last or first join date.
     """
-)
+    if (edge - bound).days * step >= 0:
+        return edge
+    days = 1
+    while True:
+        far = edge + timedelta(days=days * step)
+        if (far - bound).days * step >= 0:
+            far = bound
+        first, last = sorted((edge + timedelta(days=step), far))
+        row = spark_session.sql(
+            window_edge_sql(key_predicate, _date_range_predicate(first, last), step)
+        ).collect()[0]
+        if not row["short_keys"]:
+            return row["edge_date"] or edge
+        if far == bound:
+            return bound
+        days *= 2
+
+
+def rebuild_feature_state(spark_session):
+    """Recompute gold_feature_state from the whole feature table, after a full refresh."""
+    spark_session.sql(
+        f"CREATE OR REPLACE TABLE {GOLD_FEATURE_STATE_TABLE} USING DELTA AS\n"
+        f"{feature_state_sql()}"
+    )
+
+
+def _merge_feature_state(spark_session, feature_rows: str):
+    """MERGE the state of every key in feature_rows into gold_feature_state."""
+    spark_session.sql(
+        f"""
+        MERGE INTO {GOLD_FEATURE_STATE_TABLE} t
+        USING ({feature_state_sql(feature_rows)}) s
+        ON t.resource_id = s.resource_id AND t.city = s.city
+        WHEN MATCHED THEN UPDATE SET *
+        WHEN NOT MATCHED THEN INSERT *
+        """
+    )
+
+
+def update_feature_state(
+    spark_session, feature_start: date, feature_end: date, lookback_start: date
+):
+    """Recompute gold_feature_state for the keys with feature rows in rewritten partitions.
+
+    The state holds each key's last FEATURE_WINDOW_ROWS rows, so only keys with
+    rows in feature_start..feature_end can change, and their state is found in
+    their rows from lookback_start on: 11 rows before feature_start, the
+    rewritten rows, and any later ones. A key whose stored recent rows fall in
+    the rewritten dates but that has no rows there any more cannot be placed
+    from those rows, so the whole state is rebuilt instead.
+    """
+    rewritten = _date_range_predicate(feature_start, feature_end)
+    rewritten_keys = (
+        f"SELECT DISTINCT resource_id, city FROM {GOLD_FEATURE_ENGINEERING_TABLE} "
+        f"WHERE {rewritten}"
+    )
+    dropped_keys = spark_session.sql(
+        f"""
+        SELECT COUNT(*) AS dropped_keys
+        FROM {GOLD_FEATURE_STATE_TABLE} s
+        LEFT ANTI JOIN ({rewritten_keys}) k
+            ON k.resource_id = s.resource_id AND k.city = s.city
+        WHERE exists(
+            s.recent_rows,
+            recent -> CAST(recent.event_timestamp_utc AS DATE)
+                BETWEEN DATE'{feature_start.isoformat()}' AND DATE'{feature_end.isoformat()}'
+        )
+        """
+    ).collect()[0]["dropped_keys"]
+    if dropped_keys:
+        rebuild_feature_state(spark_session)
+        return
+
+    spark_session.sql(
+        f"""
+        SELECT f.resource_id, f.city, f.event_timestamp_utc, f.demand_mw, f.temperature
+        FROM {GOLD_FEATURE_ENGINEERING_TABLE} f
+        LEFT SEMI JOIN ({rewritten_keys}) k
+            ON k.resource_id = f.resource_id AND k.city = f.city
+        WHERE f.{PARTITION_COLUMN} >= DATE'{lookback_start.isoformat()}'
+        """
+    ).createOrReplaceTempView("gold_feature_state_rows")
+    _merge_feature_state(spark_session, "gold_feature_state_rows")
+
+
+def refresh_full(spark_session):
+    spark_session.sql(create_table_sql(GOLD_WEATHER_DEMAND_JOIN_TABLE, weather_demand_join_sql()))
+    spark_session.sql(create_table_sql(GOLD_FEATURE_ENGINEERING_TABLE, feature_engineering_sql()))
+    spark_session.sql(create_table_sql(GOLD_DEMAND_AGGREGATION_TABLE, demand_aggregation_sql()))
+
+
+def _refresh_join(
+    spark_session,
+    saved_watermarks: dict[str, str],
+    watermarks: dict[str, str],
+) -> set[date]:
+    """Replace the join partitions affected by silver rows written since the last run."""
+    changed = {
+        table_name: _changed_dates(
+            spark_session, table_name, saved_watermarks[table_name], watermarks[table_name]
+        )
+        for table_name in watermarks
+    }
+    join_dates = join_refresh_dates(
+        changed.get(SILVER_ENERGY_TABLE, set()), changed.get(SILVER_WEATHER_TABLE, set())
+    )
+    if not join_dates:
+        return set()
+
+    _create_partition_view(spark_session, "gold_energy_increment", SILVER_ENERGY_TABLE, join_dates)
+    _create_partition_view(
+        spark_session,
+        "gold_weather_increment",
+        SILVER_WEATHER_TABLE,
+        _shift_dates(join_dates, -1, 0, 1),
+    )
+    _replace_partitions(
+        spark_session,
+        GOLD_WEATHER_DEMAND_JOIN_TABLE,
+        weather_demand_join_sql("gold_energy_increment", "gold_weather_increment"),
+        join_dates,
+    )
+    return join_dates
+
+
+def _refresh_aggregation(spark_session, feature_dates: set[date]):
+    _create_partition_view(
+        spark_session, "gold_feature_increment", GOLD_FEATURE_ENGINEERING_TABLE, feature_dates
+    )
+    _replace_partitions(
+        spark_session,
+        GOLD_DEMAND_AGGREGATION_TABLE,
+        demand_aggregation_sql("gold_feature_increment"),
+        feature_dates,
+    )
+
+
+def refresh_incremental(
+    spark_session,
+    saved_watermarks: dict[str, str],
+    watermarks: dict[str, str],
+) -> set[date]:
+    """Recompute only the gold partitions affected by silver rows written since the last run.
+
+    LAG and the 12-row rolling means count rows per (resource_id, city), not
+    days, so the feature rewrite runs from the first changed join date until
+    every changed key has 11 rows after the last one, and reads 11 rows per
+    key before the first one. Inputs are narrowed to the partitions each step
+    needs and results replace just the affected partitions, and the feature
+    state is updated for the keys in them. Returns the feature/aggregation
+    dates that were rewritten.
+    """
+    join_dates = _refresh_join(spark_session, saved_watermarks, watermarks)
+    if not join_dates:
+        return set()
+
+    first_join_date, last_join_date = _join_date_bounds(spark_session)
+    feature_start = min(join_dates)
+    feature_end = _window_edge_date(
+        spark_session, _partition_predicate(join_dates), max(join_dates), 1, last_join_date
+    )
+    feature_dates = _date_range(feature_start, feature_end)
+    # Every key in the rewritten partitions needs its lookback, not just the changed ones.
+    lookback_start = _window_edge_date(
+        spark_session,
+        _date_range_predicate(feature_start, feature_end),
+        feature_start,
+        -1,
+        first_join_date,
+    )
+
+    spark_session.sql(
+        f"SELECT * FROM {GOLD_WEATHER_DEMAND_JOIN_TABLE} "
+        f"WHERE {_date_range_predicate(lookback_start, feature_end)}"
+    ).createOrReplaceTempView("gold_join_increment")
+    _replace_partitions(
+        spark_session,
+        GOLD_FEATURE_ENGINEERING_TABLE,
+        feature_engineering_sql("gold_join_increment"),
+        feature_dates,
+    )
+    if spark_session.catalog.tableExists(GOLD_FEATURE_STATE_TABLE):
+        update_feature_state(spark_session, feature_start, feature_end, lookback_start)
+    _refresh_aggregation(spark_session, feature_dates)
+    return feature_dates
+
+
+def refresh_append(
+    spark_session,
+    saved_watermarks: dict[str, str],
+    watermarks: dict[str, str],
+) -> set[date]:
+    """Featurise only join rows newer than their key's gold_feature_state entry.
+
+    The join is refreshed as in incremental runs. New rows are featurised with
+    the stored recent rows leading each key's window, instead of re-running the
+    windows over the lookback rows, and merged into the feature table on
+    (resource_id, city, event_timestamp_utc) before the state is merged forward.
+    A rerun after a failure between the two MERGEs finds the same new rows and
+    replaces them, and one after the state MERGE finds none. Join rows at or
+    before their key's last featurised timestamp, late or corrected ones, are
+    not featurised again; an incremental or full run places them. Returns the
+    aggregation dates that were rewritten.
+    """
+    join_dates = _refresh_join(spark_session, saved_watermarks, watermarks)
+    if not join_dates:
+        return set()
+
+    spark_session.sql(
+        f"""
+        SELECT j.*
+        FROM {GOLD_WEATHER_DEMAND_JOIN_TABLE} j
+        LEFT JOIN {GOLD_FEATURE_STATE_TABLE} s
+            ON s.resource_id = j.resource_id AND s.city = j.city
+        WHERE j.{_partition_predicate(join_dates)}
+          AND (s.last_event_timestamp_utc IS NULL
+               OR j.event_timestamp_utc > s.last_event_timestamp_utc)
+        """
+    ).createOrReplaceTempView("gold_join_new_rows")
+    spark_session.sql(
+        f"""
+        SELECT s.*
+        FROM {GOLD_FEATURE_STATE_TABLE} s
+        LEFT SEMI JOIN gold_join_new_rows j
+            ON s.resource_id = j.resource_id AND s.city = j.city
+        """
+    ).createOrReplaceTempView("gold_feature_state_increment")
+
+    new_features = spark_session.sql(
+        feature_engineering_sql("gold_join_new_rows", state_source="gold_feature_state_increment")
+    )
+    new_features.createOrReplaceTempView("gold_feature_new_rows")
+    spark_session.sql(
+        f"""
+        MERGE INTO {GOLD_FEATURE_ENGINEERING_TABLE} t
+        USING gold_feature_new_rows s
+        ON t.{_partition_predicate(join_dates)}
+           AND t.{PARTITION_COLUMN} = s.{PARTITION_COLUMN}
+           AND t.resource_id = s.resource_id
+           AND t.city = s.city
+           AND t.event_timestamp_utc = s.event_timestamp_utc
+        WHEN MATCHED THEN UPDATE SET *
+        WHEN NOT MATCHED THEN INSERT *
+        """
+    )
+
+    spark_session.sql(
+        """
+        SELECT
+            s.resource_id,
+            s.city,
+            recent.event_timestamp_utc,
+            recent.demand_mw,
+            recent.temperature
+        FROM gold_feature_state_increment s
+        LATERAL VIEW explode(s.recent_rows) recent_rows_view AS recent
+        UNION ALL
+        SELECT resource_id, city, event_timestamp_utc, demand_mw, temperature
+        FROM gold_feature_new_rows
+        """
+    ).createOrReplaceTempView("gold_feature_state_rows")
+    _merge_feature_state(spark_session, "gold_feature_state_rows")
+
+    _refresh_aggregation(spark_session, join_dates)
+    return join_dates
+
+
+def build_gold_tables(spark_session, mode: str | None = None) -> dict[str, int]:
+    spark_session.conf.set("spark.sql.session.timeZone", "UTC")
+    mode = _refresh_mode(mode)
+
+    # Captured before reading silver, so rows written mid-run are picked up next time.
+    watermarks = _silver_watermarks(spark_session)
+    saved_watermarks = _saved_watermarks(spark_session) if mode != "full" else {}
+    can_refresh_incrementally = (
+        mode != "full"
+        and all(table_name in saved_watermarks for table_name in watermarks)
+        and all(spark_session.catalog.tableExists(table_name) for table_name in GOLD_TABLES)
+    )
+    # Without a feature state an append run falls back to incremental, which builds it.
+    can_append = can_refresh_incrementally and mode == "append"
+    can_append = can_append and spark_session.catalog.tableExists(GOLD_FEATURE_STATE_TABLE)
+
+    if can_append:
+        refreshed_dates = refresh_append(spark_session, saved_watermarks, watermarks)
+        refreshed_partitions = [event_date.isoformat() for event_date in sorted(refreshed_dates)]
+        print({"refresh_mode": "append", "refreshed_partitions": refreshed_partitions})
+    elif can_refresh_incrementally:
+        refreshed_dates = refresh_incremental(spark_session, saved_watermarks, watermarks)
+        refreshed_partitions = [event_date.isoformat() for event_date in sorted(refreshed_dates)]
+        print({"refresh_mode": "incremental", "refreshed_partitions": refreshed_partitions})
+        if not spark_session.catalog.tableExists(GOLD_FEATURE_STATE_TABLE):
+            rebuild_feature_state(spark_session)
+    else:
+        refresh_full(spark_session)
+        print({"refresh_mode": "full"})
+        rebuild_feature_state(spark_session)
+    _save_watermarks(spark_session, watermarks)
+
+    row_counts = {}
+    for table_name in GOLD_TABLES:
+        row_count = spark_session.table(table_name).count()
+        row_counts[table_name] = row_count
+        print({"table": table_name, "rows": row_count})
+    return row_counts
 
 
-for table_name in [
-    "gold_weather_demand_join",
-    "gold_feature_engineering",
-    "gold_demand_aggregation",
-]:
-    row_count = spark.table(table_name).count()
-    print({"table": table_name, "rows": row_count})
+if __name__ == "__main__":
+    build_gold_tables(spark)
@@ -0,0 +1,117 @@
+import asyncio
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ingestion.common.metrics import timed
+
+DEFAULT_TIMEOUT_SECONDS = 30
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+@dataclass(frozen=True)
+class HttpClientSettings:
+    """Connection pooling and retry settings shared by the API fetchers."""
+
+    max_retries: int = 3
+    backoff_factor: float = 0.5
+    backoff_max_seconds: float = 30.0
+    backoff_jitter_seconds: float = 0.5
+    retry_after_max_seconds: int = 120
+    pool_connections: int = 4
+    pool_maxsize: int = 8
+
+    @classmethod
+    def from_config(cls, api_config: dict) -> "HttpClientSettings":
+        """Build settings from the optional `api.http` block of a YAML config."""
+        http_config = api_config.get("http") or {}
+        unknown_keys = set(http_config) - set(cls.__dataclass_fields__)
+        if unknown_keys:
+            raise ValueError(
+                f"Unknown api.http setting(s): {', '.join(sorted(unknown_keys))}"
+            )
+        return cls(**http_config)
+
+
+def build_retry(settings: HttpClientSettings) -> Retry:
+    """Retry idempotent GETs on connection errors, 429 and 5xx with jittered backoff."""
+    return Retry(
+        total=settings.max_retries,
+        connect=settings.max_retries,
+        read=settings.max_retries,
+        status=settings.max_retries,
+        allowed_methods=frozenset({"GET"}),
+        status_forcelist=RETRY_STATUS_CODES,
+        backoff_factor=settings.backoff_factor,
+        backoff_max=settings.backoff_max_seconds,
+        backoff_jitter=settings.backoff_jitter_seconds,
+        respect_retry_after_header=True,
+        retry_after_max=settings.retry_after_max_seconds,
+        raise_on_status=False,
+    )
+
+
+def build_session(settings: HttpClientSettings | None = None) -> requests.Session:
+    """Create a keep-alive session with bounded per-host connection pools."""
+    settings = settings or HttpClientSettings()
+    adapter = HTTPAdapter(
+        pool_connections=settings.pool_connections,
+        pool_maxsize=settings.pool_maxsize,
+        pool_block=True,
+        max_retries=build_retry(settings),
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@lru_cache(maxsize=8)
+def get_session(settings: HttpClientSettings = HttpClientSettings()) -> requests.Session:
+    """Return a process-wide session so repeated calls reuse TLS connections."""
+    return build_session(settings)
+
+
+def get_json(
+    url: str,
+    params: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    session: requests.Session | None = None,
+) -> Any:
+    """GET a JSON document, retrying transient failures before raising.
+
+    Latency, decoded body size, and retries used are recorded as a `fetch` stage.
+    """
+    session = session or get_session()
+    with timed("fetch", url=url, offset=(params or {}).get("offset")) as event:
+        response = session.get(url, params=params, headers=headers, timeout=timeout)
+        retries = response.raw.retries
+        event["status_code"] = response.status_code
+        event["response_bytes"] = len(response.content)
+        event["retries"] = len(retries.history) if retries else 0
+        response.raise_for_status()
+        return response.json()
+
+
+class AsyncRateLimiter:
+    """Space request starts evenly so a fan-out stays inside a per-minute quota."""
+
+    def __init__(self, requests_per_minute: float):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be greater than 0.")
+        self.interval_seconds = 60.0 / requests_per_minute
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            wait_seconds = self._next_start - loop.time()
+            if wait_seconds > 0:
+                await asyncio.sleep(wait_seconds)
+            self._next_start = max(loop.time(), self._next_start) + self.interval_seconds
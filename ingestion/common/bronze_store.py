@@ -0,0 +1,224 @@
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any
+
+from ingestion.common.metrics import timed
+
+try:
+    import orjson
+except ImportError:  # optional faster parser for reading bronze back
+    orjson = None
+
+BRONZE_INDEX_DIR = Path("data/state/bronze_index")
+QUARANTINE_DIR = Path("data/quarantine")
+INDEX_MAX_ENTRIES = 500
+BRONZE_FORMATS = ("json", "ndjson.gz", "ndjson.zst")
+RAW_FILE_PATTERNS = tuple(f"*.{bronze_format}" for bronze_format in BRONZE_FORMATS)
+# Energy NDJSON keeps the datastore resource on every record line.
+RESOURCE_ID_FIELD = "_resource_id"
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ImportError(
+            "Bronze format 'ndjson.zst' requires the optional 'zstandard' package."
+        ) from exc
+    return zstandard
+
+
+def _loads(document: str | bytes) -> Any:
+    """Parse JSON with orjson when installed, falling back to the stdlib.
+
+    orjson rejects a few inputs the stdlib accepts (NaN, integers beyond 64 bits),
+    so those documents are re-parsed with `json`.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(document)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(document)
+
+
+def _open_raw_file(path: Path, mode: str) -> IO[str]:
+    if path.name.endswith(".ndjson.gz"):
+        return gzip.open(path, f"{mode}t", encoding="utf-8", compresslevel=6)
+    if path.name.endswith(".ndjson.zst"):
+        return _zstandard().open(path, f"{mode}t", encoding="utf-8")
+    return path.open(mode)
+
+
+def _payload_lines(payload: dict[str, Any], dataset_name: str) -> list[dict[str, Any]]:
+    """Energy becomes one line per datastore record; other payloads are one line."""
+    if dataset_name != "energy":
+        return [payload]
+    result = payload.get("result", {})
+    resource_id = result.get("resource_id")
+    return [{RESOURCE_ID_FIELD: resource_id, **record} for record in result.get("records", [])]
+
+
+def list_raw_files(raw_dir: Path) -> list[Path]:
+    """All raw captures in raw_dir, whatever their bronze format, in name order."""
+    files = {path for pattern in RAW_FILE_PATTERNS for path in raw_dir.glob(pattern)}
+    return sorted(files)
+
+
+def read_raw_payload(path: Path) -> dict[str, Any]:
+    """Read a raw capture back into the API payload shape, detecting format by extension."""
+    if path.suffix == ".json":
+        return _loads(path.read_bytes())
+    with _open_raw_file(path, "r") as f:
+        lines = [_loads(line) for line in f if line.strip()]
+
+    if not path.name.startswith("energy_"):
+        if not lines:
+            raise ValueError(f"Raw file {path.name} holds no JSON document.")
+        return lines[0]
+
+    resource_id = lines[0].get(RESOURCE_ID_FIELD) if lines else None
+    records = [
+        {key: value for key, value in line.items() if key != RESOURCE_ID_FIELD}
+        for line in lines
+    ]
+    return {"result": {"resource_id": resource_id, "records": records}}
+
+
+def payload_digest(payload: Any) -> str:
+    """SHA-256 of the payload's canonical JSON, independent of key order."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _part_suffix(part: int | str | None) -> str:
+    if part is None:
+        return ""
+    if isinstance(part, int):
+        return f"_{part:05d}"
+    return f"_{part}"
+
+
+def _load_index(index_path: Path) -> list[dict[str, str]]:
+    if not index_path.exists():
+        return []
+    with index_path.open("r") as f:
+        return json.load(f)
+
+
+def _save_index(index_path: Path, entries: list[dict[str, str]]) -> None:
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(f".{index_path.name}.tmp")
+    with tmp_path.open("w") as f:
+        json.dump(entries[-INDEX_MAX_ENTRIES:], f, indent=2)
+    os.replace(tmp_path, index_path)
+
+
+def _record_pointer(index_dir: Path, dataset_name: str, digest: str, existing_path: str) -> None:
+    pointer = {
+        "seen_at_utc": datetime.now(timezone.utc).isoformat(),
+        "sha256": digest,
+        "path": existing_path,
+    }
+    with (index_dir / f"{dataset_name}_pointers.jsonl").open("a") as f:
+        f.write(json.dumps(pointer) + "\n")
+
+
+def write_raw_payload(
+    payload: dict[str, Any],
+    dataset_name: str,
+    output_dir: Path,
+    run_timestamp: str | None = None,
+    part: int | str | None = None,
+    index_dir: Path = BRONZE_INDEX_DIR,
+    bronze_format: str = "json",
+) -> tuple[Path, bool]:
+    """Write a raw payload unless an identical one was stored recently.
+
+    `bronze_format` is `json` (indented document), `ndjson.gz` or `ndjson.zst`
+    (compressed newline-delimited JSON). Returns the bronze path holding the
+    payload and whether a new file was written. Repeats only append a pointer
+    line to `<index_dir>/<dataset>_pointers.jsonl`.
+    """
+    if bronze_format not in BRONZE_FORMATS:
+        raise ValueError(f"bronze_format must be one of: {', '.join(BRONZE_FORMATS)}")
+
+    with timed("bronze_write", bronze_format=bronze_format, part=part) as event:
+        file_path, written = _write_if_new(
+            payload, dataset_name, output_dir, run_timestamp, part, index_dir, bronze_format
+        )
+        event["written"] = written
+        event["bytes_written"] = file_path.stat().st_size if written else 0
+    return file_path, written
+
+
+def _write_if_new(
+    payload: dict[str, Any],
+    dataset_name: str,
+    output_dir: Path,
+    run_timestamp: str | None,
+    part: int | str | None,
+    index_dir: Path,
+    bronze_format: str,
+) -> tuple[Path, bool]:
+    digest = payload_digest(payload)
+    index_path = index_dir / f"{dataset_name}.json"
+    entries = _load_index(index_path)
+
+    for entry in reversed(entries):
+        if entry["sha256"] == digest and Path(entry["path"]).exists():
+            _record_pointer(index_dir, dataset_name, digest, entry["path"])
+            return Path(entry["path"]), False
+
+    timestamp = run_timestamp or datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    file_path = output_dir / f"{dataset_name}_{timestamp}{_part_suffix(part)}.{bronze_format}"
+
+    with _open_raw_file(file_path, "w") as f:
+        if bronze_format == "json":
+            json.dump(payload, f, indent=2)
+        else:
+            for line in _payload_lines(payload, dataset_name):
+                f.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+    entries.append(
+        {
+            "sha256": digest,
+            "path": str(file_path),
+            "written_at_utc": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+    _save_index(index_path, entries)
+    return file_path, True
+
+
+def write_quarantine(
+    entries: list[dict[str, Any]],
+    dataset_name: str,
+    contract_name: str,
+    output_dir: Path = QUARANTINE_DIR,
+    run_timestamp: str | None = None,
+    part: int | str | None = None,
+) -> Path:
+    """Write records rejected by record-level validation, with their errors.
+
+    Files land in `<output_dir>/<dataset>/` so bronze globs never read them.
+    """
+    timestamp = run_timestamp or datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    dataset_dir = output_dir / dataset_name
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    file_path = dataset_dir / f"{dataset_name}_{timestamp}{_part_suffix(part)}.json"
+    document = {
+        "dataset": dataset_name,
+        "contract": contract_name,
+        "quarantined_at_utc": datetime.now(timezone.utc).isoformat(),
+        "record_count": len(entries),
+        "records": entries,
+    }
+    with file_path.open("w") as f:
+        json.dump(document, f, indent=2)
+    return file_path
@@ -1,22 +1,166 @@
 import json
+from collections.abc import Callable
 from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 from jsonschema import Draft202012Validator
 
+from ingestion.common.metrics import timed
+
+Check = Callable[[Any], bool]
+
+# Keywords that never affect validity under Draft 2020-12 defaults.
+_ANNOTATION_KEYWORDS = {
+    "$schema",
+    "$id",
+    "$comment",
+    "title",
+    "description",
+    "format",
+    "default",
+    "examples",
+}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+_TYPE_CHECKS: dict[str, Check] = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+    "number": _is_number,
+    "integer": lambda value: (
+        isinstance(value, int) and not isinstance(value, bool)
+    ) or (isinstance(value, float) and value.is_integer()),
+}
+
 
 class ContractValidationError(ValueError):
     """Raised when a payload fails a data contract."""
 
 
 @lru_cache(maxsize=8)
-def _get_validator(contract_path: str) -> Draft202012Validator:
+def _load_schema(contract_path: str) -> dict[str, Any]:
     with Path(contract_path).open("r") as f:
         schema = json.load(f)
 
     Draft202012Validator.check_schema(schema)
-    return Draft202012Validator(schema)
+    return schema
+
+
+@lru_cache(maxsize=8)
+def _get_validator(contract_path: str) -> Draft202012Validator:
+    return Draft202012Validator(_load_schema(contract_path))
+
+
+def _json_scalar_equal(left: Any, right: Any) -> bool:
+    # JSON Schema keeps true and 1 distinct even though Python does not.
+    if isinstance(left, bool) or isinstance(right, bool):
+        return type(left) is type(right) and left == right
+    return left == right
+
+
+def _compile_schema(schema: dict[str, Any]) -> Check | None:
+    """Compile a JSON Schema subset into a single boolean check.
+
+    Returns None when the schema uses a keyword the fast path does not model,
+    in which case callers fall back to jsonschema.
+    """
+    checks: list[Check] = []
+    for keyword, value in schema.items():
+        if keyword in _ANNOTATION_KEYWORDS or keyword.startswith("x-"):
+            continue
+
+        if keyword == "type":
+            type_names = [value] if isinstance(value, str) else list(value)
+            if not set(type_names) <= set(_TYPE_CHECKS):
+                return None
+            type_checks = [_TYPE_CHECKS[name] for name in type_names]
+            if len(type_checks) == 1:
+                checks.append(type_checks[0])
+            else:
+                checks.append(lambda v, tc=type_checks: any(check(v) for check in tc))
+        elif keyword in {"const", "enum"}:
+            allowed = [value] if keyword == "const" else list(value)
+            if any(isinstance(item, (dict, list)) for item in allowed):
+                return None
+            checks.append(
+                lambda v, allowed=allowed: not isinstance(v, (dict, list))
+                and any(_json_scalar_equal(v, item) for item in allowed)
+            )
+        elif keyword == "required":
+            required = tuple(value)
+            checks.append(
+                lambda v, required=required: not isinstance(v, dict)
+                or all(key in v for key in required)
+            )
+        elif keyword == "properties":
+            property_checks = {}
+            for name, subschema in value.items():
+                compiled = _compile_schema(subschema)
+                if compiled is None:
+                    return None
+                property_checks[name] = compiled
+            checks.append(
+                lambda v, pc=property_checks: not isinstance(v, dict)
+                or all(check(v[name]) for name, check in pc.items() if name in v)
+            )
+        elif keyword == "additionalProperties":
+            if value is True:
+                continue
+            if value is not False:
+                return None
+            known = set(schema.get("properties", {}))
+            checks.append(lambda v, known=known: not isinstance(v, dict) or set(v) <= known)
+        elif keyword == "items":
+            item_check = _compile_schema(value) if isinstance(value, dict) else None
+            if item_check is None:
+                return None
+            checks.append(
+                lambda v, ic=item_check: not isinstance(v, list) or all(map(ic, v))
+            )
+        elif keyword in {"minItems", "maxItems"}:
+            bound = int(value)
+            compare = (lambda n, b=bound: n >= b) if keyword == "minItems" else (lambda n, b=bound: n <= b)
+            checks.append(lambda v, cmp=compare: not isinstance(v, list) or cmp(len(v)))
+        elif keyword in {"minLength", "maxLength"}:
+            bound = int(value)
+            compare = (lambda n, b=bound: n >= b) if keyword == "minLength" else (lambda n, b=bound: n <= b)
+            checks.append(lambda v, cmp=compare: not isinstance(v, str) or cmp(len(v)))
+        elif keyword in {"minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum"}:
+            compare = {
+                "minimum": lambda n, b=value: n >= b,
+                "maximum": lambda n, b=value: n <= b,
+                "exclusiveMinimum": lambda n, b=value: n > b,
+                "exclusiveMaximum": lambda n, b=value: n < b,
+            }[keyword]
+            checks.append(lambda v, cmp=compare: not _is_number(v) or cmp(v))
+        else:
+            return None
+
+    if len(checks) == 1:
+        return checks[0]
+    return lambda v: all(check(v) for check in checks)
+
+
+@lru_cache(maxsize=16)
+def _get_fast_check(contract_path: str, subschema_path: tuple[str, ...] = ()) -> Check | None:
+    schema = _load_schema(contract_path)
+    for key in subschema_path:
+        schema = schema[key]
+    return _compile_schema(schema)
+
+
+def _records_subschema_path(records_path: tuple[str, ...]) -> tuple[str, ...]:
+    subschema_path: list[str] = []
+    for key in records_path:
+        subschema_path.extend(["properties", key])
+    return (*subschema_path, "items")
 
 
 def validate_payload(
@@ -24,8 +168,26 @@ def validate_payload(
     contract_path: Path,
     dataset_name: str,
 ) -> None:
-    """Validate payload against a JSON Schema contract and raise on failure."""
-    validator = _get_validator(str(contract_path.resolve()))
+    """Validate payload against a JSON Schema contract and raise on failure.
+
+    A compiled fast path decides validity; jsonschema only runs to build the
+    error report when that check fails.
+    """
+    with timed("validate", contract=contract_path.name, mode="payload"):
+        _check_payload(payload, contract_path, dataset_name)
+
+
+def _check_payload(
+    payload: dict[str, Any],
+    contract_path: Path,
+    dataset_name: str,
+) -> None:
+    resolved_path = str(contract_path.resolve())
+    fast_check = _get_fast_check(resolved_path)
+    if fast_check is not None and fast_check(payload):
+        return
+
+    validator = _get_validator(resolved_path)
     errors = sorted(validator.iter_errors(payload), key=lambda err: list(err.absolute_path))
 
     if not errors:
@@ -46,3 +208,136 @@ def validate_payload(
         lines.append(f"- ... {len(errors) - 5} additional issue(s)")
 
     raise ContractValidationError("\n".join(lines))
+
+
+@lru_cache(maxsize=16)
+def _get_item_validator(
+    contract_path: str,
+    subschema_path: tuple[str, ...],
+) -> Draft202012Validator:
+    item_schema = _load_schema(contract_path)
+    for key in subschema_path:
+        item_schema = item_schema[key]
+    return Draft202012Validator(item_schema)
+
+
+def _with_records(
+    payload: dict[str, Any],
+    records_path: tuple[str, ...],
+    records: list[Any],
+) -> dict[str, Any]:
+    """Copy payload along records_path, swapping in a new record list."""
+    head, *rest = records_path
+    updated = dict(payload)
+    updated[head] = _with_records(payload[head], tuple(rest), records) if rest else records
+    return updated
+
+
+def split_valid_records(
+    payload: dict[str, Any],
+    contract_path: Path,
+    dataset_name: str,
+    records_path: tuple[str, ...] = ("result", "records"),
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Validate the envelope strictly and each record on its own.
+
+    Raises ContractValidationError when anything outside the record array
+    breaks the contract. Otherwise returns the payload keeping only valid
+    records, plus one `{"index", "record", "errors"}` entry per invalid record.
+    """
+    with timed("validate", contract=contract_path.name, mode="record") as event:
+        clean_payload, quarantined = _split_records(
+            payload, contract_path, dataset_name, records_path
+        )
+        event["quarantined_records"] = len(quarantined)
+    return clean_payload, quarantined
+
+
+def _split_records(
+    payload: dict[str, Any],
+    contract_path: Path,
+    dataset_name: str,
+    records_path: tuple[str, ...],
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    records: Any = payload
+    for key in records_path:
+        records = records.get(key) if isinstance(records, dict) else None
+    if not isinstance(records, list):
+        _check_payload(payload, contract_path, dataset_name)
+        return payload, []
+
+    _check_payload(_with_records(payload, records_path, []), contract_path, dataset_name)
+
+    resolved_path = str(contract_path.resolve())
+    subschema_path = _records_subschema_path(records_path)
+    fast_check = _get_fast_check(resolved_path, subschema_path)
+    valid_records = []
+    quarantined = []
+    for index, record in enumerate(records):
+        if fast_check is not None and fast_check(record):
+            valid_records.append(record)
+            continue
+        errors = sorted(
+            _get_item_validator(resolved_path, subschema_path).iter_errors(record),
+            key=lambda err: list(err.absolute_path),
+        )
+        if not errors:
+            valid_records.append(record)
+            continue
+        quarantined.append(
+            {
+                "index": index,
+                "record": record,
+                "errors": [
+                    (".".join(str(item) for item in err.absolute_path) or "<record>")
+                    + f": {err.message}"
+                    for err in errors
+                ],
+            }
+        )
+
+    return _with_records(payload, records_path, valid_records), quarantined
+
+
+def validate_records_batch(
+    records: list[dict[str, Any]],
+    contract_path: Path,
+    dataset_name: str,
+    records_path: tuple[str, ...] = ("result", "records"),
+) -> None:
+    """Validate a record array against the contract's item schema at records_path.
+
+    Uses the compiled per-record check; failing records are re-validated with
+    jsonschema to build the same style of report as validate_payload.
+    """
+    resolved_path = str(contract_path.resolve())
+    subschema_path = _records_subschema_path(records_path)
+    fast_check = _get_fast_check(resolved_path, subschema_path)
+    if fast_check is not None:
+        failed_indexes = [index for index, record in enumerate(records) if not fast_check(record)]
+    else:
+        failed_indexes = list(range(len(records)))
+    if not failed_indexes:
+        return
+
+    item_validator = _get_item_validator(resolved_path, subschema_path)
+    record_prefix = ".".join(records_path)
+    issues = []
+    for index in failed_indexes:
+        for err in sorted(item_validator.iter_errors(records[index]), key=lambda e: list(e.absolute_path)):
+            path = ".".join(str(item) for item in err.absolute_path)
+            issues.append((f"{record_prefix}.{index}" + (f".{path}" if path else ""), err.message))
+    if not issues:
+        return
+
+    lines = [
+        (
+            f"{dataset_name} records failed contract "
+            f"{contract_path.name} with {len(issues)} issue(s):"
+        )
+    ]
+    lines.extend(f"- {path}: {message}" for path, message in issues[:5])
+    if len(issues) > 5:
+        lines.append(f"- ... {len(issues) - 5} additional issue(s)")
+
+    raise ContractValidationError("\n".join(lines))
@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+METRICS_PATH = Path("data/metrics/ingest_run_metrics.jsonl")
+
+_lock = threading.Lock()
+_active_run: "IngestRunMetrics | None" = None
+
+
+class IngestRunMetrics:
+    """Timings and byte counts collected during one ingestion run."""
+
+    def __init__(self, dataset: str):
+        self.dataset = dataset
+        self.run_id = uuid.uuid4().hex
+        self.events: list[dict[str, Any]] = []
+
+    def add(self, event: dict[str, Any]) -> None:
+        with _lock:
+            self.events.append({"run_id": self.run_id, "dataset": self.dataset, **event})
+
+    def write(self, path: Path) -> Path:
+        """Append this run's events to a JSON-lines sink."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a") as f:
+            for event in self.events:
+                f.write(json.dumps(event, default=str) + "\n")
+        return path
+
+
+def metrics_path_from_config(config: dict) -> Path | None:
+    """Sink path from the optional `metrics` config block; None when disabled."""
+    metrics_config = config.get("metrics") or {}
+    if not metrics_config.get("enabled"):
+        return None
+    return Path(metrics_config.get("path", METRICS_PATH))
+
+
+@contextmanager
+def timed(stage: str, **fields: Any) -> Iterator[dict[str, Any]]:
+    """Time a stage of the active run; callers may add fields to the yielded event.
+
+    Outside `collect_run_metrics` this only measures, so instrumented helpers
+    cost nothing extra when called from tests or other code.
+    """
+    event: dict[str, Any] = {
+        "stage": stage,
+        "started_at_utc": datetime.now(timezone.utc).isoformat(),
+        **fields,
+    }
+    start = time.perf_counter()
+    try:
+        yield event
+    except BaseException as exc:
+        event["status"] = "error"
+        event["error"] = type(exc).__name__
+        raise
+    else:
+        event.setdefault("status", "ok")
+    finally:
+        event["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        run = _active_run
+        if run is not None:
+            run.add(event)
+
+
+@contextmanager
+def collect_run_metrics(dataset: str, path: Path | None = METRICS_PATH) -> Iterator[IngestRunMetrics]:
+    """Collect events from every `timed` stage until the run ends, then write them.
+
+    A closing `run` event carries the total duration and whether the run failed.
+    Events are still written when the run raises.
+    """
+    global _active_run
+    run = IngestRunMetrics(dataset)
+    previous_run, _active_run = _active_run, run
+    try:
+        with timed("run"):
+            yield run
+    finally:
+        _active_run = previous_run
+        if path is not None:
+            run.write(path)
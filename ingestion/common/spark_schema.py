@@ -0,0 +1,180 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+CONTRACTS_DIR = PROJECT_ROOT / "data-contracts"
+SPARK_SCHEMAS_DIR = CONTRACTS_DIR / "spark"
+
+# JSON types Spark reads without loss. A field that may be a number or a
+# string is read as a string and cast by the silver transform.
+_SCALAR_TYPES = {
+    "string": "string",
+    "integer": "long",
+    "number": "double",
+    "boolean": "boolean",
+}
+
+# Fields silver reads that the contracts leave undeclared. They only extend the
+# Spark read schemas; ingestion keeps validating against the contracts as they
+# are. Declared properties win over these.
+_MEASURE = {"type": ["number", "string", "null"]}
+WEATHER_READ_PROPERTIES = {
+    "id": {"type": "integer"},
+    "main": {"type": "object", "properties": {"pressure": {"type": "number"}}},
+    "coord": {
+        "type": "object",
+        "properties": {"lat": {"type": "number"}, "lon": {"type": "number"}},
+    },
+    "sys": {"type": "object", "properties": {"country": {"type": "string"}}},
+}
+# Measures arrive as numbers or numeric strings.
+ENERGY_READ_PROPERTIES = {
+    "result": {
+        "type": "object",
+        "properties": {
+            "records": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "Timestamp": {"type": "string"},
+                        **{
+                            measure: _MEASURE
+                            for measure in (
+                                "Demand", "Generation", "Import", "Solar", "Wind", "STOR", "Other"
+                            )
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+def _with_read_schema(declared: dict[str, Any] | None, read_schema: dict[str, Any]) -> dict:
+    if declared is None:
+        return read_schema
+    if "properties" in read_schema:
+        return _with_read_properties(declared, read_schema["properties"])
+    if "items" in read_schema and isinstance(declared.get("items"), dict):
+        return {**declared, "items": _with_read_schema(declared["items"], read_schema["items"])}
+    return declared
+
+
+def _with_read_properties(schema: dict[str, Any], read_properties: dict[str, Any]) -> dict:
+    """Copy of an object schema with read_properties added where it declares none."""
+    properties = dict(schema.get("properties") or {})
+    for name, read_schema in read_properties.items():
+        properties[name] = _with_read_schema(properties.get(name), read_schema)
+    return {**schema, "properties": properties}
+
+
+def _spark_type(schema: dict[str, Any], path: str) -> Any:
+    type_names = schema.get("type")
+    type_names = [type_names] if isinstance(type_names, str) else list(type_names or [])
+    type_names = [name for name in type_names if name != "null"]
+
+    if type_names == ["object"]:
+        return struct_type(schema, path)
+    if type_names == ["array"]:
+        if not isinstance(schema.get("items"), dict):
+            raise ValueError(f"{path}: arrays need an items schema to map to Spark.")
+        return {
+            "type": "array",
+            "elementType": _spark_type(schema["items"], f"{path}[]"),
+            "containsNull": True,
+        }
+    if "string" in type_names and set(type_names) <= set(_SCALAR_TYPES):
+        return "string"
+    if set(type_names) == {"integer", "number"}:
+        return "double"
+    if len(type_names) == 1 and type_names[0] in _SCALAR_TYPES:
+        return _SCALAR_TYPES[type_names[0]]
+    raise ValueError(f"{path}: no Spark type for JSON Schema type {schema.get('type')!r}.")
+
+
+def struct_type(schema: dict[str, Any], path: str = "$") -> dict[str, Any]:
+    """Spark StructType JSON (as StructType.jsonValue()) for an object schema.
+
+    Only declared properties become fields, all nullable; additional
+    properties are not read.
+    """
+    properties = schema.get("properties")
+    if not properties:
+        raise ValueError(f"{path}: objects need declared properties to map to Spark.")
+    return {
+        "type": "struct",
+        "fields": [
+            {
+                "name": name,
+                "type": _spark_type(subschema, f"{path}.{name}"),
+                "nullable": True,
+                "metadata": {},
+            }
+            for name, subschema in properties.items()
+        ],
+    }
+
+
+def _load_contract(contract_name: str, contracts_dir: Path) -> dict[str, Any]:
+    with (contracts_dir / contract_name).open("r") as f:
+        return json.load(f)
+
+
+def build_spark_schemas(contracts_dir: Path = CONTRACTS_DIR) -> dict[str, dict[str, Any]]:
+    """Read schemas for every bronze layout, keyed by output file name.
+
+    Weather JSON and NDJSON hold the same document. Energy JSON nests records
+    under result.records; energy NDJSON has one record per line plus
+    `_resource_id`.
+    """
+    weather = _with_read_properties(
+        _load_contract("weather_schema.json", contracts_dir), WEATHER_READ_PROPERTIES
+    )
+    energy = _with_read_properties(
+        _load_contract("energy_schema.json", contracts_dir), ENERGY_READ_PROPERTIES
+    )
+    energy_record = energy["properties"]["result"]["properties"]["records"]["items"]
+    energy_ndjson_record = _with_read_properties(
+        energy_record, {"_resource_id": {"type": "string"}}
+    )
+    return {
+        "weather_schema.json": struct_type(weather),
+        "energy_schema.json": struct_type(energy),
+        "energy_ndjson_schema.json": struct_type(energy_ndjson_record, "$.result.records[]"),
+    }
+
+
+def write_spark_schemas(
+    contracts_dir: Path = CONTRACTS_DIR,
+    output_dir: Path = SPARK_SCHEMAS_DIR,
+) -> list[Path]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for file_name, schema in build_spark_schemas(contracts_dir).items():
+        output_path = output_dir / file_name
+        output_path.write_text(json.dumps(schema, indent=2) + "\n")
+        written.append(output_path)
+    return written
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Generate Spark read schemas for bronze JSON from data-contracts."
+    )
+    parser.add_argument("--contracts-dir", type=Path, default=CONTRACTS_DIR)
+    parser.add_argument("--output-dir", type=Path, default=SPARK_SCHEMAS_DIR)
+    args = parser.parse_args(argv)
+    for output_path in write_spark_schemas(args.contracts_dir, args.output_dir):
+        print(f"Wrote {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+WATERMARK_KEYS = ("_id", "Timestamp")
+
+
+def load_watermarks(state_path: Path) -> dict[str, dict[str, Any]]:
+    """Load the per-resource high-water marks; a missing file means no marks yet."""
+    if not state_path.exists():
+        return {}
+    with state_path.open("r") as f:
+        return json.load(f)
+
+
+def get_watermark(state_path: Path, resource_id: str) -> dict[str, Any] | None:
+    return load_watermarks(state_path).get(resource_id)
+
+
+def save_watermark(
+    state_path: Path,
+    resource_id: str,
+    records: list[dict[str, Any]],
+) -> dict[str, Any] | None:
+    """Advance the mark for resource_id to the newest of records and persist it.
+
+    The state file is replaced atomically so an interrupted run keeps the old mark.
+    """
+    if not records:
+        return None
+
+    watermarks = load_watermarks(state_path)
+    previous = watermarks.get(resource_id, {})
+    timestamps = [record["Timestamp"] for record in records if record.get("Timestamp")]
+    watermark = {
+        "last_id": max([record["_id"] for record in records] + [previous.get("last_id", 0)]),
+        "last_timestamp": max(timestamps + [previous.get("last_timestamp") or ""]) or None,
+        "updated_at_utc": datetime.now(timezone.utc).isoformat(),
+    }
+    watermarks[resource_id] = watermark
+
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state_path.with_name(f".{state_path.name}.tmp")
+    with tmp_path.open("w") as f:
+        json.dump(watermarks, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+    return watermark
+
+
+def newest_records(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """The records save_watermark reads the mark from: newest by _id and by Timestamp.
+
+    Lets a long run carry its mark forward page by page without keeping every record.
+    """
+    if not records:
+        return []
+    newest = [max(records, key=lambda record: record["_id"])]
+    timestamped = [record for record in records if record.get("Timestamp")]
+    if timestamped:
+        newest.append(max(timestamped, key=lambda record: record["Timestamp"]))
+    return newest
+
+
+def is_after_watermark(record: dict[str, Any], watermark: dict[str, Any] | None, key: str) -> bool:
+    """True when record is newer than the mark on key (`_id` or `Timestamp`)."""
+    if key not in WATERMARK_KEYS:
+        raise ValueError(f"Watermark key must be one of: {', '.join(WATERMARK_KEYS)}")
+    if watermark is None:
+        return True
+    if key == "_id":
+        return record["_id"] > watermark["last_id"]
+    # NGED timestamps share one ISO-8601 layout, so string order is time order.
+    mark = watermark.get("last_timestamp")
+    return mark is None or str(record.get("Timestamp", "")) > mark
@@ -1,19 +1,31 @@
-import json
 import os
 import sys
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
 
-import requests
 import yaml
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from ingestion.common.contract_validator import validate_payload
+from ingestion.common.api_client import HttpClientSettings, get_json, get_session
+from ingestion.common.bronze_store import write_quarantine, write_raw_payload
+from ingestion.common.contract_validator import split_valid_records, validate_payload
+from ingestion.common.metrics import collect_run_metrics, metrics_path_from_config
+from ingestion.common.watermark import (
+    get_watermark,
+    is_after_watermark,
+    newest_records,
+    save_watermark,
+)
 
 ENERGY_CONTRACT_PATH = PROJECT_ROOT / "data-contracts" / "energy_schema.json"
+RAW_DIR = Path("data/raw/energy")
+WATERMARK_STATE_PATH = Path("data/state/energy_watermarks.json")
+VALIDATION_MODES = ("payload", "record")
 
 
 def load_config(config_path: Path | None = None):
@@ -46,44 +58,242 @@ def build_headers(api_config: dict) -> dict:
     return headers
 
 
-def fetch_energy(config: dict) -> dict:
+def fetch_energy(
+    config: dict,
+    offset: int | None = None,
+    extra_params: dict | None = None,
+) -> dict:
     """Fetch electricity demand data from the UK National Grid ESO API."""
     api_config = config["api"]
     base_url = api_config["base_url"].rstrip("/")
     endpoint = api_config["endpoint"].lstrip("/")
     url = f"{base_url}/{endpoint}"
-    params = api_config.get("params", {})
+    params = dict(api_config.get("params", {}))
+    params.update(extra_params or {})
+    if offset is not None:
+        params["offset"] = offset
     headers = build_headers(api_config)
     timeout_seconds = api_config.get("timeout_seconds", 30)
+    session = get_session(HttpClientSettings.from_config(api_config))
 
-    response = requests.get(
+    return get_json(
         url,
         params=params,
         headers=headers,
         timeout=timeout_seconds,
+        session=session,
     )
-    response.raise_for_status()
-    return response.json()
 
 
-def save_raw_data(data: dict):
-    """Save raw energy JSON to a timestamped file."""
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    output_dir = Path("data/raw/energy")
-    output_dir.mkdir(parents=True, exist_ok=True)
-    file_path = output_dir / f"energy_{timestamp}.json"
+def iter_energy_pages(config: dict) -> Iterator[tuple[int, dict]]:
+    """Yield (part, page) for every datastore_search page as soon as it arrives.
 
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=2)
+    `result.total` is read from the first page (part 0); the remaining offsets
+    are requested on a bounded thread pool, at most 2 * max_workers ahead of
+    the caller, so a long backfill never holds more than that many pages.
+    Pages arrive out of order; part is the page's position in offset order.
+    A page that still fails after its retries stops new requests; the pages
+    already in flight are yielded, then its error is raised.
+    """
+    backfill_config = config.get("backfill") or {}
+    max_workers = int(backfill_config.get("max_workers", 4))
+    max_pages = backfill_config.get("max_pages")
+    if max_workers < 1:
+        raise ValueError("backfill.max_workers must be at least 1.")
 
-    print(f"Saved raw energy data to {file_path}")
+    start_offset = int(config["api"].get("params", {}).get("offset", 0))
+    first_page = fetch_energy(config, offset=start_offset)
+    result = first_page.get("result", {})
+    page_size = int(result.get("limit") or config["api"].get("params", {}).get("limit", 100))
+    total = int(result.get("total", 0))
+    yield 0, first_page
+
+    offsets = range(start_offset + page_size, total, page_size)
+    if max_pages is not None:
+        offsets = offsets[: max(int(max_pages) - 1, 0)]
+    pending = enumerate(offsets, start=1)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+
+        def submit_next():
+            next_page = next(pending, None)
+            if next_page is not None:
+                part, offset = next_page
+                in_flight[executor.submit(fetch_energy, config, offset)] = part
+
+        for _ in range(2 * max_workers):
+            submit_next()
+        failed = None
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=in_flight.get):
+                part = in_flight.pop(future)
+                if future.exception() is not None:
+                    failed = failed or future
+                    continue
+                # After a failure nothing new is requested; pages in flight still land.
+                if failed is None:
+                    submit_next()
+                yield part, future.result()
+        if failed is not None:
+            failed.result()
+
+
+def fetch_energy_incremental(config: dict, watermark: dict | None) -> dict:
+    """Fetch only records newer than the stored high-water mark.
+
+    datastore_search has no range filter, so pages are read newest-first
+    (`sort=<key> desc`) until a record at or below the mark is reached. Without
+    a mark a single page of the newest records is fetched. The returned payload
+    keeps the first page's envelope with records in ascending order.
+    """
+    incremental_config = config.get("incremental") or {}
+    key = incremental_config.get("key", "_id")
+    max_pages = int(incremental_config.get("max_pages", 10))
+    page_size = int(
+        incremental_config.get("page_size")
+        or config["api"].get("params", {}).get("limit", 100)
+    )
+    extra_params = {"sort": f"{key} desc", "limit": page_size}
+
+    first_page = None
+    new_records = []
+    for page_number in range(max_pages):
+        page = fetch_energy(config, offset=page_number * page_size, extra_params=extra_params)
+        first_page = first_page or page
+        records = page.get("result", {}).get("records", [])
+        fresh_records = [record for record in records if is_after_watermark(record, watermark, key)]
+        new_records.extend(fresh_records)
+
+        reached_mark = len(fresh_records) < len(records)
+        if watermark is None or reached_mark or len(records) < page_size:
+            break
+    else:
+        print(
+            f"Stopped after incremental.max_pages={max_pages}; "
+            "older records beyond the watermark gap are not fetched."
+        )
+
+    payload = dict(first_page)
+    payload["result"] = dict(first_page.get("result", {}))
+    payload["result"]["records"] = sorted(new_records, key=lambda record: record["_id"])
+    return payload
+
+
+def save_raw_data(
+    data: dict,
+    run_timestamp: str | None = None,
+    part: int | None = None,
+    bronze_format: str = "json",
+):
+    """Save raw energy JSON to a timestamped file, one file per page when paged.
+
+    A payload identical to a recently stored one is not written again.
+    """
+    file_path, written = write_raw_payload(
+        data,
+        "energy",
+        RAW_DIR,
+        run_timestamp=run_timestamp,
+        part=part,
+        bronze_format=bronze_format,
+    )
+    if written:
+        print(f"Saved raw energy data to {file_path}")
+    else:
+        print(f"Energy payload unchanged; recorded pointer to {file_path}")
+
+
+def apply_contract_gate(payload: dict, validation_mode: str) -> tuple[dict, list[dict]]:
+    """Validate a page in `payload` or `record` mode.
+
+    Payload mode rejects the whole page on any violation. Record mode still
+    rejects a broken envelope but only drops the failing records, returning
+    them with their errors for quarantine.
+    """
+    if validation_mode not in VALIDATION_MODES:
+        raise ValueError(f"validation.mode must be one of: {', '.join(VALIDATION_MODES)}")
+    if validation_mode == "record":
+        return split_valid_records(payload, ENERGY_CONTRACT_PATH, "energy")
+    validate_payload(payload, ENERGY_CONTRACT_PATH, "energy")
+    return payload, []
+
+
+def save_quarantine(
+    entries: list[dict],
+    run_timestamp: str | None = None,
+    part: int | None = None,
+) -> int:
+    """Write quarantined records next to bronze and return how many there were."""
+    if not entries:
+        return 0
+    file_path = write_quarantine(
+        entries,
+        "energy",
+        ENERGY_CONTRACT_PATH.name,
+        run_timestamp=run_timestamp,
+        part=part,
+    )
+    print(f"Quarantined {len(entries)} energy record(s) to {file_path}")
+    return len(entries)
 
 
 def main():
     config = load_config()
-    energy_data = fetch_energy(config)
-    validate_payload(energy_data, ENERGY_CONTRACT_PATH, "energy")
-    save_raw_data(energy_data)
+    with collect_run_metrics("energy", metrics_path_from_config(config)):
+        incremental_config = config.get("incremental") or {}
+        state_path = Path(incremental_config.get("state_path", WATERMARK_STATE_PATH))
+        resource_id = config["api"].get("params", {}).get("resource_id")
+        bronze_format = config.get("bronze_format", "json")
+        validation_mode = (config.get("validation") or {}).get("mode", "payload")
+        run_timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+
+        if (config.get("backfill") or {}).get("enabled"):
+            # Each page is gated and written as it arrives, so a failed page leaves
+            # the ones before it in bronze; unchanged pages are not written twice.
+            quarantined_count = 0
+            watermark_records = []
+            for part, page in iter_energy_pages(config):
+                page_data, quarantined = apply_contract_gate(page, validation_mode)
+                quarantined_count += save_quarantine(quarantined, run_timestamp, part)
+                save_raw_data(
+                    page_data,
+                    run_timestamp=run_timestamp,
+                    part=part,
+                    bronze_format=bronze_format,
+                )
+                watermark_records = newest_records(
+                    [*watermark_records, *page["result"]["records"]]
+                )
+            if validation_mode == "record":
+                print(f"Energy run quarantined {quarantined_count} record(s).")
+            if incremental_config.get("enabled"):
+                save_watermark(state_path, resource_id, watermark_records)
+            return
+
+        if incremental_config.get("enabled"):
+            watermark = get_watermark(state_path, resource_id)
+            fetched_data = fetch_energy_incremental(config, watermark)
+            energy_data, quarantined = apply_contract_gate(fetched_data, validation_mode)
+            fetched_records = fetched_data["result"]["records"]
+            if not fetched_records:
+                print(f"No new energy records for {resource_id} since {watermark}.")
+                return
+            save_quarantine(quarantined, run_timestamp)
+            if energy_data["result"]["records"]:
+                save_raw_data(energy_data, run_timestamp=run_timestamp, bronze_format=bronze_format)
+            if validation_mode == "record":
+                print(f"Energy run quarantined {len(quarantined)} record(s).")
+            # Quarantined records are kept with their errors, so the mark moves past them too.
+            save_watermark(state_path, resource_id, fetched_records)
+            return
+
+        energy_data, quarantined = apply_contract_gate(fetch_energy(config), validation_mode)
+        save_quarantine(quarantined, run_timestamp)
+        save_raw_data(energy_data, run_timestamp=run_timestamp, bronze_format=bronze_format)
+        if validation_mode == "record":
+            print(f"Energy run quarantined {len(quarantined)} record(s).")
 
 
 if __name__ == "__main__":
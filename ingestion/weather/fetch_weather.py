@@ -1,19 +1,28 @@
-import json
+import asyncio
 import os
+import re
 import sys
 from datetime import datetime
 from pathlib import Path
 
-import requests
 import yaml
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from ingestion.common.api_client import (
+    AsyncRateLimiter,
+    HttpClientSettings,
+    get_json,
+    get_session,
+)
+from ingestion.common.bronze_store import write_raw_payload
 from ingestion.common.contract_validator import validate_payload
+from ingestion.common.metrics import collect_run_metrics, metrics_path_from_config
 
 WEATHER_CONTRACT_PATH = PROJECT_ROOT / "data-contracts" / "weather_schema.json"
+RAW_DIR = Path("data/raw/weather")
 
 
 def load_config():
@@ -42,43 +51,105 @@ def get_api_key(config):
     return api_key
 
 
-def fetch_weather(config):
+def fetch_weather(config, city=None):
     """Fetch current weather data from OpenWeather API."""
     url = f"{config['api']['base_url']}/weather"
     api_key = get_api_key(config)
 
     params = {
-        "q": config["api"]["city"],
+        "q": city or config["api"]["city"],
         "appid": api_key,
         "units": config["api"]["units"],
     }
 
-    response = requests.get(url, params=params, timeout=30)
-    response.raise_for_status()  # fail fast if API call breaks
+    session = get_session(HttpClientSettings.from_config(config["api"]))
 
-    return response.json()
+    # Transient 429/5xx responses are retried; anything left still fails fast.
+    return get_json(url, params=params, timeout=30, session=session)
 
 
-def save_raw_data(data):
-    """Save raw weather JSON to a timestamped file."""
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+async def _fetch_cities_async(config, cities):
+    api_config = config["api"]
+    limiter = AsyncRateLimiter(api_config.get("requests_per_minute", 60))
+    semaphore = asyncio.Semaphore(api_config.get("max_concurrency", 8))
 
-    output_dir = Path("data/raw/weather")
-    output_dir.mkdir(parents=True, exist_ok=True)
+    async def fetch_city(city):
+        async with semaphore:
+            await limiter.acquire()
+            return await asyncio.to_thread(fetch_weather, config, city)
 
-    file_path = output_dir / f"weather_{timestamp}.json"
+    return await asyncio.gather(*(fetch_city(city) for city in cities), return_exceptions=True)
 
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=2)
 
-    print(f"Saved raw weather data to {file_path}")
+def fetch_weather_cities(config):
+    """Fetch every configured city concurrently within the requests-per-minute budget.
+
+    Results keep city order; a city that failed holds its exception instead of
+    a payload, so one bad city does not cost the others.
+    """
+    cities = config["api"]["cities"]
+    return asyncio.run(_fetch_cities_async(config, cities))
+
+
+def city_slug(city):
+    """Filename-safe suffix for a city query such as `London,GB`."""
+    return re.sub(r"[^a-z0-9]+", "-", city.lower()).strip("-")
+
+
+def save_raw_data(data, run_timestamp=None, part=None, bronze_format="json"):
+    """Save raw weather JSON to a timestamped file, one file per city when fanned out.
+
+    OpenWeather often repeats the same observation across polls; an identical
+    payload is recorded as a pointer instead of a new file.
+    """
+    file_path, written = write_raw_payload(
+        data,
+        "weather",
+        RAW_DIR,
+        run_timestamp=run_timestamp,
+        part=part,
+        bronze_format=bronze_format,
+    )
+    if written:
+        print(f"Saved raw weather data to {file_path}")
+    else:
+        print(f"Weather payload unchanged; recorded pointer to {file_path}")
 
 
 def main():
     config = load_config()
-    weather_data = fetch_weather(config)
-    validate_payload(weather_data, WEATHER_CONTRACT_PATH, "weather")
-    save_raw_data(weather_data)
+    with collect_run_metrics("weather", metrics_path_from_config(config)):
+        cities = config["api"].get("cities")
+        bronze_format = config.get("bronze_format", "json")
+        if cities:
+            run_timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+            failures = {}
+            for city, result in zip(cities, fetch_weather_cities(config)):
+                if isinstance(result, Exception):
+                    failures[city] = result
+                    continue
+                try:
+                    validate_payload(result, WEATHER_CONTRACT_PATH, "weather")
+                except ValueError as exc:
+                    failures[city] = exc
+                    continue
+                save_raw_data(
+                    result,
+                    run_timestamp=run_timestamp,
+                    part=city_slug(city),
+                    bronze_format=bronze_format,
+                )
+            if failures:
+                # Every city that validated is already written; fail the run once for the rest.
+                details = "; ".join(f"{city}: {exc}" for city, exc in failures.items())
+                raise RuntimeError(
+                    f"Weather failed for {len(failures)} of {len(cities)} cities: {details}"
+                ) from next(iter(failures.values()))
+            return
+
+        weather_data = fetch_weather(config)
+        validate_payload(weather_data, WEATHER_CONTRACT_PATH, "weather")
+        save_raw_data(weather_data, bronze_format=bronze_format)
 
 
 if __name__ == "__main__":
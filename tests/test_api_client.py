@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from urllib3.util.retry import RequestHistory, Retry
+
+from ingestion.common import api_client
+from ingestion.common.metrics import collect_run_metrics
+
+
+class _FakeRaw:
+    def __init__(self, retries):
+        self.retries = retries
+
+
+class _FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload, retries=None):
+        self._payload = payload
+        self.content = json.dumps(payload).encode("utf-8")
+        self.raw = _FakeRaw(retries)
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._payload
+
+
+class _FakeSession:
+    def __init__(self, payload, retries=None):
+        self.payload = payload
+        self.retries = retries
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return _FakeResponse(self.payload, self.retries)
+
+
+def test_session_pools_connections_and_retries_transient_statuses():
+    settings = api_client.HttpClientSettings(max_retries=5, pool_maxsize=3)
+    session = api_client.build_session(settings)
+    adapter = session.get_adapter("https://api.openweathermap.org/data/2.5/weather")
+    retry = adapter.max_retries
+
+    assert adapter._pool_maxsize == 3
+    assert adapter._pool_block is True
+    assert retry.total == 5
+    assert retry.respect_retry_after_header is True
+    assert retry.backoff_jitter == settings.backoff_jitter_seconds
+    assert {429, 500, 503}.issubset(retry.status_forcelist)
+    assert retry.allowed_methods == frozenset({"GET"})
+
+
+def test_settings_from_config_reads_http_block():
+    settings = api_client.HttpClientSettings.from_config(
+        {"http": {"max_retries": 1, "backoff_factor": 2.0}}
+    )
+
+    assert settings.max_retries == 1
+    assert settings.backoff_factor == 2.0
+    assert api_client.HttpClientSettings.from_config({}) == api_client.HttpClientSettings()
+
+
+def test_settings_from_config_rejects_unknown_keys():
+    with pytest.raises(ValueError, match="retries"):
+        api_client.HttpClientSettings.from_config({"http": {"retries": 3}})
+
+
+def test_get_json_uses_supplied_session():
+    session = _FakeSession({"ok": True})
+
+    payload = api_client.get_json(
+        "https://example.test/api",
+        params={"limit": 1},
+        timeout=5,
+        session=session,
+    )
+
+    assert payload == {"ok": True}
+    assert session.calls == [
+        ("https://example.test/api", {"params": {"limit": 1}, "headers": None, "timeout": 5})
+    ]
+
+
+def test_get_json_records_fetch_metrics_for_the_active_run(tmp_path):
+    retries = Retry(total=3, history=(RequestHistory("GET", "/api", None, 503, None),))
+    session = _FakeSession({"ok": True}, retries=retries)
+    metrics_path = tmp_path / "metrics.jsonl"
+
+    with collect_run_metrics("weather", metrics_path) as run:
+        api_client.get_json("https://example.test/api", params={"offset": 2}, session=session)
+
+    fetch_event, run_event = [json.loads(line) for line in metrics_path.read_text().splitlines()]
+    assert fetch_event["run_id"] == run_event["run_id"] == run.run_id
+    assert fetch_event["stage"] == "fetch"
+    assert fetch_event["dataset"] == "weather"
+    assert fetch_event["offset"] == 2
+    assert fetch_event["retries"] == 1
+    assert fetch_event["response_bytes"] == len(b'{"ok": true}')
+    assert fetch_event["duration_ms"] >= 0
+    assert run_event["stage"] == "run"
+    assert run_event["status"] == "ok"
@@ -0,0 +1,134 @@
+import gzip
+import json
+
+import pytest
+
+from ingestion.common.bronze_store import (
+    list_raw_files,
+    payload_digest,
+    read_raw_payload,
+    write_raw_payload,
+)
+
+
+def test_payload_digest_ignores_key_order():
+    assert payload_digest({"a": 1, "b": [1, 2]}) == payload_digest({"b": [1, 2], "a": 1})
+    assert payload_digest({"a": 1}) != payload_digest({"a": 2})
+
+
+def test_unchanged_payload_records_pointer_instead_of_new_file(tmp_path):
+    raw_dir = tmp_path / "raw" / "weather"
+    index_dir = tmp_path / "state" / "bronze_index"
+    payload = {"dt": 1738800000, "name": "London"}
+
+    first_path, first_written = write_raw_payload(
+        payload, "weather", raw_dir, run_timestamp="20260208_120000", index_dir=index_dir
+    )
+    second_path, second_written = write_raw_payload(
+        dict(payload), "weather", raw_dir, run_timestamp="20260208_130000", index_dir=index_dir
+    )
+
+    assert first_written and not second_written
+    assert second_path == first_path == raw_dir / "weather_20260208_120000.json"
+    assert [path.name for path in raw_dir.iterdir()] == ["weather_20260208_120000.json"]
+    pointers = (index_dir / "weather_pointers.jsonl").read_text().splitlines()
+    assert json.loads(pointers[0])["path"] == str(first_path)
+
+
+def test_changed_payload_is_written_with_part_suffix(tmp_path):
+    raw_dir = tmp_path / "raw" / "energy"
+    index_dir = tmp_path / "state"
+
+    write_raw_payload({"page": 0}, "energy", raw_dir, "20260208_120000", part=0, index_dir=index_dir)
+    path, written = write_raw_payload(
+        {"page": 1}, "energy", raw_dir, "20260208_120000", part=1, index_dir=index_dir
+    )
+
+    assert written
+    assert path.name == "energy_20260208_120000_00001.json"
+    assert len(json.loads((index_dir / "energy.json").read_text())) == 2
+
+
+def _energy_payload() -> dict:
+    return {
+        "help": "https://connecteddata.nationalgrid.co.uk/",
+        "success": True,
+        "result": {
+            "resource_id": "resource-123",
+            "records": [
+                {"_id": 1, "Timestamp": "2025-08-23T22:50:00", "Demand": 2437.38},
+                {"_id": 2, "Timestamp": "2025-08-23T22:55:00", "Demand": 2422.62},
+            ],
+            "limit": 1000,
+            "total": 2,
+        },
+    }
+
+
+def test_energy_ndjson_gz_writes_one_record_per_line_and_reads_back(tmp_path):
+    raw_dir = tmp_path / "raw" / "energy"
+
+    path, _ = write_raw_payload(
+        _energy_payload(),
+        "energy",
+        raw_dir,
+        run_timestamp="20260208_120000",
+        index_dir=tmp_path / "state",
+        bronze_format="ndjson.gz",
+    )
+
+    assert path.name == "energy_20260208_120000.ndjson.gz"
+    with gzip.open(path, "rt") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["_id"] for line in lines] == [1, 2]
+    assert lines[0]["_resource_id"] == "resource-123"
+
+    payload = read_raw_payload(path)
+    assert payload["result"]["resource_id"] == "resource-123"
+    assert payload["result"]["records"] == _energy_payload()["result"]["records"]
+
+
+def test_list_raw_files_includes_every_bronze_format(tmp_path):
+    for name in ["weather_1.json", "weather_2.ndjson.gz", "weather_3.ndjson.zst", "notes.txt"]:
+        (tmp_path / name).write_text("")
+
+    assert [path.name for path in list_raw_files(tmp_path)] == [
+        "weather_1.json",
+        "weather_2.ndjson.gz",
+        "weather_3.ndjson.zst",
+    ]
+
+
+def test_write_raw_payload_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="bronze_format"):
+        write_raw_payload({}, "weather", tmp_path, bronze_format="parquet")
+
+
+def test_weather_ndjson_zst_round_trip(tmp_path):
+    pytest.importorskip("zstandard")
+    payload = {"dt": 1738800000, "name": "London"}
+
+    path, _ = write_raw_payload(
+        payload, "weather", tmp_path, index_dir=tmp_path / "state", bronze_format="ndjson.zst"
+    )
+
+    assert read_raw_payload(path) == payload
+
+
+def test_empty_weather_ndjson_file_raises_a_clear_error(tmp_path):
+    raw_file = tmp_path / "weather_20260207_090000.ndjson.gz"
+    with gzip.open(raw_file, "wt") as f:
+        f.write("\n")
+
+    with pytest.raises(ValueError, match="holds no JSON document"):
+        read_raw_payload(raw_file)
+
+
+def test_read_raw_payload_accepts_documents_orjson_rejects(tmp_path):
+    raw_file = tmp_path / "weather_20260208_120000.json"
+    raw_file.write_text('{"main": {"temp": NaN}, "id": 123456789012345678901234567890}')
+
+    payload = read_raw_payload(raw_file)
+
+    assert payload["id"] == 123456789012345678901234567890
+    assert payload["main"]["temp"] != payload["main"]["temp"]
@@ -2,7 +2,13 @@ from pathlib import Path
 
 import pytest
 
-from ingestion.common.contract_validator import ContractValidationError, validate_payload
+from ingestion.common import contract_validator
+from ingestion.common.contract_validator import (
+    ContractValidationError,
+    split_valid_records,
+    validate_payload,
+    validate_records_batch,
+)
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 WEATHER_CONTRACT = PROJECT_ROOT / "data-contracts" / "weather_schema.json"
@@ -60,3 +66,84 @@ def test_energy_contract_rejects_invalid_success_flag():
 
     with pytest.raises(ContractValidationError, match="success"):
         validate_payload(payload, ENERGY_CONTRACT, "energy")
+
+
+def _mutations() -> list:
+    weather_missing_main_temp = _valid_weather_payload()
+    weather_missing_main_temp["main"].pop("temp")
+    weather_bool_cod = _valid_weather_payload()
+    weather_bool_cod["cod"] = True
+    weather_float_dt = _valid_weather_payload()
+    weather_float_dt["dt"] = 1738800000.0
+    weather_empty_summary = _valid_weather_payload()
+    weather_empty_summary["weather"] = []
+    energy_string_id = _valid_energy_payload()
+    energy_string_id["result"]["records"][0]["_id"] = "1"
+    energy_zero_limit = _valid_energy_payload()
+    energy_zero_limit["result"]["limit"] = 0
+    energy_int_success = _valid_energy_payload()
+    energy_int_success["success"] = 1
+    return [
+        (WEATHER_CONTRACT, _valid_weather_payload()),
+        (WEATHER_CONTRACT, weather_missing_main_temp),
+        (WEATHER_CONTRACT, weather_bool_cod),
+        (WEATHER_CONTRACT, weather_float_dt),
+        (WEATHER_CONTRACT, weather_empty_summary),
+        (ENERGY_CONTRACT, _valid_energy_payload()),
+        (ENERGY_CONTRACT, energy_string_id),
+        (ENERGY_CONTRACT, energy_zero_limit),
+        (ENERGY_CONTRACT, energy_int_success),
+    ]
+
+
+@pytest.mark.parametrize("contract_path, payload", _mutations())
+def test_compiled_fast_path_agrees_with_jsonschema(contract_path, payload):
+    resolved = str(contract_path.resolve())
+    fast_check = contract_validator._get_fast_check(resolved)
+
+    assert fast_check is not None
+    assert fast_check(payload) == contract_validator._get_validator(resolved).is_valid(payload)
+
+
+def test_validate_records_batch_reports_failing_record_index():
+    records = [{"_id": 1}, {"_id": "2"}, {"Timestamp": "2026-02-01T00:00:00"}]
+
+    with pytest.raises(ContractValidationError) as exc_info:
+        validate_records_batch(records, ENERGY_CONTRACT, "energy")
+
+    message = str(exc_info.value)
+    assert "2 issue(s)" in message
+    assert "result.records.1._id" in message
+    assert "result.records.2" in message
+
+
+def test_validate_records_batch_accepts_valid_records():
+    validate_records_batch([{"_id": index} for index in range(1, 100)], ENERGY_CONTRACT, "energy")
+
+
+def test_compile_schema_falls_back_for_unsupported_keywords():
+    assert contract_validator._compile_schema({"type": "string", "pattern": "^a"}) is None
+    assert contract_validator._compile_schema({"properties": {"a": {"oneOf": []}}}) is None
+
+
+def test_split_valid_records_quarantines_only_failing_records():
+    payload = _valid_energy_payload()
+    payload["result"]["records"] = [{"_id": 1}, {"_id": "two"}, {"_id": 3}, {"Demand": 5}]
+
+    clean_payload, quarantined = split_valid_records(payload, ENERGY_CONTRACT, "energy")
+
+    assert [record["_id"] for record in clean_payload["result"]["records"]] == [1, 3]
+    assert clean_payload["result"]["total"] == 1
+    assert len(payload["result"]["records"]) == 4
+    assert [entry["index"] for entry in quarantined] == [1, 3]
+    assert quarantined[0]["errors"] == ["_id: 'two' is not of type 'integer'"]
+    assert "'_id' is a required property" in quarantined[1]["errors"][0]
+
+
+def test_split_valid_records_still_rejects_broken_envelope():
+    payload = _valid_energy_payload()
+    payload["success"] = False
+    payload["result"]["records"].append({"_id": "bad"})
+
+    with pytest.raises(ContractValidationError, match="success"):
+        split_valid_records(payload, ENERGY_CONTRACT, "energy")
@@ -0,0 +1,74 @@
+import re
+import runpy
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from transformations.gold import demand_sketch
+from transformations.gold.demand_sketch import (
+    RELATIVE_ACCURACY,
+    build_sketch,
+    merge_moments,
+    merge_sketches,
+    moments,
+    moments_stddev,
+    sketch_quantile,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+NOTEBOOK_PATH = PROJECT_ROOT / "fabric" / "notebooks" / "03_build_gold_tables.py"
+GAMMA_LITERAL = re.compile(r"LN\(([\d.]+)D\)|POWER\(([\d.]+)D,|\(([\d.]+)D \+ 1\)")
+
+
+def _gamma_literals(sql: str) -> list[str]:
+    return [literal for match in GAMMA_LITERAL.findall(sql) for literal in match if literal]
+
+
+def _hourly_demand() -> list[np.ndarray]:
+    rng = np.random.default_rng(7)
+    # 24 hours of 5-minute readings, including zero and negative net demand.
+    return [rng.normal(1500, 400, 12) * np.sign(rng.normal(3, 1, 12)) for _ in range(24)]
+
+
+@pytest.mark.parametrize("quantile", [0.0, 0.5, 0.95, 1.0])
+def test_sketch_quantile_is_within_relative_accuracy(quantile):
+    values = np.concatenate([*_hourly_demand(), [0.0, 0.0]])
+
+    expected = np.sort(values)[int(np.floor(quantile * (len(values) - 1)))]
+    estimate = sketch_quantile(build_sketch(values), quantile)
+
+    assert estimate == pytest.approx(expected, rel=RELATIVE_ACCURACY, abs=1e-12)
+
+
+def test_daily_state_rolled_up_from_hourly_state_matches_a_daily_scan():
+    hours = _hourly_demand()
+    day = np.concatenate(hours)
+
+    assert merge_sketches(build_sketch(hour) for hour in hours) == build_sketch(day)
+    daily_moments = merge_moments(moments(hour) for hour in hours)
+    assert daily_moments[0] == len(day)
+    assert daily_moments[1] / daily_moments[0] == pytest.approx(day.mean())
+    assert moments_stddev(*daily_moments) == pytest.approx(day.std(ddof=1))
+
+
+def test_empty_and_single_value_states():
+    assert sketch_quantile({}, 0.95) is None
+    assert moments_stddev(*moments([42.0])) is None
+    assert sketch_quantile(build_sketch([42.0]), 0.95) == pytest.approx(42.0, rel=0.01)
+
+
+def test_notebook_sketch_matches_reference_parameters():
+    notebook = runpy.run_path(str(NOTEBOOK_PATH), run_name="fabric_gold_tables_notebook")
+    aggregation_sql = notebook["demand_aggregation_sql"]()
+
+    assert notebook["DEMAND_SKETCH_GAMMA"] == demand_sketch.GAMMA
+    assert notebook["DEMAND_SKETCH_KEY_OFFSET"] == demand_sketch.KEY_OFFSET
+    # Bucket keys and midpoints both use gamma; every copy must be repr(GAMMA) exactly.
+    sql_file = PROJECT_ROOT / "transformations" / "gold" / "demand_aggregation.sql"
+    for sql in (aggregation_sql, sql_file.read_text()):
+        assert _gamma_literals(sql) == [repr(demand_sketch.GAMMA)] * 3
+    # One scan of the feature rows; daily is rolled up from the hourly state.
+    assert aggregation_sql.count("FROM gold_feature_engineering") == 1
+    assert "FROM hourly_state" in aggregation_sql
+    assert "percentile_approx" not in aggregation_sql
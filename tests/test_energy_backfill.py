@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+from ingestion.energy import fetch_energy
+
+
+def _page(offset: int, total: int, limit: int = 2) -> dict:
+    return {
+        "help": "https://connecteddata.nationalgrid.co.uk/",
+        "success": True,
+        "result": {
+            "resource_id": "resource-123",
+            "records": [
+                {"_id": record_id + 1}
+                for record_id in range(offset, min(offset + limit, total))
+            ],
+            "limit": limit,
+            "total": total,
+        },
+    }
+
+
+def _config(**backfill) -> dict:
+    return {
+        "api": {"params": {"resource_id": "resource-123", "limit": 2}},
+        "backfill": {"enabled": True, **backfill},
+    }
+
+
+def test_iter_energy_pages_reads_total_and_numbers_pages_in_offset_order(monkeypatch):
+    requested = []
+    lock = threading.Lock()
+
+    def fake_fetch(config, offset=None):
+        with lock:
+            requested.append(offset)
+        return _page(offset, total=7)
+
+    monkeypatch.setattr(fetch_energy, "fetch_energy", fake_fetch)
+
+    pages = dict(fetch_energy.iter_energy_pages(_config(max_workers=3)))
+
+    assert sorted(requested) == [0, 2, 4, 6]
+    assert [pages[part]["result"]["records"][0]["_id"] for part in sorted(pages)] == [1, 3, 5, 7]
+
+
+def test_iter_energy_pages_respects_max_pages(monkeypatch):
+    monkeypatch.setattr(
+        fetch_energy,
+        "fetch_energy",
+        lambda config, offset=None: _page(offset, total=100),
+    )
+
+    pages = list(fetch_energy.iter_energy_pages(_config(max_pages=3)))
+
+    assert len(pages) == 3
+
+
+def test_iter_energy_pages_rejects_invalid_worker_count():
+    with pytest.raises(ValueError, match="max_workers"):
+        next(fetch_energy.iter_energy_pages(_config(max_workers=0)))
+
+
+def test_backfill_main_writes_one_file_per_page(monkeypatch):
+    saved = []
+
+    monkeypatch.setattr(fetch_energy, "load_config", lambda: _config())
+    monkeypatch.setattr(
+        fetch_energy,
+        "fetch_energy",
+        lambda config, offset=None: _page(offset, total=5),
+    )
+    monkeypatch.setattr(
+        fetch_energy,
+        "save_raw_data",
+        lambda data, run_timestamp=None, part=None, **kwargs: saved.append((run_timestamp, part)),
+    )
+
+    fetch_energy.main()
+
+    assert [part for _, part in saved] == [0, 1, 2]
+    assert len({run_timestamp for run_timestamp, _ in saved}) == 1
+
+
+def test_backfill_keeps_pages_written_before_a_page_fails(monkeypatch):
+    saved = []
+    requested = []
+
+    def fake_fetch(config, offset=None):
+        requested.append(offset)
+        if offset == 6:
+            raise RuntimeError("offset 6 failed after retries")
+        return _page(offset, total=13)
+
+    monkeypatch.setattr(fetch_energy, "load_config", lambda: _config(max_workers=1))
+    monkeypatch.setattr(fetch_energy, "fetch_energy", fake_fetch)
+    monkeypatch.setattr(
+        fetch_energy,
+        "save_raw_data",
+        lambda data, run_timestamp=None, part=None, **kwargs: saved.append(part),
+    )
+
+    with pytest.raises(RuntimeError, match="offset 6"):
+        fetch_energy.main()
+
+    # Pages were written as they arrived: the page still in flight at the failure
+    # lands too, and nothing beyond it is requested.
+    assert sorted(saved) == [0, 1, 2, 4]
+    assert sorted(requested) == [0, 2, 4, 6, 8]
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from ingestion.common.watermark import get_watermark, is_after_watermark, save_watermark
+from ingestion.energy import fetch_energy
+
+RESOURCE_ID = "resource-123"
+
+
+def _record(record_id: int) -> dict:
+    return {"_id": record_id, "Timestamp": f"2025-08-23T{record_id:02d}:00:00", "Demand": 2400.0}
+
+
+def _page(records: list[dict], limit: int) -> dict:
+    return {
+        "help": "https://connecteddata.nationalgrid.co.uk/",
+        "success": True,
+        "result": {"resource_id": RESOURCE_ID, "records": records, "limit": limit, "total": 20},
+    }
+
+
+def _fake_datastore(newest_id: int, requests_seen: list):
+    def fake_fetch(config, offset=None, extra_params=None):
+        requests_seen.append((offset, extra_params))
+        limit = extra_params["limit"]
+        ids = range(newest_id - offset, max(newest_id - offset - limit, 0), -1)
+        return _page([_record(record_id) for record_id in ids], limit)
+
+    return fake_fetch
+
+
+def _config(tmp_path, page_size: int = 3) -> dict:
+    return {
+        "api": {"params": {"resource_id": RESOURCE_ID, "limit": 1000}},
+        "incremental": {
+            "enabled": True,
+            "state_path": str(tmp_path / "state" / "energy_watermarks.json"),
+            "page_size": page_size,
+        },
+    }
+
+
+def test_save_watermark_only_moves_forward(tmp_path):
+    state_path = tmp_path / "energy_watermarks.json"
+
+    save_watermark(state_path, RESOURCE_ID, [_record(5), _record(7)])
+    save_watermark(state_path, RESOURCE_ID, [_record(6)])
+
+    watermark = get_watermark(state_path, RESOURCE_ID)
+    assert watermark["last_id"] == 7
+    assert watermark["last_timestamp"] == "2025-08-23T07:00:00"
+    assert save_watermark(state_path, RESOURCE_ID, []) is None
+
+
+def test_is_after_watermark_supports_timestamp_key():
+    watermark = {"last_id": 7, "last_timestamp": "2025-08-23T07:00:00"}
+
+    assert is_after_watermark(_record(8), watermark, "Timestamp")
+    assert not is_after_watermark(_record(7), watermark, "Timestamp")
+    assert is_after_watermark(_record(1), None, "_id")
+    with pytest.raises(ValueError, match="Watermark key"):
+        is_after_watermark(_record(1), watermark, "Demand")
+
+
+def test_incremental_fetch_pages_newest_first_until_watermark(monkeypatch):
+    requests_seen = []
+    monkeypatch.setattr(fetch_energy, "fetch_energy", _fake_datastore(20, requests_seen))
+
+    payload = fetch_energy.fetch_energy_incremental(
+        {"api": {"params": {}}, "incremental": {"page_size": 3}},
+        {"last_id": 15, "last_timestamp": None},
+    )
+
+    assert [record["_id"] for record in payload["result"]["records"]] == [16, 17, 18, 19, 20]
+    assert [offset for offset, _ in requests_seen] == [0, 3]
+    assert requests_seen[0][1]["sort"] == "_id desc"
+
+
+def test_incremental_main_skips_write_when_nothing_is_new(monkeypatch, tmp_path):
+    config = _config(tmp_path)
+    saved = []
+    requests_seen = []
+    monkeypatch.setattr(fetch_energy, "load_config", lambda: config)
+    monkeypatch.setattr(fetch_energy, "fetch_energy", _fake_datastore(20, requests_seen))
+    monkeypatch.setattr(fetch_energy, "save_raw_data", lambda data, **kwargs: saved.append(data))
+
+    fetch_energy.main()
+    fetch_energy.main()
+
+    assert len(saved) == 1
+    assert [record["_id"] for record in saved[0]["result"]["records"]] == [18, 19, 20]
+    state = json.loads((tmp_path / "state" / "energy_watermarks.json").read_text())
+    assert state[RESOURCE_ID]["last_id"] == 20
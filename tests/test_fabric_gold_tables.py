@@ -0,0 +1,314 @@
+import runpy
+from datetime import date
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+NOTEBOOK_PATH = PROJECT_ROOT / "fabric" / "notebooks" / "03_build_gold_tables.py"
+
+
+def _load_notebook_namespace() -> dict:
+    return runpy.run_path(str(NOTEBOOK_PATH), run_name="fabric_gold_tables_notebook")
+
+
+class _FakeWriter:
+    def __init__(self, spark):
+        self.spark = spark
+        self.options = {}
+
+    def format(self, _):
+        return self
+
+    def mode(self, mode):
+        self.options["mode"] = mode
+        return self
+
+    def option(self, key, value):
+        self.options[key] = value
+        return self
+
+    def saveAsTable(self, table_name):
+        self.spark.writes.append((table_name, self.options.get("replaceWhere", "append")))
+
+
+class _FakeFrame:
+    def __init__(self, spark, statement, rows, columns=()):
+        self.spark = spark
+        self.statement = statement
+        self.rows = rows
+        self.columns = list(columns)
+
+    def collect(self):
+        return self.rows
+
+    def count(self):
+        return 3
+
+    def createOrReplaceTempView(self, view_name):
+        self.spark.views[view_name] = self.statement
+
+    @property
+    def write(self):
+        return _FakeWriter(self.spark)
+
+
+class _FakeConf:
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+class _FakeCatalog:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def tableExists(self, table_name):
+        return table_name in self.tables
+
+
+class _FakeSpark:
+    def __init__(
+        self,
+        tables=(),
+        saved_watermarks=None,
+        changed_dates=None,
+        window_edges=None,
+        state_columns=("source_table", "watermark_silver_written_at_utc", "refreshed_at_utc"),
+        dropped_keys=0,
+    ):
+        self.conf = _FakeConf()
+        self.catalog = _FakeCatalog(set(tables))
+        self.saved_watermarks = saved_watermarks or {}
+        self.changed_dates = changed_dates or {}
+        # Results of the window edge queries in order, per ranking direction.
+        self.window_edges = window_edges or {}
+        self.state_columns = state_columns
+        self.dropped_keys = dropped_keys
+        self.statements = []
+        self.views = {}
+        self.writes = []
+
+    def sql(self, statement):
+        self.statements.append(statement)
+        rows = []
+        if "AS watermark FROM silver_" in statement:
+            rows = [{"watermark": "2026-02-10 12:00:00"}]
+        elif "GROUP BY source_table" in statement:
+            rows = [
+                {"source_table": table_name, "watermark": watermark}
+                for table_name, watermark in self.saved_watermarks.items()
+            ]
+        elif "SELECT DISTINCT event_date_utc" in statement:
+            table_name = statement.split("FROM ")[1].split()[0]
+            rows = [{"event_date_utc": value} for value in self.changed_dates.get(table_name, [])]
+        elif "AS first_date" in statement:
+            rows = [{"first_date": date(2026, 2, 1), "last_date": date(2026, 2, 28)}]
+        elif "edge_rank" in statement:
+            direction = "ASC" if "event_timestamp_utc ASC" in statement else "DESC"
+            results = self.window_edges.get(direction) or [{"short_keys": 0, "edge_date": None}]
+            rows = [results.pop(0)]
+        elif "AS dropped_keys" in statement:
+            rows = [{"dropped_keys": self.dropped_keys}]
+        return _FakeFrame(self, statement, rows)
+
+    def table(self, table_name):
+        columns = self.state_columns if table_name == "gold_refresh_state" else ()
+        return _FakeFrame(self, table_name, [], columns)
+
+
+def test_gold_tables_are_rebuilt_in_dependency_order():
+    namespace = _load_notebook_namespace()
+    spark = _FakeSpark()
+
+    row_counts = namespace["build_gold_tables"](spark)
+
+    assert spark.conf.values["spark.sql.session.timeZone"] == "UTC"
+    created = [statement for statement in spark.statements if "CREATE OR REPLACE" in statement]
+    assert [statement.split("TABLE ")[1].split()[0] for statement in created] == [
+        "gold_weather_demand_join",
+        "gold_feature_engineering",
+        "gold_demand_aggregation",
+        "gold_feature_state",
+        "gold_refresh_state",
+    ]
+    assert all("PARTITIONED BY (event_date_utc)" in statement for statement in created[:3])
+    assert "recency <= 12" in created[3]
+    assert row_counts == dict.fromkeys(row_counts, 3)
+    # One watermark row per silver table, replacing the previous run's rows.
+    assert "VALUES ('silver_energy', TIMESTAMP'2026-02-10 12:00:00'" in created[4]
+    assert "('silver_weather', TIMESTAMP'2026-02-10 12:00:00'" in created[4]
+    assert not any("INSERT INTO" in statement for statement in spark.statements)
+    watermark_reads = [statement for statement in spark.statements if "AS watermark" in statement]
+    assert all("MAX(silver_written_at_utc)" in statement for statement in watermark_reads)
+
+
+def test_weather_demand_join_is_an_hour_bucket_equi_join():
+    join_sql = _load_notebook_namespace()["WEATHER_DEMAND_JOIN_SQL"]
+
+    assert "ON w.weather_bucket = e.weather_bucket" in join_sql
+    assert "FLOOR(unix_timestamp(e.event_timestamp_utc) / 3600) - 6" in join_sql
+    assert "FLOOR(unix_timestamp(e.event_timestamp_utc) / 3600) + 1" in join_sql
+    assert "ASC NULLS LAST" in join_sql
+    sql_file = PROJECT_ROOT / "transformations" / "gold" / "weather_demand_join.sql"
+    assert "ON w.weather_bucket = e.weather_bucket" in sql_file.read_text()
+
+
+def test_incremental_refresh_replaces_only_touched_partitions_with_row_lookback():
+    namespace = _load_notebook_namespace()
+    spark = _FakeSpark(
+        tables=[*namespace["GOLD_TABLES"], "gold_refresh_state", "gold_feature_state"],
+        saved_watermarks={
+            "silver_energy": "2026-02-09 12:00:00",
+            "silver_weather": "2026-02-09 12:00:00",
+        },
+        changed_dates={
+            "silver_energy": [date(2026, 2, 7)],
+            "silver_weather": [date(2026, 2, 9)],
+        },
+        window_edges={
+            # Some key's 11th row after the last changed date falls two days later.
+            "ASC": [{"short_keys": 0, "edge_date": date(2026, 2, 12)}],
+            # One day back is too few rows for one key; two days covers every key.
+            "DESC": [
+                {"short_keys": 1, "edge_date": None},
+                {"short_keys": 0, "edge_date": date(2026, 2, 5)},
+            ],
+        },
+    )
+
+    namespace["build_gold_tables"](spark)
+
+    created = [statement for statement in spark.statements if "CREATE OR REPLACE" in statement]
+    assert [statement.split("TABLE ")[1].split()[0] for statement in created] == [
+        "gold_refresh_state"
+    ]
+    join_dates = "DATE'2026-02-07', DATE'2026-02-08', DATE'2026-02-09', DATE'2026-02-10'"
+    feature_dates = join_dates + ", DATE'2026-02-11', DATE'2026-02-12'"
+    assert spark.writes == [
+        ("gold_weather_demand_join", f"event_date_utc IN ({join_dates})"),
+        ("gold_feature_engineering", f"event_date_utc IN ({feature_dates})"),
+        ("gold_demand_aggregation", f"event_date_utc IN ({feature_dates})"),
+    ]
+    edge_queries = [statement for statement in spark.statements if "edge_rank" in statement]
+    assert len(edge_queries) == 3
+    assert f"(event_date_utc IN ({join_dates}))" in edge_queries[0]
+    assert "BETWEEN DATE'2026-02-11' AND DATE'2026-02-11'" in edge_queries[0]
+    assert "edge_rank = 11" in edge_queries[0]
+    assert "BETWEEN DATE'2026-02-07' AND DATE'2026-02-12'" in edge_queries[1]
+    assert "BETWEEN DATE'2026-02-06' AND DATE'2026-02-06'" in edge_queries[1]
+    assert "BETWEEN DATE'2026-02-05' AND DATE'2026-02-06'" in edge_queries[2]
+    # The feature windows read from the first date that covers every key's 11 rows.
+    assert "BETWEEN DATE'2026-02-05' AND DATE'2026-02-12'" in spark.views["gold_join_increment"]
+    assert "DATE'2026-02-06'" in spark.views["gold_weather_increment"]
+    assert "DATE'2026-02-11'" in spark.views["gold_weather_increment"]
+    changed_reads = [
+        statement for statement in spark.statements if "SELECT DISTINCT event_date_utc" in statement
+    ]
+    assert all("silver_written_at_utc > TIMESTAMP" in statement for statement in changed_reads)
+    # The state is recomputed only for keys in the rewritten partitions and merged.
+    state_rows_sql = spark.views["gold_feature_state_rows"]
+    assert "BETWEEN DATE'2026-02-07' AND DATE'2026-02-12'" in state_rows_sql
+    assert "f.event_date_utc >= DATE'2026-02-05'" in state_rows_sql
+    assert any("MERGE INTO gold_feature_state" in statement for statement in spark.statements)
+
+
+def test_feature_state_is_rebuilt_when_a_stored_key_left_the_rewritten_dates():
+    namespace = _load_notebook_namespace()
+    spark = _FakeSpark(dropped_keys=1)
+
+    namespace["update_feature_state"](
+        spark, date(2026, 2, 7), date(2026, 2, 8), date(2026, 2, 6)
+    )
+
+    assert "CREATE OR REPLACE TABLE gold_feature_state" in spark.statements[-1]
+    assert not any("MERGE INTO" in statement for statement in spark.statements)
+
+
+def test_window_edge_search_stops_at_the_first_join_date():
+    namespace = _load_notebook_namespace()
+    spark = _FakeSpark(window_edges={"DESC": [{"short_keys": 2, "edge_date": None}] * 3})
+
+    lookback_start = namespace["_window_edge_date"](
+        spark, "event_date_utc IN (DATE'2026-02-07')", date(2026, 2, 7), -1, date(2026, 2, 4)
+    )
+
+    # Keys short of 11 rows at the start of the table read from its first date.
+    assert lookback_start == date(2026, 2, 4)
+    edge_queries = [statement for statement in spark.statements if "edge_rank" in statement]
+    assert "BETWEEN DATE'2026-02-06' AND DATE'2026-02-06'" in edge_queries[0]
+    assert "BETWEEN DATE'2026-02-05' AND DATE'2026-02-06'" in edge_queries[1]
+    assert "BETWEEN DATE'2026-02-04' AND DATE'2026-02-06'" in edge_queries[2]
+
+
+def test_refresh_state_from_before_silver_write_times_forces_a_full_refresh():
+    namespace = _load_notebook_namespace()
+    spark = _FakeSpark(
+        tables=[*namespace["GOLD_TABLES"], "gold_refresh_state"],
+        saved_watermarks={
+            "silver_energy": "2026-02-09 12:00:00",
+            "silver_weather": "2026-02-09 12:00:00",
+        },
+        state_columns=("source_table", "watermark_ingestion_timestamp_utc", "refreshed_at_utc"),
+    )
+
+    namespace["build_gold_tables"](spark)
+
+    created = [statement for statement in spark.statements if "CREATE OR REPLACE" in statement]
+    assert created[0].split("TABLE ")[1].split()[0] == "gold_weather_demand_join"
+
+
+def test_append_refresh_featurises_new_join_rows_from_the_feature_state():
+    namespace = _load_notebook_namespace()
+    spark = _FakeSpark(
+        tables=[*namespace["GOLD_TABLES"], "gold_refresh_state", "gold_feature_state"],
+        saved_watermarks={
+            "silver_energy": "2026-02-09 12:00:00",
+            "silver_weather": "2026-02-09 12:00:00",
+        },
+        changed_dates={"silver_energy": [date(2026, 2, 10)]},
+    )
+
+    namespace["build_gold_tables"](spark, mode="append")
+
+    created = [statement for statement in spark.statements if "CREATE OR REPLACE" in statement]
+    assert [statement.split("TABLE ")[1].split()[0] for statement in created] == [
+        "gold_refresh_state"
+    ]
+    assert spark.writes == [
+        ("gold_weather_demand_join", "event_date_utc IN (DATE'2026-02-10')"),
+        ("gold_demand_aggregation", "event_date_utc IN (DATE'2026-02-10')"),
+    ]
+    # New feature rows are merged on their key, so a rerun replaces them.
+    feature_merge, state_merge = [
+        statement for statement in spark.statements if "MERGE INTO" in statement
+    ]
+    assert "MERGE INTO gold_feature_engineering t" in feature_merge
+    assert "t.event_timestamp_utc = s.event_timestamp_utc" in feature_merge
+    assert "t.event_date_utc IN (DATE'2026-02-10')" in feature_merge
+    assert "MERGE INTO gold_feature_state t" in state_merge
+    new_rows_sql = spark.views["gold_join_new_rows"]
+    assert "j.event_timestamp_utc > s.last_event_timestamp_utc" in new_rows_sql
+    new_features_sql = spark.views["gold_feature_new_rows"]
+    assert "FROM gold_feature_state_increment state" in new_features_sql
+    assert "WHERE NOT is_state_context" in new_features_sql
+
+
+def test_append_refresh_without_feature_state_falls_back_to_incremental():
+    namespace = _load_notebook_namespace()
+    spark = _FakeSpark(
+        tables=[*namespace["GOLD_TABLES"], "gold_refresh_state"],
+        saved_watermarks={
+            "silver_energy": "2026-02-09 12:00:00",
+            "silver_weather": "2026-02-09 12:00:00",
+        },
+        changed_dates={"silver_energy": [date(2026, 2, 10)]},
+    )
+
+    namespace["build_gold_tables"](spark, mode="append")
+
+    assert ("gold_feature_engineering", "append") not in spark.writes
+    assert any(
+        "CREATE OR REPLACE TABLE gold_feature_state" in statement
+        for statement in spark.statements
+    )
@@ -1,5 +1,8 @@
+import asyncio
 import json
 import runpy
+import threading
+import time
 from pathlib import Path
 
 import pytest
@@ -68,3 +71,157 @@ def test_fabric_ingestion_can_load_contracts_from_parameter(tmp_path):
     namespace["_resolve_contract_path"].__globals__["CONTRACTS_ROOT"] = str(contracts_root)
 
     assert namespace["_resolve_contract_path"]("weather") == contract_path
+
+
+def test_fabric_ingestion_splits_weather_city_list():
+    namespace = _load_notebook_namespace()
+    namespace["_weather_cities"].__globals__["WEATHER_CITIES"] = "London,GB; Leeds,GB;"
+
+    assert namespace["_weather_cities"]() == ["London,GB", "Leeds,GB"]
+    assert namespace["_city_slug"]("Milton Keynes,GB") == "milton-keynes-gb"
+
+
+def test_fabric_ingestion_runs_fanout_inside_running_event_loop():
+    namespace = _load_notebook_namespace()
+
+    async def notebook_cell():
+        async def work():
+            return "done"
+
+        return namespace["_run_async"](work())
+
+    assert asyncio.run(notebook_cell()) == "done"
+
+
+def test_fabric_weather_writes_valid_cities_and_reports_failed_ones(tmp_path):
+    namespace = _load_notebook_namespace()
+    notebook_globals = namespace["_ingest_weather"].__globals__
+    notebook_globals["LAKEHOUSE_FILES_ROOT"] = str(tmp_path)
+    notebook_globals["WEATHER_CITIES"] = "London,GB;Atlantis,GB;Leeds,GB"
+    notebook_globals["WEATHER_REQUESTS_PER_MINUTE"] = 6000
+
+    def fetch_weather(city=None):
+        if city == "Atlantis,GB":
+            raise RuntimeError("404 Client Error: Not Found")
+        payload = _valid_weather_payload()
+        payload["name"] = city.split(",")[0]
+        return payload
+
+    notebook_globals["fetch_weather"] = fetch_weather
+
+    with pytest.raises(RuntimeError, match="1 of 3 cities: Atlantis,GB: 404"):
+        namespace["_ingest_weather"]()
+
+    raw_files = sorted(path.name for path in (tmp_path / "raw" / "weather").rglob("*.json"))
+    assert [name.rsplit("_", 1)[-1] for name in raw_files] == ["leeds-gb.json", "london-gb.json"]
+
+
+def test_fabric_ingestion_skips_unchanged_raw_payload(tmp_path):
+    namespace = _load_notebook_namespace()
+    namespace["_write_raw_json"].__globals__["LAKEHOUSE_FILES_ROOT"] = str(tmp_path)
+    payload = _valid_weather_payload()
+
+    first_path = namespace["_write_raw_json"]("weather", payload)
+    second_path = namespace["_write_raw_json"]("weather", dict(payload))
+
+    assert second_path == first_path
+    assert len(list((tmp_path / "raw" / "weather").rglob("*.json"))) == 1
+    assert (tmp_path / "state" / "bronze_index" / "weather_pointers.jsonl").exists()
+
+
+def test_fabric_record_mode_quarantines_invalid_energy_records(tmp_path):
+    namespace = _load_notebook_namespace()
+    notebook_globals = namespace["_gate_energy_page"].__globals__
+    notebook_globals["LAKEHOUSE_FILES_ROOT"] = str(tmp_path)
+    notebook_globals["VALIDATION_MODE"] = "record"
+    payload = _valid_energy_payload()
+    payload["result"]["records"].append({"_id": "2"})
+
+    clean_payload, quarantined = namespace["_gate_energy_page"](
+        payload, namespace["datetime"](2026, 2, 1, 9, 30)
+    )
+
+    assert quarantined == 1
+    assert clean_payload["result"]["records"] == [{"_id": 1, "SETTLEMENT_DATE": "2026-02-01"}]
+    (quarantine_file,) = (tmp_path / "quarantine" / "energy").rglob("*.json")
+    assert quarantine_file.name == "energy_20260201_093000.json"
+    entry = json.loads(quarantine_file.read_text())["records"][0]
+    assert entry["index"] == 1
+    assert entry["errors"] == ["_id: '2' is not of type 'integer'"]
+
+
+def test_fabric_energy_backfill_writes_pages_as_they_arrive_up_to_max_pages(tmp_path):
+    namespace = _load_notebook_namespace()
+    notebook_globals = namespace["_ingest_energy"].__globals__
+    notebook_globals["LAKEHOUSE_FILES_ROOT"] = str(tmp_path)
+    notebook_globals["ENERGY_BACKFILL"] = True
+    notebook_globals["ENERGY_BACKFILL_MAX_PAGES"] = 3
+    notebook_globals["ENERGY_MAX_WORKERS"] = 1
+    requested = []
+
+    def fetch_energy(offset=0, extra_params=None):
+        requested.append(offset)
+        if offset == 4:
+            raise RuntimeError("offset 4 failed after retries")
+        payload = _valid_energy_payload()
+        payload["result"].update(
+            {"records": [{"_id": offset + 1}], "limit": 2, "total": 10}
+        )
+        return payload
+
+    notebook_globals["fetch_energy"] = fetch_energy
+
+    with pytest.raises(RuntimeError, match="offset 4"):
+        namespace["_ingest_energy"]()
+
+    assert sorted(requested) == [0, 2, 4]
+    raw_files = sorted(path.name for path in (tmp_path / "raw" / "energy").rglob("*.json"))
+    assert [name.rsplit("_", 1)[-1] for name in raw_files] == ["00000.json", "00001.json"]
+
+
+def test_fabric_main_fetches_weather_and_energy_concurrently(tmp_path):
+    namespace = _load_notebook_namespace()
+    notebook_globals = namespace["main"].__globals__
+    notebook_globals["LAKEHOUSE_FILES_ROOT"] = str(tmp_path)
+    both_started = threading.Barrier(2, timeout=5)
+
+    def ingest_weather():
+        both_started.wait()
+        time.sleep(0.05)
+        return ["weather_a.json", "weather_b.json"]
+
+    def ingest_energy():
+        both_started.wait()
+        return ["energy.json"], 0
+
+    notebook_globals["_ingest_weather"] = ingest_weather
+    notebook_globals["_ingest_energy"] = ingest_energy
+
+    assert namespace["main"]() == ["weather_a.json", "weather_b.json", "energy.json"]
+
+
+def test_fabric_main_writes_run_metrics_even_when_a_source_fails(tmp_path):
+    namespace = _load_notebook_namespace()
+    notebook_globals = namespace["main"].__globals__
+    notebook_globals["LAKEHOUSE_FILES_ROOT"] = str(tmp_path)
+    notebook_globals["DATASET"] = "weather"
+
+    def ingest_weather():
+        with namespace["_timed"]("fetch", "weather") as event:
+            event["response_bytes"] = 512
+            event["offset"] = 3
+        raise ValueError("weather_schema.json")
+
+    notebook_globals["_ingest_weather"] = ingest_weather
+
+    with pytest.raises(ValueError):
+        namespace["main"]()
+
+    (metrics_file,) = (tmp_path / "metrics" / "ingest_run_metrics").rglob("run_*.jsonl")
+    fetch_row, run_row = [json.loads(line) for line in metrics_file.read_text().splitlines()]
+    assert fetch_row["stage"] == "fetch"
+    assert fetch_row["response_bytes"] == 512
+    assert json.loads(fetch_row["detail"]) == {"offset": 3}
+    assert fetch_row["run_id"] == run_row["run_id"]
+    assert run_row["status"] == "error"
+    assert run_row["error"] == "ValueError"
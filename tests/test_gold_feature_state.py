@@ -0,0 +1,168 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from transformations.gold import feature_state
+from transformations.gold.feature_state import FeatureStateStore
+from transformations.gold.weather_demand_join import GOLD_COLUMNS, save_gold_join
+
+
+def _joined_rows(row_count: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    start = pd.Timestamp("2026-02-07", tz="UTC")
+    minutes = np.sort(rng.choice(3 * 1440, row_count, replace=False))
+    ts = start + pd.to_timedelta(minutes, unit="min")
+    joined = pd.DataFrame({column: np.nan for column in GOLD_COLUMNS}, index=range(row_count))
+    joined = joined.assign(
+        resource_id=rng.choice(["resource-1", "resource-2"], row_count),
+        source_record_id=np.arange(row_count).astype(str),
+        event_timestamp_utc=ts,
+        event_date_utc=ts.strftime("%Y-%m-%d"),
+        city=rng.choice(["Leeds", "York"], row_count),
+        country_code="GB",
+        demand_mw=rng.normal(1500, 300, row_count),
+        temperature_c=rng.normal(8, 4, row_count),
+        feels_like_c=rng.normal(6, 4, row_count),
+        humidity_pct=rng.uniform(40, 100, row_count),
+    )
+    # Rows the feature SQL drops, and one that falls back to feels_like_c.
+    joined.loc[::37, "humidity_pct"] = np.nan
+    joined.loc[::53, "temperature_c"] = np.nan
+    return joined
+
+
+def _window_reference(joined: pd.DataFrame) -> pd.DataFrame:
+    """The LAG and 12-row AVG windows of feature_engineering.sql over the whole input."""
+    base = feature_state.feature_base(joined)
+    grouped = base.groupby(["resource_id", "city"], sort=False)
+    return base.assign(
+        demand_lag_1=grouped["demand_mw"].shift(1),
+        temperature_lag_1=grouped["temperature"].shift(1),
+        demand_rolling_mean_12=grouped["demand_mw"].transform(
+            lambda values: values.rolling(12, min_periods=1).mean()
+        ),
+        temperature_rolling_mean_12=grouped["temperature"].transform(
+            lambda values: values.rolling(12, min_periods=1).mean()
+        ),
+    )
+
+
+def test_batches_through_saved_state_match_window_functions(tmp_path):
+    joined = _joined_rows()
+    state_path = tmp_path / "feature_state.parquet"
+    in_first_batch = joined["event_timestamp_utc"] <= joined["event_timestamp_utc"].iloc[150]
+
+    batches = []
+    for in_batch in (in_first_batch, ~in_first_batch):
+        store = FeatureStateStore.load(state_path)
+        features, late_rows = store.featurise(joined[in_batch])
+        store.save(state_path)
+        assert late_rows.empty
+        batches.append(features)
+
+    features = pd.concat(batches, ignore_index=True)
+    expected = _window_reference(joined)
+
+    assert list(features.columns) == feature_state.FEATURE_COLUMNS
+    assert len(features) == len(expected)
+    for column in [
+        "demand_lag_1",
+        "temperature_lag_1",
+        "demand_rolling_mean_12",
+        "temperature_rolling_mean_12",
+    ]:
+        np.testing.assert_allclose(features[column], expected[column], rtol=1e-9)
+    np.testing.assert_allclose(
+        features["demand_delta_1"], expected["demand_mw"] - expected["demand_lag_1"]
+    )
+    first = features.iloc[0]
+    assert first["day_of_week_utc"] == 7  # 2026-02-07 is a Saturday.
+    assert first["is_weekend_utc"] == 1
+
+
+def test_rows_not_after_the_stored_state_are_returned_as_late():
+    joined = _joined_rows(40)
+    store = FeatureStateStore()
+    store.featurise(joined)
+    key_count = len(store.keys)
+
+    features, late_rows = store.featurise(joined.iloc[:10])
+
+    assert features.empty
+    assert len(late_rows) == len(feature_state.feature_base(joined.iloc[:10]))
+    assert len(store.keys) == key_count
+
+
+def test_same_timestamp_rows_in_one_batch_are_not_late():
+    joined = _joined_rows(40)
+    tied = joined.iloc[[5]].assign(source_record_id="tied", demand_mw=900.0)
+    store = FeatureStateStore()
+
+    features, late_rows = store.featurise(pd.concat([joined, tied]))
+
+    assert late_rows.empty
+    assert len(features) == len(feature_state.feature_base(joined)) + 1
+
+
+def test_saved_window_sums_are_recomputed_from_the_windows(tmp_path):
+    state_path = tmp_path / "feature_state.parquet"
+    store = FeatureStateStore()
+    store.featurise(_joined_rows(40))
+    for state in store.keys.values():
+        state.demand_sum += 1e-6  # Rounding drift from the running updates.
+    store.save(state_path)
+
+    saved = pd.read_parquet(state_path)
+    reloaded = FeatureStateStore.load(state_path)
+
+    np.testing.assert_array_equal(
+        saved["demand_window_sum"], saved["demand_window"].map(math.fsum)
+    )
+    for state in reloaded.keys.values():
+        assert state.demand_sum == math.fsum(state.demand)
+
+
+def test_build_online_features_appends_new_rows_and_saves_state(tmp_path):
+    joined = _joined_rows(60)
+    join_dir = tmp_path / "gold" / "weather_demand_join"
+    output_dir = tmp_path / "gold" / "feature_engineering"
+    state_path = tmp_path / "state" / "feature_state.parquet"
+    save_gold_join(joined, join_dir)
+
+    first = feature_state.build_online_features(
+        join_dir=join_dir, output_path=output_dir, state_path=state_path
+    )
+    second = feature_state.build_online_features(
+        join_dir=join_dir, output_path=output_dir, state_path=state_path
+    )
+
+    assert first["new_rows"] == len(feature_state.feature_base(joined))
+    assert first["late_rows"] == 0
+    assert second["new_rows"] == 0
+    assert second["late_rows"] == first["new_rows"]
+    assert state_path.exists()
+    written = pd.read_parquet(output_dir)
+    assert len(written) == first["new_rows"]
+    state = pd.read_parquet(state_path)
+    assert state["demand_window"].map(len).max() == feature_state.ROLLING_WINDOW
+
+
+def test_rerun_after_features_saved_without_state_does_not_duplicate_rows(tmp_path):
+    joined = _joined_rows(60)
+    join_dir = tmp_path / "gold" / "weather_demand_join"
+    output_dir = tmp_path / "gold" / "feature_engineering"
+    state_path = tmp_path / "state" / "feature_state.parquet"
+    save_gold_join(joined, join_dir)
+    # A run that wrote its features but failed before saving the state.
+    features, _ = FeatureStateStore.load(state_path).featurise(joined)
+    feature_state.save_features(features, output_dir)
+
+    rerun = feature_state.build_online_features(
+        join_dir=join_dir, output_path=output_dir, state_path=state_path
+    )
+
+    assert rerun["new_rows"] == len(features)
+    written = pd.read_parquet(output_dir)
+    assert len(written) == len(features)
+    assert not written.duplicated(feature_state.FEATURE_KEY_COLUMNS).any()
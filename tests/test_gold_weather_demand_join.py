@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from transformations.gold import weather_demand_join as gold
+
+
+def _energy(timestamps):
+    ts = pd.to_datetime(timestamps, utc=True)
+    return pd.DataFrame(
+        {
+            "resource_id": "resource-123",
+            "source_record_id": range(1, len(ts) + 1),
+            "event_timestamp_utc": ts,
+            "event_date_utc": ts.strftime("%Y-%m-%d"),
+            **{column: 1.0 for column in gold.ENERGY_COLUMNS[4:11]},
+            "ingestion_timestamp_utc": pd.Timestamp("2026-02-08 12:00", tz="UTC"),
+        }
+    )
+
+
+def _weather(timestamps):
+    ts = pd.to_datetime(timestamps, utc=True)
+    return pd.DataFrame(
+        {
+            "city": [f"city-{index}" for index in range(len(ts))],
+            "country_code": "GB",
+            "event_timestamp_utc": ts,
+            "temperature_c": np.arange(len(ts), dtype="float64"),
+            **{column: 1.0 for column in gold.WEATHER_COLUMNS[4:9]},
+            "weather_main": "Clouds",
+            "weather_description": "overcast clouds",
+            "ingestion_timestamp_utc": pd.Timestamp("2026-02-08 12:00", tz="UTC"),
+        }
+    )
+
+
+def _reference_join(energy, weather):
+    """weather_demand_join.sql evaluated literally: range join, then nearest-first rank."""
+    rows = []
+    for _, e in energy.iterrows():
+        delta = e["event_timestamp_utc"] - weather["event_timestamp_utc"]
+        window = weather[(delta <= pd.Timedelta(hours=6)) & (delta >= -pd.Timedelta(hours=1))]
+        if window.empty:
+            rows.append((e["source_record_id"], None, None))
+            continue
+        ranked = window.assign(distance=delta[window.index].abs())
+        best = ranked.sort_values(["distance", "event_timestamp_utc"], ascending=[True, False])
+        age = int(delta[best.index[0]].total_seconds() / 60)
+        rows.append((e["source_record_id"], best["city"].iloc[0], age))
+    return rows
+
+
+def test_as_of_join_matches_sql_range_join():
+    rng = np.random.default_rng(7)
+    start = pd.Timestamp("2026-02-07", tz="UTC")
+    energy = _energy(start + pd.to_timedelta(np.sort(rng.integers(0, 3 * 1440, 300)), unit="min"))
+    weather_minutes = np.sort(rng.choice(np.arange(0, 3 * 1440, 7), 40, replace=False))
+    weather = _weather(start + pd.to_timedelta(weather_minutes, unit="min"))
+
+    joined = gold.build_weather_demand_join(energy, weather)
+
+    assert list(joined.columns) == gold.GOLD_COLUMNS
+    joined = joined.sort_values("source_record_id").astype(object)
+    joined = joined.where(joined.notna(), None)
+    actual = list(joined[["source_record_id", "city", "weather_age_minutes"]].itertuples(False))
+    assert [tuple(row) for row in actual] == _reference_join(energy, weather)
+
+
+def test_as_of_join_window_edges_and_ties():
+    energy = _energy(["2026-02-07T12:00:00", "2026-02-07T20:00:00", "2026-02-08T03:00:00"])
+    weather = _weather(
+        ["2026-02-07T06:00:00", "2026-02-07T19:30:00", "2026-02-07T20:30:00", "2026-02-08T04:00:00"]
+    )
+
+    joined = gold.build_weather_demand_join(energy, weather)
+
+    assert joined["city"].tolist() == ["city-0", "city-2", "city-3"]
+    assert joined["weather_age_minutes"].tolist() == [360, -30, -60]
+    assert joined["weather_time_delta_minutes"].tolist() == [360, 30, 60]
+
+    unmatched = gold.build_weather_demand_join(_energy(["2026-02-07T04:59:00"]), weather)
+    assert unmatched["city"].isna().all()
+    assert unmatched["weather_age_minutes"].isna().all()
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from ingestion.common.bronze_store import write_raw_payload
+from ingestion.common.contract_validator import ContractValidationError, validate_payload
+from ingestion.common.metrics import collect_run_metrics, metrics_path_from_config, timed
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+ENERGY_CONTRACT = PROJECT_ROOT / "data-contracts" / "energy_schema.json"
+
+
+def _events(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_bronze_write_records_bytes_only_for_new_files(tmp_path):
+    metrics_path = tmp_path / "metrics.jsonl"
+    payload = {"name": "London", "dt": 1}
+
+    with collect_run_metrics("weather", metrics_path):
+        file_path, _ = write_raw_payload(payload, "weather", tmp_path / "raw", index_dir=tmp_path)
+        write_raw_payload(payload, "weather", tmp_path / "raw", index_dir=tmp_path)
+
+    first_write, repeat_write, _ = _events(metrics_path)
+    assert first_write["stage"] == "bronze_write"
+    assert first_write["written"] is True
+    assert first_write["bytes_written"] == file_path.stat().st_size
+    assert repeat_write["written"] is False
+    assert repeat_write["bytes_written"] == 0
+
+
+def test_failed_run_still_writes_its_metrics(tmp_path):
+    metrics_path = tmp_path / "metrics.jsonl"
+
+    with pytest.raises(ContractValidationError):
+        with collect_run_metrics("energy", metrics_path):
+            validate_payload({"invalid": True}, ENERGY_CONTRACT, "energy")
+
+    validate_event, run_event = _events(metrics_path)
+    assert validate_event["stage"] == "validate"
+    assert validate_event["contract"] == "energy_schema.json"
+    assert validate_event["status"] == "error"
+    assert validate_event["error"] == "ContractValidationError"
+    assert run_event["status"] == "error"
+
+
+def test_timed_outside_a_run_records_nothing(tmp_path):
+    with timed("fetch") as event:
+        pass
+
+    assert event["status"] == "ok"
+    assert metrics_path_from_config({}) is None
+    config = {"metrics": {"enabled": True, "path": "m.jsonl"}}
+    assert metrics_path_from_config(config) == Path("m.jsonl")
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from ingestion.common.contract_validator import ContractValidationError
@@ -29,3 +31,35 @@ def test_energy_ingestion_blocks_save_on_contract_failure(monkeypatch):
         fetch_energy.main()
 
     assert not saved["called"]
+
+
+def test_energy_record_mode_quarantines_invalid_records(monkeypatch, tmp_path):
+    saved = []
+    payload = {
+        "help": "https://connecteddata.nationalgrid.co.uk/",
+        "success": True,
+        "result": {
+            "resource_id": "resource-a",
+            "records": [{"_id": 1}, {"_id": None}, {"_id": 3}],
+            "limit": 100,
+            "total": 3,
+        },
+    }
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        fetch_energy,
+        "load_config",
+        lambda: {"api": {}, "validation": {"mode": "record"}},
+    )
+    monkeypatch.setattr(fetch_energy, "fetch_energy", lambda config: payload)
+    monkeypatch.setattr(fetch_energy, "save_raw_data", lambda data, **kwargs: saved.append(data))
+
+    fetch_energy.main()
+
+    assert [record["_id"] for record in saved[0]["result"]["records"]] == [1, 3]
+    (quarantine_file,) = (tmp_path / "data" / "quarantine" / "energy").glob("energy_*.json")
+    quarantine = json.loads(quarantine_file.read_text())
+    assert quarantine["record_count"] == 1
+    assert quarantine["records"][0]["record"] == {"_id": None}
+    assert quarantine["records"][0]["errors"] == ["_id: None is not of type 'integer'"]
@@ -0,0 +1,52 @@
+import pandas as pd
+
+from transformations.silver import compaction
+
+
+def _weather_rows(ingested_at, rows):
+    return pd.DataFrame(
+        {
+            "city": [city for city, _, _ in rows],
+            "event_timestamp_utc": pd.to_datetime([ts for _, ts, _ in rows], utc=True),
+            "ingestion_timestamp_utc": pd.Timestamp(ingested_at, tz="UTC"),
+            "event_date_utc": [ts[:10] for _, ts, _ in rows],
+            "temperature_c": [temperature for _, _, temperature in rows],
+        }
+    )
+
+
+def test_compaction_rewrites_old_partitions_as_one_sorted_deduplicated_file(tmp_path):
+    old_partition = tmp_path / "dt=2026-02-07"
+    new_partition = tmp_path / "dt=2026-02-08"
+    old_partition.mkdir()
+    new_partition.mkdir()
+    first_run = [("London", "2026-02-07T09:00:00", 5.0), ("Leeds", "2026-02-07T08:00:00", 3.0)]
+    _weather_rows("2026-02-07 10:00", first_run).to_parquet(
+        old_partition / "weather_clean_20260207_100000.parquet", index=False
+    )
+    _weather_rows("2026-02-07 11:00", [("London", "2026-02-07T09:00:00", 6.0)]).to_parquet(
+        old_partition / "weather_clean_20260207_110000.parquet", index=False
+    )
+    for hour in ("10", "11"):
+        rows = _weather_rows(f"2026-02-08 {hour}:00", [("London", "2026-02-08T09:00:00", 1.0)])
+        rows.to_parquet(new_partition / f"weather_clean_20260208_{hour}0000.parquet", index=False)
+
+    assert compaction.compact_dataset("weather", tmp_path, dry_run=True) == [
+        old_partition,
+        new_partition,
+    ]
+    assert compaction.compact_dataset("weather", tmp_path, before="2026-02-08") == [old_partition]
+
+    (compacted_file,) = old_partition.glob("*.parquet")
+    compacted = pd.read_parquet(compacted_file)
+    assert compacted["city"].tolist() == ["Leeds", "London"]
+    assert compacted["temperature_c"].tolist() == [3.0, 6.0]
+    assert not list(old_partition.glob(".*.tmp"))
+    assert len(list(new_partition.glob("*.parquet"))) == 2
+
+
+def test_compaction_skips_empty_partitions_even_with_min_files_zero(tmp_path):
+    (tmp_path / "dt=2026-02-07").mkdir()
+
+    assert compaction.compact_dataset("weather", tmp_path, min_files=0) == []
+    assert compaction.compact_dataset("weather", tmp_path, min_files=0, dry_run=True) == []
@@ -0,0 +1,240 @@
+import json
+import os
+from functools import partial
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from transformations.silver import clean_energy, streaming
+from transformations.silver.file_manifest import FileManifest
+
+
+def _write_energy_file(raw_dir, name, records):
+    payload = {"result": {"resource_id": "resource-123", "records": records}}
+    (raw_dir / name).write_text(json.dumps(payload))
+
+
+def _record(record_id, timestamp, demand):
+    return {"_id": record_id, "Timestamp": timestamp, "Demand": demand}
+
+
+def test_incremental_run_parses_only_new_files_and_merges_partitions(tmp_path, monkeypatch):
+    raw_dir = tmp_path / "raw"
+    silver_dir = tmp_path / "silver"
+    manifest_path = tmp_path / "state" / "energy.json"
+    index_dir = tmp_path / "state" / "dedup_index"
+    raw_dir.mkdir()
+    _write_energy_file(
+        raw_dir,
+        "energy_20260208_120000.json",
+        [_record(1, "2025-08-23T22:50:00", 100.0), _record(2, "2025-08-24T00:05:00", 200.0)],
+    )
+
+    run = partial(
+        clean_energy.run_incremental, raw_dir, silver_dir, manifest_path, dedup_index_dir=index_dir
+    )
+    assert len(run()) == 1
+    assert run() == []
+
+    _write_energy_file(
+        raw_dir,
+        "energy_20260208_130000.json",
+        [_record(1, "2025-08-23T22:50:00", 150.0), _record(3, "2025-08-23T22:55:00", 300.0)],
+    )
+    parsed_files = []
+    transform = clean_energy.transform_energy_files
+    monkeypatch.setattr(
+        clean_energy,
+        "transform_energy_files",
+        lambda raw_dir, files, **kwargs: (
+            parsed_files.extend(files) or transform(raw_dir, files=files)
+        ),
+    )
+
+    run()
+
+    assert [path.name for path in parsed_files] == ["energy_20260208_130000.json"]
+    (merged_file,) = (silver_dir / "dt=2025-08-23").glob("*.parquet")
+    merged = pd.read_parquet(merged_file).sort_values("source_record_id")
+    assert merged["source_record_id"].tolist() == [1, 3]
+    assert merged["demand_mw"].tolist() == [150.0, 300.0]
+    assert len(list((silver_dir / "dt=2025-08-24").glob("*.parquet"))) == 1
+
+
+def test_files_that_fail_to_parse_stay_pending(tmp_path):
+    raw_dir = tmp_path / "raw"
+    manifest_path = tmp_path / "state" / "energy.json"
+    raw_dir.mkdir()
+    _write_energy_file(
+        raw_dir, "energy_20260208_120000.json", [_record(1, "2025-08-23T22:50:00", 100.0)]
+    )
+    _write_energy_file(
+        raw_dir, "energy_20260208_130000.json", [_record(2, "2025-08-23T22:55:00", "abc")]
+    )
+
+    processed = clean_energy.run_incremental(
+        raw_dir, tmp_path / "silver", manifest_path, dedup_index_dir=None
+    )
+
+    assert [path.name for path in processed] == ["energy_20260208_120000.json"]
+    pending = FileManifest.load(manifest_path).pending(sorted(raw_dir.iterdir()))
+    assert [path.name for path in pending] == ["energy_20260208_130000.json"]
+
+
+def test_manifest_skips_touched_files_but_not_rewritten_ones(tmp_path):
+    raw_file = tmp_path / "energy_20260208_120000.json"
+    raw_file.write_text('{"result": {"records": []}}')
+    manifest = FileManifest(tmp_path / "manifest.json")
+    manifest.mark_processed([raw_file])
+    manifest.save()
+
+    stat = raw_file.stat()
+    os.utime(raw_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+    reloaded = FileManifest.load(tmp_path / "manifest.json")
+    assert reloaded.pending([raw_file]) == []
+
+    raw_file.write_text('{"result": {"records": [{"_id": 1}]}}')
+    assert FileManifest.load(tmp_path / "manifest.json").pending([raw_file]) == [raw_file]
+
+
+def test_process_pool_matches_serial_output(tmp_path):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    for hour in range(6):
+        _write_energy_file(
+            raw_dir,
+            f"energy_20260208_{hour:02d}0000.json",
+            [
+                _record(record_id, "2025-08-23T22:50:00", hour * 10.0 + record_id)
+                for record_id in range(4)
+            ],
+        )
+    # Same ingestion timestamp as the last file: file order decides the winner.
+    _write_energy_file(
+        raw_dir, "energy_20260208_050000_00001.json", [_record(0, "2025-08-23T22:50:00", -1.0)]
+    )
+
+    serial = clean_energy.transform_energy_files(raw_dir)
+    parallel = clean_energy.transform_energy_files(raw_dir, workers=3)
+
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert serial.loc[serial["source_record_id"] == 0, "demand_mw"].item() == -1.0
+
+
+def test_partition_spool_spills_past_budget_and_keeps_arrival_order(tmp_path):
+    spool = streaming.PartitionSpool(tmp_path, max_buffered_rows=2)
+    for value in range(5):
+        batch = pa.RecordBatch.from_pandas(pd.DataFrame({"value": [value]}), preserve_index=False)
+        spool.add("2025-08-23", batch)
+
+    assert len(list(tmp_path.glob("*.arrow"))) == 3
+    assert spool.read_partition("2025-08-23")["value"].tolist() == [0, 1, 2, 3, 4]
+    assert list(tmp_path.glob("*.arrow")) == []
+
+
+def test_streaming_run_matches_in_memory_run(tmp_path):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    for hour in range(5):
+        _write_energy_file(
+            raw_dir,
+            f"energy_20260208_{hour:02d}0000.json",
+            [
+                _record(1, "2025-08-23T22:50:00", hour * 1.0),
+                _record(hour + 10, f"2025-08-2{hour % 2 + 3}T10:00:00", 5.0),
+            ],
+        )
+
+    streaming.stream_to_silver(
+        clean_energy.list_raw_files(raw_dir),
+        lambda batch: clean_energy.transform_energy_files(raw_dir, files=batch),
+        tmp_path / "streamed",
+        "energy",
+        clean_energy.ENERGY_DEDUP_KEYS,
+        batch_files=2,
+        max_buffered_rows=1,
+    )
+    clean_energy.save_clean_data(clean_energy.transform_energy_files(raw_dir), tmp_path / "memory")
+
+    for partition in ("dt=2025-08-23", "dt=2025-08-24"):
+        (streamed_file,) = (tmp_path / "streamed" / partition).glob("*.parquet")
+        (memory_file,) = (tmp_path / "memory" / partition).glob("*.parquet")
+        keys = clean_energy.ENERGY_DEDUP_KEYS
+        streamed = pd.read_parquet(streamed_file).sort_values(keys).reset_index(drop=True)
+        in_memory = pd.read_parquet(memory_file).sort_values(keys).reset_index(drop=True)
+        pd.testing.assert_frame_equal(streamed, in_memory)
+        if partition == "dt=2025-08-23":
+            assert streamed.loc[streamed["source_record_id"] == 1, "demand_mw"].item() == 4.0
+
+
+def test_compact_dtypes_write_dictionary_columns_and_merge_with_plain_files(tmp_path):
+    raw_dir = tmp_path / "raw"
+    silver_dir = tmp_path / "silver"
+    manifest_path = tmp_path / "state" / "energy.json"
+    index_dir = tmp_path / "state" / "dedup_index"
+    raw_dir.mkdir()
+    _write_energy_file(
+        raw_dir, "energy_20260208_120000.json", [_record(1, "2025-08-23T22:50:00", 100.0)]
+    )
+    clean_energy.run_incremental(raw_dir, silver_dir, manifest_path, dedup_index_dir=index_dir)
+
+    _write_energy_file(
+        raw_dir,
+        "energy_20260208_130000.json",
+        [_record(1, "2025-08-23T22:50:00", 150.0), _record(2, "2025-08-23T22:55:00", 200.0)],
+    )
+    clean_energy.run_incremental(
+        raw_dir,
+        silver_dir,
+        manifest_path,
+        dedup_index_dir=index_dir,
+        compact_dtypes=True,
+        float32=True,
+    )
+
+    (written,) = (silver_dir / "dt=2025-08-23").glob("*.parquet")
+    schema = pq.read_schema(written)
+    assert pa.types.is_dictionary(schema.field("resource_id").type)
+    assert schema.field("event_date_utc").type == pa.date32()
+    assert schema.field("demand_mw").type == pa.float32()
+    stored = pd.read_parquet(written)
+    assert isinstance(stored["source_file"].dtype, pd.CategoricalDtype)
+    assert stored["demand_mw"].tolist() == [150.0, 200.0]
+
+
+def test_dedup_index_skips_unchanged_and_older_rows(tmp_path):
+    raw_dir = tmp_path / "raw"
+    silver_dir = tmp_path / "silver"
+    index_dir = tmp_path / "state" / "dedup_index"
+    raw_dir.mkdir()
+    _write_energy_file(
+        raw_dir,
+        "energy_20260208_120000.json",
+        [_record(1, "2025-08-23T22:50:00", 100.0), _record(2, "2025-08-24T00:05:00", 200.0)],
+    )
+    save = partial(clean_energy.save_clean_data, output_path=silver_dir, dedup_index_dir=index_dir)
+    save(clean_energy.transform_energy_files(raw_dir))
+    (first_file,) = (silver_dir / "dt=2025-08-23").glob("*.parquet")
+    os.utime(first_file, ns=(0, 0))
+
+    # Re-delivered unchanged, plus an older delivery with a stale value.
+    _write_energy_file(
+        raw_dir,
+        "energy_20260208_130000.json",
+        [_record(1, "2025-08-23T22:50:00", 100.0), _record(2, "2025-08-24T00:05:00", 200.0)],
+    )
+    _write_energy_file(
+        raw_dir, "energy_20260208_110000.json", [_record(2, "2025-08-24T00:05:00", 50.0)]
+    )
+    files = sorted(raw_dir.glob("energy_20260208_1[13]0000.json"))
+    older = clean_energy.transform_energy_files(raw_dir, files=files[:1])
+    save(clean_energy.transform_energy_files(raw_dir, files=files[1:]))
+    save(older)
+
+    assert list((silver_dir / "dt=2025-08-23").glob("*.parquet")) == [first_file]
+    assert first_file.stat().st_mtime_ns == 0
+    (next_day,) = (silver_dir / "dt=2025-08-24").glob("*.parquet")
+    assert pd.read_parquet(next_day)["demand_mw"].tolist() == [200.0]
+    shard = pd.read_parquet(index_dir / "dt=2025-08-24.parquet")
+    assert shard["ingestion_timestamp_utc"].tolist() == [pd.Timestamp("2026-02-08 12:00", tz="UTC")]
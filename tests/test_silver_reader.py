@@ -0,0 +1,80 @@
+import pandas as pd
+
+from transformations.silver import reader
+from transformations.silver.dtypes import compact_frame
+
+
+def _energy_rows(ingested_at, rows):
+    return pd.DataFrame(
+        {
+            "source_file": [f"energy_{ingested_at[:10]}.json"] * len(rows),
+            "resource_id": "resource-123",
+            "source_record_id": [record_id for record_id, _, _ in rows],
+            "event_timestamp_utc": pd.to_datetime([ts for _, ts, _ in rows], utc=True),
+            "ingestion_timestamp_utc": pd.Timestamp(ingested_at, tz="UTC"),
+            "event_date_utc": [ts[:10] for _, ts, _ in rows],
+            "demand_mw": [demand for _, _, demand in rows],
+        }
+    )
+
+
+def _write(silver_dir, event_date, name, df):
+    partition = silver_dir / f"dt={event_date}"
+    partition.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(partition / name, index=False)
+
+
+def test_read_silver_prunes_partitions_and_projects_columns(tmp_path):
+    for day in ("01", "02", "03"):
+        rows = _energy_rows(f"2026-02-{day} 10:00", [(int(day), f"2026-02-{day}T09:00:00", 10.0)])
+        _write(tmp_path, f"2026-02-{day}", "energy_clean_1.parquet", rows)
+    compact = compact_frame(
+        _energy_rows("2026-02-04 10:00", [(4, "2026-02-04T09:00:00", 40.0)]),
+        ["source_file", "resource_id"],
+        ["demand_mw"],
+        float32=True,
+    )
+    _write(tmp_path, "2026-02-04", "energy_clean_1.parquet", compact)
+    df = reader.read_silver(
+        "energy",
+        "2026-02-02",
+        "2026-02-04",
+        columns=["source_record_id", "demand_mw"],
+        silver_dir=tmp_path,
+    )
+
+    assert df.to_dict("records") == [
+        {"source_record_id": 2, "demand_mw": 10.0},
+        {"source_record_id": 3, "demand_mw": 10.0},
+        {"source_record_id": 4, "demand_mw": 40.0},
+    ]
+    fragments = reader.silver_dataset(tmp_path).get_fragments(
+        filter=reader._date_filter("2026-02-02", "2026-02-03")
+    )
+    assert sorted(fragment.path for fragment in fragments) == [
+        str(tmp_path / "dt=2026-02-02" / "energy_clean_1.parquet"),
+        str(tmp_path / "dt=2026-02-03" / "energy_clean_1.parquet"),
+    ]
+
+
+def test_read_silver_dedups_run_files_before_filtering(tmp_path):
+    first = [(1, "2026-02-07T09:00:00", 150.0), (2, "2026-02-07T09:05:00", 90.0)]
+    _write(tmp_path, "2026-02-07", "run_1.parquet", _energy_rows("2026-02-07 10:00", first))
+    rerun = [(1, "2026-02-07T09:00:00", 50.0)]
+    _write(tmp_path, "2026-02-07", "run_2.parquet", _energy_rows("2026-02-07 11:00", rerun))
+
+    table = reader.read_silver(
+        "energy",
+        columns=["source_record_id", "demand_mw"],
+        filters=[("demand_mw", "<", 100.0)],
+        silver_dir=tmp_path,
+        as_arrow=True,
+    )
+    assert table.to_pylist() == [
+        {"source_record_id": 2, "demand_mw": 90.0},
+        {"source_record_id": 1, "demand_mw": 50.0},
+    ]
+
+    compact = reader.read_silver("energy", silver_dir=tmp_path, compact_dtypes=True)
+    assert isinstance(compact["resource_id"].dtype, pd.CategoricalDtype)
+    assert sorted(compact["demand_mw"]) == [50.0, 90.0]
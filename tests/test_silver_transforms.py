@@ -1,5 +1,8 @@
+import gzip
 import json
 
+import pandas as pd
+
 from transformations.silver import clean_energy, clean_weather
 
 
@@ -137,3 +140,101 @@ def test_energy_transform_canonical_schema_utc_and_dedup(tmp_path):
     deduped_row = df.loc[df["source_record_id"] == 1].iloc[0]
     assert deduped_row["demand_mw"] == 2500.0
     assert deduped_row["event_date_utc"] == "2025-08-23"
+
+
+def test_transform_reads_ingestion_timestamp_from_paged_filename(tmp_path):
+    raw_dir = tmp_path / "raw_energy"
+    raw_dir.mkdir()
+
+    payload = {
+        "help": "https://connecteddata.nationalgrid.co.uk/",
+        "success": True,
+        "result": {
+            "resource_id": "resource-123",
+            "records": [{"_id": 7, "Timestamp": "2025-08-23T22:50:00", "Demand": 2400.0}],
+            "limit": 1000,
+            "total": 1001,
+        },
+    }
+
+    _write_json(raw_dir / "energy_20260208_120000_00001.json", payload)
+    df = clean_energy.transform_energy_files(raw_dir)
+
+    assert df.loc[0, "ingestion_timestamp_utc"].isoformat() == "2026-02-08T12:00:00+00:00"
+
+
+def test_transforms_read_compressed_ndjson_like_json(tmp_path):
+    weather_payload = {
+        "id": 2643743,
+        "dt": 1704067200,
+        "name": "London",
+        "coord": {"lat": 51.5085, "lon": -0.1257},
+        "sys": {"country": "GB"},
+        "main": {"temp": 9.32, "feels_like": 7.97, "humidity": 87, "pressure": 1005},
+        "weather": [{"main": "Clouds", "description": "few clouds"}],
+        "wind": {"speed": 2.57},
+        "clouds": {"all": 20},
+    }
+    energy_payload = {
+        "result": {
+            "resource_id": "resource-123",
+            "records": [{"_id": 1, "Timestamp": "2025-08-23T22:50:00", "Demand": 2437.38}],
+        },
+    }
+    record = energy_payload["result"]["records"][0]
+    ndjson_lines = {
+        "weather": [weather_payload],
+        "energy": [{"_resource_id": "resource-123", **record}],
+    }
+    payloads = {"weather": weather_payload, "energy": energy_payload}
+    transforms = {
+        "weather": clean_weather.transform_weather_files,
+        "energy": clean_energy.transform_energy_files,
+    }
+
+    for dataset, transform in transforms.items():
+        json_dir = tmp_path / "json" / dataset
+        ndjson_dir = tmp_path / "ndjson" / dataset
+        json_dir.mkdir(parents=True)
+        ndjson_dir.mkdir(parents=True)
+        _write_json(json_dir / f"{dataset}_20260208_185041.json", payloads[dataset])
+        with gzip.open(ndjson_dir / f"{dataset}_20260208_185041.ndjson.gz", "wt") as f:
+            f.writelines(json.dumps(line) + "\n" for line in ndjson_lines[dataset])
+
+        expected = transform(json_dir).drop(columns="source_file")
+        actual = transform(ndjson_dir).drop(columns="source_file")
+        assert len(actual) == 1
+        pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_energy_transform_falls_back_for_other_timestamp_layouts(tmp_path):
+    raw_dir = tmp_path / "raw_energy"
+    raw_dir.mkdir()
+    payload = {
+        "result": {
+            "resource_id": "resource-123",
+            "records": [
+                {"_id": 1, "Timestamp": "2025-08-23T23:50:00+01:00", "Demand": "2437.5"},
+                {"_id": 2, "Timestamp": "2025-08-23T22:55:00", "Demand": None, "Solar": 3},
+            ],
+        }
+    }
+    _write_json(raw_dir / "energy_20260208_120000.json", payload)
+    _write_json(
+        raw_dir / "energy_20260208_130000.json",
+        {"result": {"resource_id": "resource-123", "records": [{"_id": 3, "Timestamp": "bad"}]}},
+    )
+
+    df = clean_energy.transform_energy_files(raw_dir)
+
+    assert list(df.columns) == clean_energy.ENERGY_CANONICAL_COLUMNS
+    assert df["source_record_id"].tolist() == [1, 2]
+    assert [ts.isoformat() for ts in df["event_timestamp_utc"]] == [
+        "2025-08-23T22:50:00+00:00",
+        "2025-08-23T22:55:00+00:00",
+    ]
+    assert df["event_date_utc"].tolist() == ["2025-08-23", "2025-08-23"]
+    assert df.loc[0, "demand_mw"] == 2437.5
+    assert pd.isna(df.loc[1, "demand_mw"])
+    assert df.loc[1, "solar_mw"] == 3.0
+    assert str(df["wind_mw"].dtype) == "float64"
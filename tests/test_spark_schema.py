@@ -0,0 +1,89 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from ingestion.common.contract_validator import validate_payload
+from ingestion.common.spark_schema import build_spark_schemas, struct_type
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CONTRACTS_DIR = PROJECT_ROOT / "data-contracts"
+SPARK_SCHEMAS_DIR = CONTRACTS_DIR / "spark"
+
+
+def _field_types(struct: dict) -> dict:
+    return {field["name"]: field["type"] for field in struct["fields"]}
+
+
+def test_committed_spark_schemas_match_contracts():
+    for file_name, schema in build_spark_schemas().items():
+        committed = json.loads((SPARK_SCHEMAS_DIR / file_name).read_text())
+        assert committed == schema, (
+            f"{file_name} is stale; run python ingestion/common/spark_schema.py"
+        )
+
+
+def test_spark_schemas_type_the_fields_silver_reads():
+    schemas = build_spark_schemas()
+
+    weather = _field_types(schemas["weather_schema.json"])
+    assert weather["dt"] == "long"
+    assert _field_types(weather["main"])["temp"] == "double"
+    assert _field_types(weather["sys"]) == {"country": "string"}
+    assert weather["weather"]["type"] == "array"
+    assert _field_types(weather["weather"]["elementType"]) == {
+        "main": "string",
+        "description": "string",
+    }
+
+    energy_result = _field_types(_field_types(schemas["energy_schema.json"])["result"])
+    record = _field_types(energy_result["records"]["elementType"])
+    # Measures arrive as numbers or numeric strings, so they are read as text and cast.
+    assert record["Demand"] == "string"
+    assert record["_id"] == "long"
+
+    ndjson_record = _field_types(schemas["energy_ndjson_schema.json"])
+    assert ndjson_record == {**record, "_resource_id": "string"}
+
+
+def test_fields_only_the_read_schemas_type_are_not_validated_at_ingestion():
+    weather = {
+        "dt": 1738800000,
+        "name": "London",
+        "cod": 200,
+        "main": {"temp": 11.2, "feels_like": 9.8, "humidity": 82, "pressure": "n/a"},
+        "weather": [{"main": "Clouds", "description": "broken clouds"}],
+        "wind": {"speed": 4.1},
+        "clouds": {"all": 70},
+        "sys": "GB",
+    }
+    energy = {
+        "help": "https://connecteddata.nationalgrid.co.uk/",
+        "success": True,
+        "result": {
+            "resource_id": "92d3431c-15d7-4aa6-ad34-2335596a026c",
+            "records": [{"_id": 1, "Timestamp": 1738800000, "Demand": [1500]}],
+            "limit": 1000,
+            "total": 1,
+        },
+    }
+
+    schemas = build_spark_schemas()
+
+    assert "sys" in _field_types(schemas["weather_schema.json"])
+    validate_payload(weather, CONTRACTS_DIR / "weather_schema.json", "weather")
+    validate_payload(energy, CONTRACTS_DIR / "energy_schema.json", "energy")
+
+
+def test_struct_type_maps_type_lists_and_rejects_unsupported_types():
+    schema = {
+        "type": "object",
+        "properties": {
+            "reading": {"type": ["integer", "number", "null"]},
+            "label": {"type": ["string", "integer"]},
+        },
+    }
+    assert _field_types(struct_type(schema)) == {"reading": "double", "label": "string"}
+
+    with pytest.raises(ValueError, match=r"\$\.payload"):
+        struct_type({"type": "object", "properties": {"payload": {"type": "object"}}})
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ingestion.common.api_client import AsyncRateLimiter
+from ingestion.weather import fetch_weather
+
+
+def _valid_weather_payload(name: str) -> dict:
+    return {
+        "dt": 1738800000,
+        "name": name,
+        "cod": 200,
+        "main": {"temp": 11.2, "feels_like": 9.8, "humidity": 82},
+        "weather": [{"main": "Clouds", "description": "broken clouds"}],
+        "wind": {"speed": 4.1},
+        "clouds": {"all": 70},
+    }
+
+
+def _config(cities: list[str], requests_per_minute: int = 6000) -> dict:
+    return {
+        "api": {
+            "cities": cities,
+            "requests_per_minute": requests_per_minute,
+            "max_concurrency": 4,
+        }
+    }
+
+
+def test_rate_limiter_spaces_request_starts():
+    async def run() -> list[float]:
+        limiter = AsyncRateLimiter(requests_per_minute=1200)
+        starts = []
+
+        async def acquire():
+            await limiter.acquire()
+            starts.append(time.monotonic())
+
+        await asyncio.gather(*(acquire() for _ in range(4)))
+        return starts
+
+    starts = asyncio.run(run())
+
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert all(gap >= 0.045 for gap in gaps)
+
+
+def test_fetch_weather_cities_runs_concurrently_and_keeps_city_order(monkeypatch):
+    in_flight = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def fake_fetch(config, city=None):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        time.sleep(0.05)
+        with lock:
+            in_flight["now"] -= 1
+        return _valid_weather_payload(city.split(",")[0])
+
+    monkeypatch.setattr(fetch_weather, "fetch_weather", fake_fetch)
+    cities = ["London,GB", "Leeds,GB", "Cardiff,GB", "Bristol,GB"]
+
+    payloads = fetch_weather.fetch_weather_cities(_config(cities))
+
+    assert [payload["name"] for payload in payloads] == ["London", "Leeds", "Cardiff", "Bristol"]
+    assert in_flight["max"] > 1
+
+
+def test_multi_city_main_writes_one_file_per_city(monkeypatch):
+    saved = []
+    cities = ["London,GB", "Milton Keynes,GB"]
+
+    monkeypatch.setattr(fetch_weather, "load_config", lambda: _config(cities))
+    monkeypatch.setattr(
+        fetch_weather,
+        "fetch_weather",
+        lambda config, city=None: _valid_weather_payload(city.split(",")[0]),
+    )
+    monkeypatch.setattr(
+        fetch_weather,
+        "save_raw_data",
+        lambda data, run_timestamp=None, part=None, **kwargs: saved.append((data["name"], part)),
+    )
+
+    fetch_weather.main()
+
+    assert saved == [("London", "london-gb"), ("Milton Keynes", "milton-keynes-gb")]
+
+
+def test_multi_city_main_writes_valid_cities_and_reports_failed_ones(monkeypatch):
+    saved = []
+    cities = ["London,GB", "Atlantis,GB", "Leeds,GB", "Cardiff,GB"]
+
+    def fake_fetch(config, city=None):
+        if city == "Atlantis,GB":
+            raise RuntimeError("404 Client Error: Not Found")
+        payload = _valid_weather_payload(city.split(",")[0])
+        if city == "Leeds,GB":
+            payload["cod"] = "200"
+        return payload
+
+    monkeypatch.setattr(fetch_weather, "load_config", lambda: _config(cities))
+    monkeypatch.setattr(fetch_weather, "fetch_weather", fake_fetch)
+    monkeypatch.setattr(
+        fetch_weather,
+        "save_raw_data",
+        lambda data, run_timestamp=None, part=None, **kwargs: saved.append(part),
+    )
+
+    with pytest.raises(RuntimeError, match="2 of 4 cities") as excinfo:
+        fetch_weather.main()
+
+    assert saved == ["london-gb", "cardiff-gb"]
+    assert "Atlantis,GB: 404" in str(excinfo.value)
+    assert "Leeds,GB:" in str(excinfo.value)
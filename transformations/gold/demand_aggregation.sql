@@ -1,19 +1,30 @@
 -- Gold Step 3: analytical aggregates for monitoring and trend analysis.
 -- Engine target: Microsoft Fabric Spark SQL.
 -- Source: gold_feature_engineering
+-- Hourly rows keep mergeable state (demand sums, sums of squares, and demand_sketch,
+-- row counts per log-spaced demand bucket); daily rows are rolled up from that state.
 
 CREATE OR REPLACE TABLE gold_demand_aggregation
 USING DELTA
+PARTITIONED BY (event_date_utc)
 AS
 WITH base AS (
     SELECT
         event_timestamp_utc,
         DATE_TRUNC('hour', event_timestamp_utc) AS hour_bucket_utc,
-        DATE_TRUNC('day', event_timestamp_utc) AS day_bucket_utc,
         city,
         country_code,
         resource_id,
         demand_mw,
+        CASE
+            WHEN demand_mw = 0 THEN 0
+            ELSE CAST(
+                SIGN(demand_mw) * GREATEST(
+                    CEIL(LN(ABS(demand_mw)) / LN(1.02020202020202D)) + 1000,
+                    1
+                ) AS INT
+            )
+        END AS demand_sketch_key,
         generation_mw,
         import_mw,
         solar_mw,
@@ -41,70 +52,195 @@ WITH base AS (
       AND resource_id IS NOT NULL
       AND demand_mw IS NOT NULL
 ),
-hourly AS (
+hourly_cells AS (
     SELECT
-        'hourly' AS aggregation_level,
-        hour_bucket_utc AS bucket_start_utc,
-        hour_bucket_utc + INTERVAL 1 HOUR AS bucket_end_utc,
-        CAST(hour_bucket_utc AS DATE) AS event_date_utc,
+        hour_bucket_utc,
         city,
         country_code,
         resource_id,
+        demand_sketch_key,
         COUNT(*) AS sample_count,
-        AVG(demand_mw) AS demand_avg_mw,
+        SUM(demand_mw) AS demand_sum_mw,
+        SUM(demand_mw * demand_mw) AS demand_sum_squares_mw2,
         MIN(demand_mw) AS demand_min_mw,
         MAX(demand_mw) AS demand_max_mw,
-        percentile_approx(demand_mw, 0.95) AS demand_p95_mw,
-        stddev_samp(demand_mw) AS demand_stddev_mw,
-        AVG(generation_mw) AS generation_avg_mw,
-        AVG(import_mw) AS import_avg_mw,
-        AVG(solar_mw) AS solar_avg_mw,
-        AVG(wind_mw) AS wind_avg_mw,
-        AVG(renewable_share) AS renewable_share_avg,
-        AVG(temperature) AS temperature_avg_c,
+        SUM(generation_mw) AS generation_sum_mw,
+        COUNT(generation_mw) AS generation_count,
+        SUM(import_mw) AS import_sum_mw,
+        COUNT(import_mw) AS import_count,
+        SUM(solar_mw) AS solar_sum_mw,
+        COUNT(solar_mw) AS solar_count,
+        SUM(wind_mw) AS wind_sum_mw,
+        COUNT(wind_mw) AS wind_count,
+        SUM(renewable_share) AS renewable_share_sum,
+        COUNT(renewable_share) AS renewable_share_count,
+        SUM(temperature) AS temperature_sum_c,
+        COUNT(temperature) AS temperature_count,
         MIN(temperature) AS temperature_min_c,
         MAX(temperature) AS temperature_max_c,
-        AVG(humidity) AS humidity_avg_pct,
-        AVG(wind_speed_mps) AS wind_speed_avg_mps,
-        AVG(cloud_cover_pct) AS cloud_cover_avg_pct,
-        AVG(heating_degree_c) AS heating_degree_avg_c,
-        AVG(cooling_degree_c) AS cooling_degree_avg_c,
-        max_by(weather_main, event_timestamp_utc) AS latest_weather_main
+        SUM(humidity) AS humidity_sum_pct,
+        COUNT(humidity) AS humidity_count,
+        SUM(wind_speed_mps) AS wind_speed_sum_mps,
+        COUNT(wind_speed_mps) AS wind_speed_count,
+        SUM(cloud_cover_pct) AS cloud_cover_sum_pct,
+        COUNT(cloud_cover_pct) AS cloud_cover_count,
+        SUM(heating_degree_c) AS heating_degree_sum_c,
+        COUNT(heating_degree_c) AS heating_degree_count,
+        SUM(cooling_degree_c) AS cooling_degree_sum_c,
+        COUNT(cooling_degree_c) AS cooling_degree_count,
+        max_by(weather_main, event_timestamp_utc) AS latest_weather_main,
+        MAX(event_timestamp_utc) AS latest_event_timestamp_utc
     FROM base
+    GROUP BY hour_bucket_utc, city, country_code, resource_id, demand_sketch_key
+),
+hourly_state AS (
+    SELECT
+        'hourly' AS aggregation_level,
+        hour_bucket_utc AS bucket_start_utc,
+        hour_bucket_utc + INTERVAL 1 HOUR AS bucket_end_utc,
+        city,
+        country_code,
+        resource_id,
+        SUM(sample_count) AS sample_count,
+        SUM(demand_sum_mw) AS demand_sum_mw,
+        SUM(demand_sum_squares_mw2) AS demand_sum_squares_mw2,
+        MIN(demand_min_mw) AS demand_min_mw,
+        MAX(demand_max_mw) AS demand_max_mw,
+        map_from_entries(
+            collect_list(struct(demand_sketch_key, sample_count))
+        ) AS demand_sketch,
+        SUM(generation_sum_mw) AS generation_sum_mw,
+        SUM(generation_count) AS generation_count,
+        SUM(import_sum_mw) AS import_sum_mw,
+        SUM(import_count) AS import_count,
+        SUM(solar_sum_mw) AS solar_sum_mw,
+        SUM(solar_count) AS solar_count,
+        SUM(wind_sum_mw) AS wind_sum_mw,
+        SUM(wind_count) AS wind_count,
+        SUM(renewable_share_sum) AS renewable_share_sum,
+        SUM(renewable_share_count) AS renewable_share_count,
+        SUM(temperature_sum_c) AS temperature_sum_c,
+        SUM(temperature_count) AS temperature_count,
+        MIN(temperature_min_c) AS temperature_min_c,
+        MAX(temperature_max_c) AS temperature_max_c,
+        SUM(humidity_sum_pct) AS humidity_sum_pct,
+        SUM(humidity_count) AS humidity_count,
+        SUM(wind_speed_sum_mps) AS wind_speed_sum_mps,
+        SUM(wind_speed_count) AS wind_speed_count,
+        SUM(cloud_cover_sum_pct) AS cloud_cover_sum_pct,
+        SUM(cloud_cover_count) AS cloud_cover_count,
+        SUM(heating_degree_sum_c) AS heating_degree_sum_c,
+        SUM(heating_degree_count) AS heating_degree_count,
+        SUM(cooling_degree_sum_c) AS cooling_degree_sum_c,
+        SUM(cooling_degree_count) AS cooling_degree_count,
+        max_by(latest_weather_main, latest_event_timestamp_utc) AS latest_weather_main,
+        MAX(latest_event_timestamp_utc) AS latest_event_timestamp_utc
+    FROM hourly_cells
     GROUP BY hour_bucket_utc, city, country_code, resource_id
 ),
-daily AS (
+daily_state AS (
     SELECT
         'daily' AS aggregation_level,
-        day_bucket_utc AS bucket_start_utc,
-        day_bucket_utc + INTERVAL 1 DAY AS bucket_end_utc,
-        CAST(day_bucket_utc AS DATE) AS event_date_utc,
+        DATE_TRUNC('day', bucket_start_utc) AS bucket_start_utc,
+        DATE_TRUNC('day', bucket_start_utc) + INTERVAL 1 DAY AS bucket_end_utc,
         city,
         country_code,
         resource_id,
-        COUNT(*) AS sample_count,
-        AVG(demand_mw) AS demand_avg_mw,
-        MIN(demand_mw) AS demand_min_mw,
-        MAX(demand_mw) AS demand_max_mw,
-        percentile_approx(demand_mw, 0.95) AS demand_p95_mw,
-        stddev_samp(demand_mw) AS demand_stddev_mw,
-        AVG(generation_mw) AS generation_avg_mw,
-        AVG(import_mw) AS import_avg_mw,
-        AVG(solar_mw) AS solar_avg_mw,
-        AVG(wind_mw) AS wind_avg_mw,
-        AVG(renewable_share) AS renewable_share_avg,
-        AVG(temperature) AS temperature_avg_c,
-        MIN(temperature) AS temperature_min_c,
-        MAX(temperature) AS temperature_max_c,
-        AVG(humidity) AS humidity_avg_pct,
-        AVG(wind_speed_mps) AS wind_speed_avg_mps,
-        AVG(cloud_cover_pct) AS cloud_cover_avg_pct,
-        AVG(heating_degree_c) AS heating_degree_avg_c,
-        AVG(cooling_degree_c) AS cooling_degree_avg_c,
-        max_by(weather_main, event_timestamp_utc) AS latest_weather_main
-    FROM base
-    GROUP BY day_bucket_utc, city, country_code, resource_id
+        SUM(sample_count) AS sample_count,
+        SUM(demand_sum_mw) AS demand_sum_mw,
+        SUM(demand_sum_squares_mw2) AS demand_sum_squares_mw2,
+        MIN(demand_min_mw) AS demand_min_mw,
+        MAX(demand_max_mw) AS demand_max_mw,
+        aggregate(
+            collect_list(demand_sketch),
+            CAST(map() AS MAP<INT, BIGINT>),
+            (merged, sketch) -> map_zip_with(
+                merged, sketch, (bucket_key, left_count, right_count) ->
+                    COALESCE(left_count, 0) + COALESCE(right_count, 0)
+            )
+        ) AS demand_sketch,
+        SUM(generation_sum_mw) AS generation_sum_mw,
+        SUM(generation_count) AS generation_count,
+        SUM(import_sum_mw) AS import_sum_mw,
+        SUM(import_count) AS import_count,
+        SUM(solar_sum_mw) AS solar_sum_mw,
+        SUM(solar_count) AS solar_count,
+        SUM(wind_sum_mw) AS wind_sum_mw,
+        SUM(wind_count) AS wind_count,
+        SUM(renewable_share_sum) AS renewable_share_sum,
+        SUM(renewable_share_count) AS renewable_share_count,
+        SUM(temperature_sum_c) AS temperature_sum_c,
+        SUM(temperature_count) AS temperature_count,
+        MIN(temperature_min_c) AS temperature_min_c,
+        MAX(temperature_max_c) AS temperature_max_c,
+        SUM(humidity_sum_pct) AS humidity_sum_pct,
+        SUM(humidity_count) AS humidity_count,
+        SUM(wind_speed_sum_mps) AS wind_speed_sum_mps,
+        SUM(wind_speed_count) AS wind_speed_count,
+        SUM(cloud_cover_sum_pct) AS cloud_cover_sum_pct,
+        SUM(cloud_cover_count) AS cloud_cover_count,
+        SUM(heating_degree_sum_c) AS heating_degree_sum_c,
+        SUM(heating_degree_count) AS heating_degree_count,
+        SUM(cooling_degree_sum_c) AS cooling_degree_sum_c,
+        SUM(cooling_degree_count) AS cooling_degree_count,
+        max_by(latest_weather_main, latest_event_timestamp_utc) AS latest_weather_main,
+        MAX(latest_event_timestamp_utc) AS latest_event_timestamp_utc
+    FROM hourly_state
+    GROUP BY DATE_TRUNC('day', bucket_start_utc), city, country_code, resource_id
+),
+rollup_state AS (
+    SELECT * FROM hourly_state
+    UNION ALL
+    SELECT * FROM daily_state
 )
-SELECT * FROM hourly
-UNION ALL
-SELECT * FROM daily;
+SELECT
+    aggregation_level,
+    bucket_start_utc,
+    bucket_end_utc,
+    CAST(bucket_start_utc AS DATE) AS event_date_utc,
+    city,
+    country_code,
+    resource_id,
+    sample_count,
+    demand_sum_mw / sample_count AS demand_avg_mw,
+    demand_min_mw,
+    demand_max_mw,
+    aggregate(
+        array_sort(map_entries(demand_sketch)),
+        named_struct('seen', CAST(0 AS BIGINT), 'sketch_key', CAST(NULL AS INT)),
+        (acc, bucket) -> named_struct(
+            'seen', acc.seen + bucket.value,
+            'sketch_key', COALESCE(
+                acc.sketch_key,
+                IF(acc.seen + bucket.value > 0.95D * (sample_count - 1), bucket.key, NULL)
+            )
+        ),
+        acc -> SIGN(acc.sketch_key) * 2
+            * POWER(1.02020202020202D, ABS(acc.sketch_key) - 1000)
+            / (1.02020202020202D + 1)
+    ) AS demand_p95_mw,
+    CASE
+        WHEN sample_count > 1 THEN SQRT(GREATEST(
+            (demand_sum_squares_mw2 - demand_sum_mw * demand_sum_mw / sample_count)
+            / (sample_count - 1),
+            0
+        ))
+    END AS demand_stddev_mw,
+    generation_sum_mw / NULLIF(generation_count, 0) AS generation_avg_mw,
+    import_sum_mw / NULLIF(import_count, 0) AS import_avg_mw,
+    solar_sum_mw / NULLIF(solar_count, 0) AS solar_avg_mw,
+    wind_sum_mw / NULLIF(wind_count, 0) AS wind_avg_mw,
+    renewable_share_sum / NULLIF(renewable_share_count, 0) AS renewable_share_avg,
+    temperature_sum_c / NULLIF(temperature_count, 0) AS temperature_avg_c,
+    temperature_min_c,
+    temperature_max_c,
+    humidity_sum_pct / NULLIF(humidity_count, 0) AS humidity_avg_pct,
+    wind_speed_sum_mps / NULLIF(wind_speed_count, 0) AS wind_speed_avg_mps,
+    cloud_cover_sum_pct / NULLIF(cloud_cover_count, 0) AS cloud_cover_avg_pct,
+    heating_degree_sum_c / NULLIF(heating_degree_count, 0) AS heating_degree_avg_c,
+    cooling_degree_sum_c / NULLIF(cooling_degree_count, 0) AS cooling_degree_avg_c,
+    latest_weather_main,
+    demand_sum_mw,
+    demand_sum_squares_mw2,
+    demand_sketch
+FROM rollup_state;
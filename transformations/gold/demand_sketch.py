@@ -0,0 +1,79 @@
+import math
+from collections import Counter
+from collections.abc import Iterable
+
+import numpy as np
+
+# Same parameters as DEMAND_SKETCH_* in fabric/notebooks/03_build_gold_tables.py.
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+# Keeps keys of non-zero values away from 0, which is reserved for zero itself.
+# Magnitudes below GAMMA ** (1 - KEY_OFFSET), about 2e-9, share the smallest key.
+KEY_OFFSET = 1000
+
+
+def sketch_keys(values: Iterable[float]) -> np.ndarray:
+    """Log-spaced bucket key per value, as demand_sketch_key in gold_demand_aggregation."""
+    values = np.asarray(values, dtype="float64")
+    keys = np.zeros(values.shape, dtype="int64")
+    nonzero = values != 0
+    magnitude_keys = np.ceil(np.log(np.abs(values[nonzero])) / math.log(GAMMA)) + KEY_OFFSET
+    keys[nonzero] = np.sign(values[nonzero]) * np.maximum(magnitude_keys, 1)
+    return keys
+
+
+def key_value(key: int) -> float:
+    """Representative value of a bucket, within RELATIVE_ACCURACY of every value in it."""
+    if key == 0:
+        return 0.0
+    return math.copysign(2 * GAMMA ** (abs(key) - KEY_OFFSET) / (GAMMA + 1), key)
+
+
+def build_sketch(values: Iterable[float]) -> dict[int, int]:
+    """Row count per bucket key."""
+    keys, counts = np.unique(sketch_keys(values), return_counts=True)
+    return dict(zip(keys.tolist(), counts.tolist()))
+
+
+def merge_sketches(sketches: Iterable[dict[int, int]]) -> dict[int, int]:
+    """Sketch of the union of the sketched values: bucket counts add up."""
+    merged = Counter()
+    for sketch in sketches:
+        merged.update(sketch)
+    return dict(merged)
+
+
+def sketch_quantile(sketch: dict[int, int], quantile: float) -> float | None:
+    """Approximate value at rank quantile * (count - 1), like demand_p95_mw."""
+    count = sum(sketch.values())
+    if count == 0:
+        return None
+    rank = quantile * (count - 1)
+    seen = 0
+    for key in sorted(sketch):
+        seen += sketch[key]
+        if seen > rank:
+            return key_value(key)
+    return key_value(max(sketch))
+
+
+def moments(values: Iterable[float]) -> tuple[int, float, float]:
+    """(count, sum, sum of squares); moments of disjoint sets add element-wise."""
+    values = np.asarray(values, dtype="float64")
+    return len(values), float(values.sum()), float(np.square(values).sum())
+
+
+def merge_moments(parts: Iterable[tuple[int, float, float]]) -> tuple[int, float, float]:
+    count, total, total_squares = 0, 0.0, 0.0
+    for part_count, part_total, part_squares in parts:
+        count += part_count
+        total += part_total
+        total_squares += part_squares
+    return count, total, total_squares
+
+
+def moments_stddev(count: int, total: float, total_squares: float) -> float | None:
+    """Sample standard deviation, like stddev_samp; None below two values."""
+    if count < 2:
+        return None
+    return math.sqrt(max((total_squares - total * total / count) / (count - 1), 0.0))
@@ -5,6 +5,7 @@
 
 CREATE OR REPLACE TABLE gold_feature_engineering
 USING DELTA
+PARTITIONED BY (event_date_utc)
 AS
 WITH base AS (
     SELECT
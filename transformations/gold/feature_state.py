@@ -0,0 +1,313 @@
+import argparse
+import math
+import os
+import sys
+from collections import deque
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from transformations.gold.weather_demand_join import GOLD_DIR as GOLD_JOIN_DIR
+from transformations.silver.reader import PARTITION_FIELD, silver_dataset
+
+GOLD_FEATURES_DIR = Path("data/gold/feature_engineering")
+FEATURE_STATE_PATH = Path("data/state/feature_state.parquet")
+
+# Same window as the 12-row rolling means in feature_engineering.sql.
+ROLLING_WINDOW = 12
+KEY_COLUMNS = ["resource_id", "city"]
+# One feature row per key and event time, as the append MERGE in notebook 03.
+FEATURE_KEY_COLUMNS = [*KEY_COLUMNS, "event_timestamp_utc"]
+STATE_COLUMNS = [
+    *KEY_COLUMNS,
+    "last_event_timestamp_utc",
+    "demand_window",
+    "temperature_window",
+    "demand_window_sum",
+    "temperature_window_sum",
+]
+
+# Column order of gold_feature_engineering.
+FEATURE_COLUMNS = [
+    "event_timestamp_utc",
+    "event_date_utc",
+    "city",
+    "country_code",
+    "resource_id",
+    "temperature",
+    "humidity",
+    "demand_mw",
+    "generation_mw",
+    "import_mw",
+    "solar_mw",
+    "wind_mw",
+    "stor_mw",
+    "other_mw",
+    "pressure_hpa",
+    "cloud_cover_pct",
+    "wind_speed_mps",
+    "weather_main",
+    "weather_description",
+    "weather_age_minutes",
+    "hour_of_day_utc",
+    "day_of_week_utc",
+    "is_weekend_utc",
+    "temperature_sq",
+    "demand_lag_1",
+    "temperature_lag_1",
+    "demand_delta_1",
+    "temperature_delta_1",
+    "demand_rolling_mean_12",
+    "temperature_rolling_mean_12",
+]
+
+
+def feature_base(joined: pd.DataFrame) -> pd.DataFrame:
+    """Join rows that get features, as the base CTE of feature_engineering.sql."""
+    temperature = joined["temperature_c"].fillna(joined["feels_like_c"])
+    keep = (
+        joined["demand_mw"].notna()
+        & joined["city"].notna()
+        & temperature.notna()
+        & joined["humidity_pct"].notna()
+    )
+    base = joined.loc[keep].assign(
+        temperature=temperature[keep],
+        humidity=joined.loc[keep, "humidity_pct"],
+        event_timestamp_utc=pd.to_datetime(joined.loc[keep, "event_timestamp_utc"], utc=True),
+    )
+    return base.sort_values(["event_timestamp_utc", *KEY_COLUMNS], kind="mergesort")
+
+
+class _KeyState:
+    __slots__ = (
+        "last_event_timestamp_utc",
+        "demand",
+        "temperature",
+        "demand_sum",
+        "temperature_sum",
+    )
+
+    def __init__(self, window: int):
+        self.last_event_timestamp_utc = None
+        self.demand = deque(maxlen=window)
+        self.temperature = deque(maxlen=window)
+        self.demand_sum = 0.0
+        self.temperature_sum = 0.0
+
+    def push(self, event_ts: pd.Timestamp, demand: float, temperature: float):
+        """Add one row; returns its lags and rolling means in O(1)."""
+        demand_lag = self.demand[-1] if self.demand else math.nan
+        temperature_lag = self.temperature[-1] if self.temperature else math.nan
+        if len(self.demand) == self.demand.maxlen:
+            self.demand_sum -= self.demand[0]
+            self.temperature_sum -= self.temperature[0]
+        self.demand.append(demand)
+        self.temperature.append(temperature)
+        self.demand_sum += demand
+        self.temperature_sum += temperature
+        self.last_event_timestamp_utc = event_ts
+        return (
+            demand_lag,
+            temperature_lag,
+            self.demand_sum / len(self.demand),
+            self.temperature_sum / len(self.temperature),
+        )
+
+
+class FeatureStateStore:
+    """Last ROLLING_WINDOW demand and temperature values and their sums per (resource_id, city).
+
+    New join rows are featurised from the stored state instead of re-running
+    the window functions over history, at O(1) per row. Only rows later than
+    their key's last featurised timestamp can be added this way; earlier ones
+    are returned as late so a window rebuild can place them.
+    """
+
+    def __init__(self, window: int = ROLLING_WINDOW):
+        self.window = window
+        self.keys: dict[tuple, _KeyState] = {}
+
+    @classmethod
+    def load(cls, state_path: Path = FEATURE_STATE_PATH, window: int = ROLLING_WINDOW):
+        store = cls(window)
+        if not state_path.exists():
+            return store
+        for row in pd.read_parquet(state_path).itertuples(index=False):
+            state = _KeyState(window)
+            state.last_event_timestamp_utc = row.last_event_timestamp_utc
+            state.demand.extend(row.demand_window)
+            state.temperature.extend(row.temperature_window)
+            # Summed afresh so rounding from the running updates does not carry over.
+            state.demand_sum = math.fsum(state.demand)
+            state.temperature_sum = math.fsum(state.temperature)
+            store.keys[(row.resource_id, row.city)] = state
+        return store
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = [
+            (
+                *key,
+                state.last_event_timestamp_utc,
+                list(state.demand),
+                list(state.temperature),
+                math.fsum(state.demand),
+                math.fsum(state.temperature),
+            )
+            for key, state in self.keys.items()
+        ]
+        return pd.DataFrame(rows, columns=STATE_COLUMNS)
+
+    def save(self, state_path: Path = FEATURE_STATE_PATH) -> None:
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = state_path.with_name(f".{state_path.name}.tmp")
+        self.to_frame().to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, state_path)
+
+    def featurise(self, joined: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Features for new join rows and the late rows that were left out.
+
+        Rows are taken in event time order and each one updates its key's
+        state, so a batch may hold several rows per key, including rows at the
+        same timestamp. Only rows at or before the key's last timestamp when
+        the batch started are late.
+        """
+        base = feature_base(joined)
+        cutoffs = {key: state.last_event_timestamp_utc for key, state in self.keys.items()}
+        row_count = len(base)
+        is_new = np.zeros(row_count, dtype=bool)
+        window_values = np.full((4, row_count), np.nan)
+
+        rows = zip(
+            base["resource_id"],
+            base["city"],
+            base["event_timestamp_utc"],
+            base["demand_mw"].astype("float64"),
+            base["temperature"].astype("float64"),
+        )
+        for position, (resource_id, city, event_ts, demand, temperature) in enumerate(rows):
+            cutoff = cutoffs.get((resource_id, city))
+            if cutoff is not None and event_ts <= cutoff:
+                continue
+            state = self.keys.get((resource_id, city))
+            if state is None:
+                state = self.keys[(resource_id, city)] = _KeyState(self.window)
+            is_new[position] = True
+            window_values[:, position] = state.push(event_ts, demand, temperature)
+
+        demand_lag, temperature_lag, demand_mean, temperature_mean = window_values[:, is_new]
+        features = base.loc[is_new]
+        event_ts = features["event_timestamp_utc"]
+        # DAYOFWEEK counts from Sunday = 1.
+        day_of_week = (event_ts.dt.dayofweek + 1) % 7 + 1
+        features = features.assign(
+            hour_of_day_utc=event_ts.dt.hour,
+            day_of_week_utc=day_of_week,
+            is_weekend_utc=day_of_week.isin([1, 7]).astype("int32"),
+            temperature_sq=features["temperature"] * features["temperature"],
+            demand_lag_1=demand_lag,
+            temperature_lag_1=temperature_lag,
+            demand_delta_1=features["demand_mw"] - demand_lag,
+            temperature_delta_1=features["temperature"] - temperature_lag,
+            demand_rolling_mean_12=demand_mean,
+            temperature_rolling_mean_12=temperature_mean,
+        )
+        return features[FEATURE_COLUMNS].reset_index(drop=True), base.loc[~is_new]
+
+
+def read_gold_join(
+    start: str | date | None = None,
+    end: str | date | None = None,
+    join_dir: Path = GOLD_JOIN_DIR,
+) -> pd.DataFrame:
+    if not join_dir.exists():
+        raise FileNotFoundError(f"No gold weather/demand join found in {join_dir}.")
+    date_filter = None
+    if start is not None:
+        date_filter = ds.field(PARTITION_FIELD) >= str(start)
+    if end is not None:
+        end_filter = ds.field(PARTITION_FIELD) <= str(end)
+        date_filter = end_filter if date_filter is None else date_filter & end_filter
+    table = silver_dataset(join_dir).to_table(filter=date_filter)
+    return table.drop_columns([PARTITION_FIELD]).to_pandas()
+
+
+def save_features(df: pd.DataFrame, output_path: Path = GOLD_FEATURES_DIR) -> list[Path]:
+    """Upsert feature rows into each event_date_utc partition on FEATURE_KEY_COLUMNS.
+
+    A partition is one file, replaced atomically, so rerunning a batch whose
+    state was never saved rewrites its rows instead of adding them again.
+    """
+    written_files = []
+    for event_date, partition_df in df.groupby(df["event_date_utc"].astype(str), sort=True):
+        output_dir = output_path / f"dt={event_date}"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_file = output_dir / "features.parquet"
+        if output_file.exists():
+            stored = pd.read_parquet(output_file)
+            partition_df = (
+                pd.concat([stored, partition_df], ignore_index=True)
+                .drop_duplicates(FEATURE_KEY_COLUMNS, keep="last")
+                .sort_values(["event_timestamp_utc", *KEY_COLUMNS], kind="mergesort")
+            )
+        tmp_file = output_dir / f".{output_file.name}.tmp"
+        partition_df.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, output_file)
+        written_files.append(output_file)
+    return written_files
+
+
+def build_online_features(
+    start: str | date | None = None,
+    end: str | date | None = None,
+    join_dir: Path = GOLD_JOIN_DIR,
+    output_path: Path = GOLD_FEATURES_DIR,
+    state_path: Path = FEATURE_STATE_PATH,
+) -> dict:
+    """Featurise join rows dated start..end that are newer than the stored state.
+
+    Features are saved before the state, so a run that fails in between is
+    repeated in full next time and its rows are replaced, not duplicated.
+    """
+    store = FeatureStateStore.load(state_path)
+    features, late_rows = store.featurise(read_gold_join(start, end, join_dir))
+    written_files = save_features(features, output_path)
+    store.save(state_path)
+    return {
+        "new_rows": len(features),
+        "late_rows": len(late_rows),
+        "keys": len(store.keys),
+        "files": [str(path) for path in written_files],
+    }
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Add gold feature rows for new join rows from the online feature state."
+    )
+    parser.add_argument("--start", help="First join event date, YYYY-MM-DD.")
+    parser.add_argument("--end", help="Last join event date, YYYY-MM-DD.")
+    parser.add_argument("--join-dir", type=Path, default=GOLD_JOIN_DIR)
+    parser.add_argument("--output-dir", type=Path, default=GOLD_FEATURES_DIR)
+    parser.add_argument("--state-path", type=Path, default=FEATURE_STATE_PATH)
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    args = build_arg_parser().parse_args(argv)
+    print(
+        build_online_features(
+            args.start, args.end, args.join_dir, args.output_dir, args.state_path
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
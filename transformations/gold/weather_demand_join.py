@@ -0,0 +1,188 @@
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from transformations.silver.reader import read_silver
+
+GOLD_DIR = Path("data/gold/weather_demand_join")
+
+# Same window as weather_demand_join.sql: readings from 6h before to 1h after.
+LOOKBACK = pd.Timedelta(hours=6)
+LOOKAHEAD = pd.Timedelta(hours=1)
+
+ENERGY_COLUMNS = [
+    "resource_id",
+    "source_record_id",
+    "event_timestamp_utc",
+    "event_date_utc",
+    "demand_mw",
+    "generation_mw",
+    "import_mw",
+    "solar_mw",
+    "wind_mw",
+    "stor_mw",
+    "other_mw",
+    "ingestion_timestamp_utc",
+]
+WEATHER_COLUMNS = [
+    "city",
+    "country_code",
+    "event_timestamp_utc",
+    "temperature_c",
+    "feels_like_c",
+    "humidity_pct",
+    "pressure_hpa",
+    "cloud_cover_pct",
+    "wind_speed_mps",
+    "weather_main",
+    "weather_description",
+    "ingestion_timestamp_utc",
+]
+WEATHER_RENAMES = {
+    "event_timestamp_utc": "weather_event_timestamp_utc",
+    "ingestion_timestamp_utc": "weather_ingestion_timestamp_utc",
+}
+
+# Column order of gold_weather_demand_join.
+GOLD_COLUMNS = [
+    "resource_id",
+    "source_record_id",
+    "event_timestamp_utc",
+    "event_date_utc",
+    "city",
+    "country_code",
+    "demand_mw",
+    "generation_mw",
+    "import_mw",
+    "solar_mw",
+    "wind_mw",
+    "stor_mw",
+    "other_mw",
+    "weather_event_timestamp_utc",
+    "weather_age_minutes",
+    "weather_time_delta_minutes",
+    "temperature_c",
+    "feels_like_c",
+    "humidity_pct",
+    "pressure_hpa",
+    "cloud_cover_pct",
+    "wind_speed_mps",
+    "weather_main",
+    "weather_description",
+    "energy_ingestion_timestamp_utc",
+    "weather_ingestion_timestamp_utc",
+]
+
+
+def _utc_ns(values: pd.Series) -> pd.Series:
+    return pd.to_datetime(values, utc=True).astype("datetime64[ns, UTC]")
+
+
+def _whole_minutes(delta: pd.Series) -> pd.Series:
+    # CAST(seconds / 60 AS INT) truncates toward zero.
+    return pd.Series(np.trunc(delta.dt.total_seconds() / 60), index=delta.index).astype("Int32")
+
+
+def build_weather_demand_join(energy: pd.DataFrame, weather: pd.DataFrame) -> pd.DataFrame:
+    """Attach the nearest weather reading to every energy row, as gold_weather_demand_join.
+
+    Two sorted as-of joins find the latest reading up to 6h before and the
+    earliest up to 1h after each energy timestamp; the closer one wins and
+    ties go to the later reading. Energy rows without a reading in the
+    window keep null weather columns. Runs in O(n log n) instead of the
+    SQL's range join.
+    """
+    left = energy[ENERGY_COLUMNS].rename(
+        columns={"ingestion_timestamp_utc": "energy_ingestion_timestamp_utc"}
+    )
+    left = left.assign(event_timestamp_utc=_utc_ns(left["event_timestamp_utc"]))
+    left = left.sort_values(
+        ["event_timestamp_utc", "resource_id", "source_record_id"], kind="mergesort"
+    ).reset_index(drop=True)
+
+    right = weather[WEATHER_COLUMNS].rename(columns=WEATHER_RENAMES)
+    right = right.assign(
+        weather_event_timestamp_utc=_utc_ns(right["weather_event_timestamp_utc"])
+    ).dropna(subset=["weather_event_timestamp_utc"])
+    right = right.sort_values(["weather_event_timestamp_utc", "city"], kind="mergesort")
+
+    asof = {
+        "left_on": "event_timestamp_utc",
+        "right_on": "weather_event_timestamp_utc",
+    }
+    before = pd.merge_asof(left, right, direction="backward", tolerance=LOOKBACK, **asof)
+    after = pd.merge_asof(left, right, direction="forward", tolerance=LOOKAHEAD, **asof)
+
+    event_ts = left["event_timestamp_utc"]
+    before_delta = event_ts - before["weather_event_timestamp_utc"]
+    after_delta = after["weather_event_timestamp_utc"] - event_ts
+    use_after = after_delta.notna() & (before_delta.isna() | (after_delta <= before_delta))
+
+    weather_columns = list(right.columns)
+    joined = before.copy()
+    joined[weather_columns] = before[weather_columns].mask(use_after, after[weather_columns])
+
+    age = event_ts - joined["weather_event_timestamp_utc"]
+    joined["weather_age_minutes"] = _whole_minutes(age)
+    joined["weather_time_delta_minutes"] = _whole_minutes(age.abs())
+    return joined[GOLD_COLUMNS]
+
+
+def save_gold_join(df: pd.DataFrame, output_path: Path = GOLD_DIR) -> list[Path]:
+    """Replace each event_date_utc partition of the local gold join with one file."""
+    written_files = []
+    for event_date, partition_df in df.groupby(df["event_date_utc"].astype(str), sort=True):
+        output_dir = output_path / f"dt={event_date}"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_file = output_dir / "weather_demand_join.parquet"
+        tmp_file = output_dir / f".{output_file.name}.tmp"
+        partition_df.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, output_file)
+        written_files.append(output_file)
+    return written_files
+
+
+def build_gold_join(
+    start: str | date | None = None,
+    end: str | date | None = None,
+    energy_dir: Path | None = None,
+    weather_dir: Path | None = None,
+) -> pd.DataFrame:
+    """Join silver energy dated start..end with the weather around it."""
+    weather_start = date.fromisoformat(str(start)) - timedelta(days=1) if start else None
+    weather_end = date.fromisoformat(str(end)) + timedelta(days=1) if end else None
+    energy = read_silver("energy", start, end, columns=ENERGY_COLUMNS, silver_dir=energy_dir)
+    weather = read_silver(
+        "weather", weather_start, weather_end, columns=WEATHER_COLUMNS, silver_dir=weather_dir
+    )
+    return build_weather_demand_join(energy, weather)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Build gold_weather_demand_join locally from silver parquet."
+    )
+    parser.add_argument("--start", help="First energy event date, YYYY-MM-DD.")
+    parser.add_argument("--end", help="Last energy event date, YYYY-MM-DD.")
+    parser.add_argument("--output-dir", type=Path, default=GOLD_DIR)
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    args = build_arg_parser().parse_args(argv)
+    df = build_gold_join(args.start, args.end)
+    for output_file in save_gold_join(df, args.output_dir):
+        print(f"Saved gold weather/demand join to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,33 @@
 -- Expected Lakehouse tables:
 --   silver_energy
 --   silver_weather
+--
+-- Candidate readings lie from 6h before to 1h after each energy row. Energy
+-- rows are expanded into the 8 hour buckets that window spans and equi-joined
+-- to weather on its hour bucket, instead of range-joining against all weather.
 
 CREATE OR REPLACE TABLE gold_weather_demand_join
 USING DELTA
+PARTITIONED BY (event_date_utc)
 AS
-WITH candidate_pairs AS (
+WITH energy_buckets AS (
+    SELECT
+        e.*,
+        explode(
+            sequence(
+                FLOOR(unix_timestamp(e.event_timestamp_utc) / 3600) - 6,
+                FLOOR(unix_timestamp(e.event_timestamp_utc) / 3600) + 1
+            )
+        ) AS weather_bucket
+    FROM silver_energy e
+),
+weather_buckets AS (
+    SELECT
+        w.*,
+        FLOOR(unix_timestamp(w.event_timestamp_utc) / 3600) AS weather_bucket
+    FROM silver_weather w
+),
+candidate_pairs AS (
     SELECT
         e.resource_id,
         e.source_record_id,
@@ -38,12 +60,14 @@ WITH candidate_pairs AS (
         ROW_NUMBER() OVER (
             PARTITION BY e.resource_id, e.source_record_id, e.event_timestamp_utc
             ORDER BY
-                ABS(unix_timestamp(e.event_timestamp_utc) - unix_timestamp(w.event_timestamp_utc)),
+                ABS(unix_timestamp(e.event_timestamp_utc) - unix_timestamp(w.event_timestamp_utc))
+                    ASC NULLS LAST,
                 w.event_timestamp_utc DESC
         ) AS match_rank
-    FROM silver_energy e
-    LEFT JOIN silver_weather w
-        ON w.event_timestamp_utc BETWEEN e.event_timestamp_utc - INTERVAL 6 HOURS
+    FROM energy_buckets e
+    LEFT JOIN weather_buckets w
+        ON w.weather_bucket = e.weather_bucket
+       AND w.event_timestamp_utc BETWEEN e.event_timestamp_utc - INTERVAL 6 HOURS
                                      AND e.event_timestamp_utc + INTERVAL 1 HOUR
 )
 SELECT
@@ -1,13 +1,33 @@
-import json
+import argparse
+import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 import pandas as pd
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ingestion.common.bronze_store import list_raw_files, read_raw_payload
+from transformations.silver.dedup_index import DEDUP_INDEX_DIR, DedupIndex
+from transformations.silver.dtypes import compactor
+from transformations.silver.file_manifest import MANIFEST_DIR, FileManifest
+from transformations.silver.parallel import map_files
+from transformations.silver.partitions import dedup_latest, merge_into_partitions
+from transformations.silver.streaming import stream_to_silver
 
 RAW_DIR = Path("data/raw/weather")
 SILVER_DIR = Path("data/silver/weather")
+MANIFEST_PATH = MANIFEST_DIR / "weather.json"
+DEDUP_INDEX_PATH = DEDUP_INDEX_DIR / "weather"
+# Raw files are named <dataset>_YYYYMMDD_HHMMSS[_<part>].<json|ndjson.gz|ndjson.zst>.
+INGESTION_TIMESTAMP_PATTERN = re.compile(r"^[a-z]+_(\d{8}_\d{6})(?:_[^.]+)?\.")
+
+# Rows sharing these keys are one record; the latest ingestion wins.
+WEATHER_DEDUP_KEYS = ["city", "event_timestamp_utc"]
 
 WEATHER_CANONICAL_COLUMNS = [
     "source_dataset",
@@ -29,15 +49,32 @@ WEATHER_CANONICAL_COLUMNS = [
     "weather_main",
     "weather_description",
 ]
+# Compact schema mode: repeated strings become categoricals, measures may be float32.
+WEATHER_CATEGORICAL_COLUMNS = [
+    "source_dataset",
+    "source_file",
+    "city",
+    "country_code",
+    "weather_main",
+    "weather_description",
+]
+WEATHER_FLOAT_COLUMNS = [
+    "temperature_c",
+    "feels_like_c",
+    "humidity_pct",
+    "pressure_hpa",
+    "cloud_cover_pct",
+    "wind_speed_mps",
+]
 
 
 def _parse_ingestion_timestamp(filepath: Path) -> datetime:
     """Parse ingestion timestamp from filename; fallback to file mtime in UTC."""
+    match = INGESTION_TIMESTAMP_PATTERN.search(filepath.name)
     try:
-        timestamp_text = filepath.stem.split("_", maxsplit=1)[1]
-        parsed = datetime.strptime(timestamp_text, "%Y%m%d_%H%M%S")
+        parsed = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S")
         return parsed.replace(tzinfo=timezone.utc)
-    except (IndexError, ValueError):
+    except (AttributeError, ValueError):
         return datetime.fromtimestamp(filepath.stat().st_mtime, tz=timezone.utc)
 
 
@@ -67,51 +104,177 @@ def _build_record(raw_json: dict[str, Any], source_file: str, ingestion_ts: date
     }
 
 
-def transform_weather_files(raw_dir: Path = RAW_DIR) -> pd.DataFrame:
-    """Transform weather raw JSON files to canonical silver schema."""
-    records: list[dict[str, Any]] = []
-    for filepath in sorted(raw_dir.glob("*.json")):
-        try:
-            with filepath.open("r") as f:
-                raw_data = json.load(f)
-            records.append(
-                _build_record(
-                    raw_json=raw_data,
-                    source_file=filepath.name,
-                    ingestion_ts=_parse_ingestion_timestamp(filepath),
-                )
-            )
-        except Exception as exc:
-            print(f"Failed to process {filepath.name}: {exc}")
+def _transform_file(filepath: Path) -> dict[str, Any] | None:
+    try:
+        return _build_record(
+            raw_json=read_raw_payload(filepath),
+            source_file=filepath.name,
+            ingestion_ts=_parse_ingestion_timestamp(filepath),
+        )
+    except Exception as exc:
+        print(f"Failed to process {filepath.name}: {exc}")
+        return None
+
 
+def transform_weather_files(
+    raw_dir: Path = RAW_DIR,
+    files: list[Path] | None = None,
+    workers: int = 1,
+    failed_files: list[Path] | None = None,
+) -> pd.DataFrame:
+    """Transform weather raw JSON/NDJSON files to canonical silver schema.
+
+    `files` restricts the run to those raw files; by default every file in
+    raw_dir is read. With `workers` > 1 files are parsed on a process pool;
+    results keep file order, so the dedup output matches the serial path.
+    Files that fail to parse are skipped and appended to `failed_files`.
+    """
+    paths = list_raw_files(raw_dir) if files is None else files
+    results = list(map_files(_transform_file, paths, workers))
+    if failed_files is not None:
+        failed_files.extend(path for path, result in zip(paths, results) if result is None)
+    records = [record for record in results if record is not None]
     if not records:
         return pd.DataFrame(columns=WEATHER_CANONICAL_COLUMNS)
 
     df = pd.DataFrame(records)[WEATHER_CANONICAL_COLUMNS]
-    df = df.sort_values("ingestion_timestamp_utc")
-    df = df.drop_duplicates(subset=["city", "event_timestamp_utc"], keep="last")
-    return df.reset_index(drop=True)
+    return dedup_latest(df, WEATHER_DEDUP_KEYS)
+
+
+def _compactor(compact_dtypes: bool, float32: bool):
+    if not (compact_dtypes or float32):
+        return None
+    return compactor(WEATHER_CATEGORICAL_COLUMNS, WEATHER_FLOAT_COLUMNS, float32=float32)
+
+
+def _dedup_index(dedup_index_dir: Path | None) -> DedupIndex | None:
+    return None if dedup_index_dir is None else DedupIndex(dedup_index_dir, WEATHER_DEDUP_KEYS)
+
 
+def save_clean_data(
+    df: pd.DataFrame,
+    output_path: Path = SILVER_DIR,
+    compact_dtypes: bool = False,
+    float32: bool = False,
+    dedup_index_dir: Path | None = None,
+):
+    """Merge silver weather records into their event_date_utc partitions.
 
-def save_clean_data(df: pd.DataFrame, output_path: Path = SILVER_DIR):
-    """Write silver weather records partitioned by event_date_utc."""
+    `compact_dtypes` writes categorical (dictionary) strings and a date32
+    event_date_utc; `float32` also narrows the measures. With
+    `dedup_index_dir`, only rows that change the stored data are merged.
+    """
     if df.empty:
         print("No valid weather records to write.")
         return
 
-    run_timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    for event_date, partition_df in df.groupby("event_date_utc", sort=True):
-        output_dir = output_path / f"dt={event_date}"
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        output_file = output_dir / f"weather_clean_{run_timestamp}.parquet"
-        partition_df.to_parquet(output_file, index=False)
+    prepare = _compactor(compact_dtypes, float32)
+    for output_file in merge_into_partitions(
+        df,
+        output_path,
+        "weather",
+        WEATHER_DEDUP_KEYS,
+        prepare=prepare,
+        dedup_index=_dedup_index(dedup_index_dir),
+    ):
         print(f"Saved cleaned weather data to {output_file}")
 
 
-def main():
-    transformed_df = transform_weather_files()
-    save_clean_data(transformed_df)
+def run_incremental(
+    raw_dir: Path = RAW_DIR,
+    output_path: Path = SILVER_DIR,
+    manifest_path: Path = MANIFEST_PATH,
+    workers: int = 1,
+    batch_files: int | None = None,
+    compact_dtypes: bool = False,
+    float32: bool = False,
+    dedup_index_dir: Path | None = DEDUP_INDEX_PATH,
+) -> list[Path]:
+    """Transform only raw files missing from the manifest and merge them into silver.
+
+    With `batch_files` the run streams: files are transformed that many at a
+    time and spilled per partition, keeping memory bounded on large backfills.
+    The manifest is saved after the partitions are written, so an interrupted
+    run reprocesses its files and the merge dedup absorbs the repeat. Files
+    that fail to parse stay out of the manifest and are retried next run.
+    `dedup_index_dir` holds the persistent key index; None merges every row.
+    Returns the files recorded as processed.
+    """
+    manifest = FileManifest.load(manifest_path)
+    new_files = manifest.pending(list_raw_files(raw_dir))
+    if not new_files:
+        print("No new weather raw files since the last run.")
+        manifest.save()
+        return []
+
+    failed_files: list[Path] = []
+    if batch_files:
+        stream_to_silver(
+            new_files,
+            lambda batch: transform_weather_files(
+                raw_dir, files=batch, workers=workers, failed_files=failed_files
+            ),
+            output_path,
+            "weather",
+            WEATHER_DEDUP_KEYS,
+            batch_files=batch_files,
+            prepare=_compactor(compact_dtypes, float32),
+            dedup_index=_dedup_index(dedup_index_dir),
+        )
+    else:
+        save_clean_data(
+            transform_weather_files(
+                raw_dir, files=new_files, workers=workers, failed_files=failed_files
+            ),
+            output_path,
+            compact_dtypes=compact_dtypes,
+            float32=float32,
+            dedup_index_dir=dedup_index_dir,
+        )
+    if failed_files:
+        print(f"{len(failed_files)} weather raw file(s) failed and will be retried next run.")
+    failed = set(failed_files)
+    processed_files = [path for path in new_files if path not in failed]
+    manifest.mark_processed(processed_files)
+    manifest.save()
+    return processed_files
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Merge new weather raw files into silver.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to parse raw files (default: 1).",
+    )
+    parser.add_argument(
+        "--batch-files",
+        type=int,
+        default=None,
+        help="Stream raw files this many at a time to bound memory (default: all at once).",
+    )
+    parser.add_argument(
+        "--compact-dtypes",
+        action="store_true",
+        help="Write categorical strings and a date32 event_date_utc.",
+    )
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help="Also store measures as float32 (implies --compact-dtypes).",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    args = build_arg_parser().parse_args(argv)
+    run_incremental(
+        workers=args.workers,
+        batch_files=args.batch_files,
+        compact_dtypes=args.compact_dtypes,
+        float32=args.float32,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from transformations.silver import clean_energy, clean_weather
+from transformations.silver.dtypes import compactor
+from transformations.silver.partitions import rewrite_partition
+
+# dataset -> (silver dir, dedup keys, categorical columns, float columns)
+DATASETS = {
+    "energy": (
+        clean_energy.SILVER_DIR,
+        clean_energy.ENERGY_DEDUP_KEYS,
+        clean_energy.ENERGY_CATEGORICAL_COLUMNS,
+        clean_energy.ENERGY_FLOAT_COLUMNS,
+    ),
+    "weather": (
+        clean_weather.SILVER_DIR,
+        clean_weather.WEATHER_DEDUP_KEYS,
+        clean_weather.WEATHER_CATEGORICAL_COLUMNS,
+        clean_weather.WEATHER_FLOAT_COLUMNS,
+    ),
+}
+
+
+def list_partitions(silver_dir: Path) -> list[Path]:
+    return sorted(path for path in silver_dir.glob("dt=*") if path.is_dir())
+
+
+def compact_dataset(
+    dataset_name: str,
+    silver_dir: Path | None = None,
+    min_files: int = 2,
+    before: str | None = None,
+    dry_run: bool = False,
+    compact_dtypes: bool = False,
+    float32: bool = False,
+) -> list[Path]:
+    """Rewrite every partition holding at least min_files parquet files as one file.
+
+    `before` (YYYY-MM-DD) limits the run to older partitions. `compact_dtypes`
+    and `float32` rewrite them with the compact schema. Returns the partitions
+    that were (or, with dry_run, would be) compacted.
+    """
+    default_dir, dedup_keys, categorical_columns, float_columns = DATASETS[dataset_name]
+    silver_dir = silver_dir or default_dir
+    prepare = None
+    if compact_dtypes or float32:
+        prepare = compactor(categorical_columns, float_columns, float32=float32)
+
+    compacted = []
+    for partition in list_partitions(silver_dir):
+        event_date = partition.name.removeprefix("dt=")
+        if before is not None and event_date >= before:
+            continue
+        file_count = len(list(partition.glob("*.parquet")))
+        # An empty partition has nothing to rewrite, whatever min_files allows.
+        if file_count == 0 or file_count < min_files:
+            continue
+        if not dry_run:
+            output_file = rewrite_partition(partition, dataset_name, dedup_keys, prepare=prepare)
+            if output_file is None:
+                continue
+            print(f"Compacted {file_count} file(s) in {partition} into {output_file.name}")
+        compacted.append(partition)
+    return compacted
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Rewrite silver dt= partitions as one deduplicated, sorted parquet file."
+    )
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("--silver-dir", type=Path, default=None)
+    parser.add_argument(
+        "--min-files",
+        type=int,
+        default=2,
+        help="Only compact partitions with at least this many files (default: 2).",
+    )
+    parser.add_argument("--before", help="Only compact partitions dated before YYYY-MM-DD.")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--compact-dtypes", action="store_true")
+    parser.add_argument("--float32", action="store_true")
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    args = build_arg_parser().parse_args(argv)
+    partitions = compact_dataset(
+        args.dataset,
+        silver_dir=args.silver_dir,
+        min_files=args.min_files,
+        before=args.before,
+        dry_run=args.dry_run,
+        compact_dtypes=args.compact_dtypes,
+        float32=args.float32,
+    )
+    action = "would compact" if args.dry_run else "compacted"
+    print(f"{args.dataset}: {action} {len(partitions)} partition(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+
+DEDUP_INDEX_DIR = Path("data/state/dedup_index")
+INGESTION_COLUMN = "ingestion_timestamp_utc"
+ROW_HASH_COLUMN = "row_hash"
+# Run metadata: a re-delivered but otherwise identical record is not a change.
+RUN_METADATA_COLUMNS = {"source_file", INGESTION_COLUMN}
+
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    value_columns = sorted(column for column in df.columns if column not in RUN_METADATA_COLUMNS)
+    return pd.util.hash_pandas_object(df[value_columns], index=False)
+
+
+class DedupIndex:
+    """Latest ingestion time and row hash per dedup key, one shard per `dt=` partition.
+
+    Each run looks up only the shards of the partitions its rows fall in, so
+    the check costs the size of the batch rather than the whole history. A
+    shard is ignored when its silver partition is missing, so deleting silver
+    output forces a rebuild even if the index is left behind.
+    """
+
+    def __init__(self, index_dir: Path, dedup_keys: list[str]):
+        self.index_dir = index_dir
+        self.dedup_keys = dedup_keys
+
+    def shard_path(self, event_date: str) -> Path:
+        return self.index_dir / f"dt={event_date}.parquet"
+
+    def load_shard(self, event_date: str, partition_dir: Path) -> pd.DataFrame:
+        shard_path = self.shard_path(event_date)
+        if not shard_path.exists() or not any(partition_dir.glob("*.parquet")):
+            return pd.DataFrame(columns=[*self.dedup_keys, INGESTION_COLUMN, ROW_HASH_COLUMN])
+        return pd.read_parquet(shard_path)
+
+    def changed_rows(self, new_rows: pd.DataFrame, shard: pd.DataFrame) -> pd.DataFrame:
+        """Rows with unseen keys, or ingested no earlier than the indexed row and different.
+
+        Older re-deliveries would lose the latest-ingestion dedup anyway, and
+        identical ones would not change the stored row.
+        """
+        if shard.empty:
+            return new_rows
+        candidates = new_rows[[*self.dedup_keys, INGESTION_COLUMN]].assign(
+            **{ROW_HASH_COLUMN: row_hashes(new_rows).to_numpy()}
+        )
+        known = candidates.merge(
+            shard, on=self.dedup_keys, how="left", suffixes=("", "_indexed"), validate="m:1"
+        )
+        indexed_at = known[f"{INGESTION_COLUMN}_indexed"]
+        unseen = indexed_at.isna().to_numpy()
+        not_older = (known[INGESTION_COLUMN] >= indexed_at).to_numpy()
+        changed = (known[ROW_HASH_COLUMN] != known[f"{ROW_HASH_COLUMN}_indexed"]).to_numpy()
+        return new_rows[unseen | (not_older & changed)]
+
+    def update_shard(self, event_date: str, shard: pd.DataFrame, changed: pd.DataFrame) -> None:
+        """Record the changed rows' keys and replace the shard atomically."""
+        entries = changed[[*self.dedup_keys, INGESTION_COLUMN]].assign(
+            **{ROW_HASH_COLUMN: row_hashes(changed).to_numpy()}
+        )
+        merged = pd.concat([shard, entries], ignore_index=True) if len(shard) else entries
+        merged = merged.drop_duplicates(subset=self.dedup_keys, keep="last")
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        shard_path = self.shard_path(event_date)
+        tmp_path = shard_path.with_name(f".{shard_path.name}.tmp")
+        merged.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, shard_path)
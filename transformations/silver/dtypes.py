@@ -0,0 +1,46 @@
+from collections.abc import Callable
+
+import pandas as pd
+import pyarrow as pa
+
+DATE_COLUMN = "event_date_utc"
+DATE_DTYPE = pd.ArrowDtype(pa.date32())
+
+
+def _to_date32(values: pd.Series) -> pd.Series:
+    if values.dtype == DATE_DTYPE:
+        return values
+    dates = pa.array(values.astype(str).to_numpy(), type=pa.string()).cast(pa.date32())
+    return pd.Series(pd.arrays.ArrowExtensionArray(dates), index=values.index, name=values.name)
+
+
+def compact_frame(
+    df: pd.DataFrame,
+    categorical_columns: list[str],
+    float_columns: list[str] = (),
+    float32: bool = False,
+) -> pd.DataFrame:
+    """Return df with repeated strings as categoricals and event_date_utc as date32.
+
+    Categoricals are written to Parquet as Arrow dictionary columns and read
+    back as categoricals. `float32` also halves the measure columns, which
+    keeps about seven significant digits.
+    """
+    compact = df.copy(deep=False)
+    for column in categorical_columns:
+        compact[column] = compact[column].astype("category")
+    if DATE_COLUMN in compact:
+        compact[DATE_COLUMN] = _to_date32(compact[DATE_COLUMN])
+    if float32:
+        for column in float_columns:
+            compact[column] = compact[column].astype("float32")
+    return compact
+
+
+def compactor(
+    categorical_columns: list[str],
+    float_columns: list[str],
+    float32: bool = False,
+) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    """Bind a dataset's columns so the writers can apply compact_frame before saving."""
+    return lambda df: compact_frame(df, categorical_columns, float_columns, float32=float32)
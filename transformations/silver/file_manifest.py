@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+MANIFEST_DIR = Path("data/state/silver_manifest")
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileManifest:
+    """Raw files a silver transform has already processed.
+
+    Each entry keeps the file's name, size, mtime and SHA-256. A file whose
+    size and mtime are unchanged is skipped without hashing; a touched file is
+    only reprocessed when its content hash changed.
+    """
+
+    def __init__(self, path: Path, entries: dict[str, dict[str, Any]] | None = None):
+        self.path = path
+        self.entries = entries or {}
+        self._hashes: dict[Path, str] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "FileManifest":
+        if not path.exists():
+            return cls(path)
+        with path.open("r") as f:
+            return cls(path, json.load(f))
+
+    def _hash(self, path: Path) -> str:
+        if path not in self._hashes:
+            self._hashes[path] = file_sha256(path)
+        return self._hashes[path]
+
+    def pending(self, files: list[Path]) -> list[Path]:
+        """Files that are new or whose content changed since they were processed."""
+        pending_files = []
+        for path in files:
+            entry = self.entries.get(path.name)
+            stat = path.stat()
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                continue
+            if entry and entry["sha256"] == self._hash(path):
+                # Same bytes under a new mtime (copied or touched): refresh the stat only.
+                self.mark_processed([path])
+                continue
+            pending_files.append(path)
+        return pending_files
+
+    def mark_processed(self, files: list[Path]) -> None:
+        processed_at = datetime.now(timezone.utc).isoformat()
+        for path in files:
+            stat = path.stat()
+            self.entries[path.name] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": self._hash(path),
+                "processed_at_utc": processed_at,
+            }
+
+    def save(self) -> None:
+        """Replace the manifest atomically so an interrupted run keeps the old one."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with tmp_path.open("w") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,25 @@
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def map_files(func: Callable[[Path], T], paths: list[Path], workers: int = 1) -> Iterable[T]:
+    """Apply func to each raw file, on a process pool when workers > 1.
+
+    Results come back in input order whatever the worker count, so callers
+    can rely on file order for "latest ingestion wins" dedup.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+    if workers == 1 or len(paths) < 2:
+        return map(func, paths)
+
+    workers = min(workers, len(paths), os.cpu_count() or 1)
+    # Batch small files so pickling overhead does not dominate the parse.
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, paths, chunksize=chunksize))
@@ -0,0 +1,103 @@
+import os
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from transformations.silver.dedup_index import DedupIndex
+
+PARTITION_COLUMN = "event_date_utc"
+
+
+def partition_dir(output_path: Path, event_date: str) -> Path:
+    return output_path / f"dt={event_date}"
+
+
+def dedup_latest(df: pd.DataFrame, dedup_keys: list[str]) -> pd.DataFrame:
+    """Keep the most recently ingested row per key; later rows win ties."""
+    df = df.sort_values("ingestion_timestamp_utc", kind="mergesort")
+    return df.drop_duplicates(subset=dedup_keys, keep="last").reset_index(drop=True)
+
+
+def partition_sort_columns(dedup_keys: list[str]) -> list[str]:
+    """Compacted files are ordered by event time, then by the rest of the dedup key."""
+    return ["event_timestamp_utc", *(key for key in dedup_keys if key != "event_timestamp_utc")]
+
+
+def rewrite_partition(
+    output_dir: Path,
+    dataset_name: str,
+    dedup_keys: list[str],
+    new_rows: pd.DataFrame | None = None,
+    prepare: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+) -> Path | None:
+    """Rewrite a `dt=` directory as one deduplicated, sorted parquet file.
+
+    Stored files and any new rows are deduplicated together, so a re-ingested
+    record replaces the stored one. The new file is written under a hidden
+    temporary name and renamed into place before the files it supersedes are
+    removed; readers that dedup on read never see a record go missing.
+    `prepare` may reshape the merged frame (e.g. compact dtypes) before writing.
+    """
+    existing_files = sorted(output_dir.glob("*.parquet"))
+    frames = [pd.read_parquet(path) for path in existing_files]
+    if new_rows is not None:
+        frames.append(new_rows)
+    if not frames:
+        return None
+
+    merged = pd.concat(frames, ignore_index=True)
+    if PARTITION_COLUMN in merged:
+        # Constant within a partition; resetting it keeps files written as string
+        # and as date32 (compact mode) mergeable.
+        merged[PARTITION_COLUMN] = output_dir.name.removeprefix("dt=")
+    merged = dedup_latest(merged, dedup_keys)
+    merged = merged.sort_values(partition_sort_columns(dedup_keys), kind="mergesort")
+    if prepare is not None:
+        merged = prepare(merged)
+
+    run_timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / f"{dataset_name}_clean_{run_timestamp}.parquet"
+    tmp_file = output_dir / f".{output_file.name}.tmp"
+    merged.to_parquet(tmp_file, index=False)
+    os.replace(tmp_file, output_file)
+    for path in existing_files:
+        if path != output_file:
+            path.unlink()
+    return output_file
+
+
+def merge_into_partitions(
+    df: pd.DataFrame,
+    output_path: Path,
+    dataset_name: str,
+    dedup_keys: list[str],
+    prepare: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+    dedup_index: DedupIndex | None = None,
+) -> list[Path]:
+    """Merge new rows into their `dt=` partitions, leaving one file per touched partition.
+
+    With a `dedup_index`, rows that would not change what is stored are
+    dropped first, and partitions left with no changes are not rewritten.
+    """
+    written_files = []
+    for event_date, new_rows in df.groupby(PARTITION_COLUMN, sort=True):
+        output_dir = partition_dir(output_path, event_date)
+        if dedup_index is None:
+            written_files.append(
+                rewrite_partition(output_dir, dataset_name, dedup_keys, new_rows, prepare)
+            )
+            continue
+
+        shard = dedup_index.load_shard(event_date, output_dir)
+        new_rows = dedup_index.changed_rows(new_rows, shard)
+        if new_rows.empty:
+            continue
+        written_files.append(
+            rewrite_partition(output_dir, dataset_name, dedup_keys, new_rows, prepare)
+        )
+        # After the partition is in place: a crash in between only repeats the rewrite.
+        dedup_index.update_shard(event_date, shard, new_rows)
+    return written_files
@@ -0,0 +1,121 @@
+from collections import Counter
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from transformations.silver.compaction import DATASETS
+from transformations.silver.dtypes import compact_frame
+from transformations.silver.partitions import PARTITION_COLUMN, dedup_latest
+
+PARTITION_FIELD = "dt"
+PARTITIONING = ds.partitioning(pa.schema([(PARTITION_FIELD, pa.string())]), flavor="hive")
+
+
+def _plain_type(field: pa.Field) -> pa.DataType:
+    if pa.types.is_dictionary(field.type):
+        return field.type.value_type
+    if field.name == PARTITION_COLUMN and pa.types.is_date(field.type):
+        return pa.string()
+    if pa.types.is_float32(field.type):
+        return pa.float64()
+    return field.type
+
+
+def _plain_schema(schema: pa.Schema) -> pa.Schema:
+    """Default silver types, so compact and plain partitions read back alike."""
+    return pa.schema([field.with_type(_plain_type(field)) for field in schema])
+
+
+def silver_dataset(silver_dir: Path) -> ds.Dataset:
+    """All silver parquet files under silver_dir, with `dt=` as a hive partition field.
+
+    Hidden in-flight files (".name.tmp") are ignored.
+    """
+    discovered = ds.dataset(silver_dir, format="parquet", partitioning=PARTITIONING)
+    return ds.dataset(
+        silver_dir,
+        format="parquet",
+        partitioning=PARTITIONING,
+        schema=_plain_schema(discovered.schema),
+    )
+
+
+def _as_expression(filters) -> ds.Expression | None:
+    if filters is None or isinstance(filters, ds.Expression):
+        return filters
+    return pq.filters_to_expression(filters)
+
+
+def _and(left: ds.Expression | None, right: ds.Expression | None) -> ds.Expression | None:
+    if left is None or right is None:
+        return right if left is None else left
+    return left & right
+
+
+def _date_filter(start: str | date | None, end: str | date | None) -> ds.Expression | None:
+    expression = None
+    if start is not None:
+        expression = ds.field(PARTITION_FIELD) >= str(start)
+    if end is not None:
+        expression = _and(expression, ds.field(PARTITION_FIELD) <= str(end))
+    return expression
+
+
+def read_silver(
+    dataset_name: str,
+    start: str | date | None = None,
+    end: str | date | None = None,
+    columns: list[str] | None = None,
+    filters=None,
+    silver_dir: Path | None = None,
+    as_arrow: bool = False,
+    compact_dtypes: bool = False,
+) -> pd.DataFrame | pa.Table:
+    """Read silver rows with event dates from start to end (inclusive, YYYY-MM-DD).
+
+    Partitions outside the range are never opened, and `filters` (a pyarrow
+    expression or DNF tuples as for `pd.read_parquet`) prune row groups by
+    their statistics. Only `columns` are returned. Partitions still holding
+    several run files are deduplicated on read, latest ingestion winning;
+    `filters` then apply after dedup so a superseded row cannot resurface.
+    """
+    default_dir, dedup_keys, categorical_columns, float_columns = DATASETS[dataset_name]
+    silver_dir = silver_dir or default_dir
+    if not silver_dir.exists():
+        raise FileNotFoundError(f"No silver data found for {dataset_name} in {silver_dir}.")
+    dataset = silver_dataset(silver_dir)
+
+    date_filter = _date_filter(start, end)
+    row_filter = _as_expression(filters)
+
+    # Merge-on-write leaves one file per partition; only older layouts need dedup.
+    fragment_partitions = Counter(
+        Path(fragment.path).parent.name for fragment in dataset.get_fragments(filter=date_filter)
+    )
+    needs_dedup = any(count > 1 for count in fragment_partitions.values())
+
+    output_columns = columns or [name for name in dataset.schema.names if name != PARTITION_FIELD]
+    if needs_dedup:
+        # Filter columns may be outside `columns`, so dedup reads whole rows.
+        table = dataset.to_table(filter=date_filter)
+        deduped = dedup_latest(table.to_pandas(), dedup_keys)
+        table = pa.Table.from_pandas(deduped, schema=table.schema, preserve_index=False)
+        if row_filter is not None:
+            table = table.filter(row_filter)
+        table = table.select(output_columns)
+    else:
+        table = dataset.to_table(columns=output_columns, filter=_and(date_filter, row_filter))
+
+    if not compact_dtypes:
+        return table if as_arrow else table.to_pandas()
+
+    df = compact_frame(
+        table.to_pandas(),
+        [column for column in categorical_columns if column in table.column_names],
+        [column for column in float_columns if column in table.column_names],
+    )
+    return pa.Table.from_pandas(df, preserve_index=False) if as_arrow else df
@@ -0,0 +1,119 @@
+import tempfile
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from transformations.silver.dedup_index import DedupIndex
+from transformations.silver.partitions import PARTITION_COLUMN, merge_into_partitions
+
+DEFAULT_BATCH_FILES = 200
+DEFAULT_MAX_BUFFERED_ROWS = 500_000
+
+
+def iter_partition_batches(
+    files: list[Path],
+    transform: Callable[[list[Path]], pd.DataFrame],
+    batch_files: int = DEFAULT_BATCH_FILES,
+) -> Iterator[tuple[str, pa.RecordBatch]]:
+    """Transform files batch_files at a time and yield one record batch per partition.
+
+    Only one batch of files is held in memory at a time.
+    """
+    if batch_files < 1:
+        raise ValueError("batch_files must be at least 1.")
+    for start in range(0, len(files), batch_files):
+        df = transform(files[start : start + batch_files])
+        if df.empty:
+            continue
+        for event_date, partition_df in df.groupby(PARTITION_COLUMN, sort=True):
+            yield event_date, pa.RecordBatch.from_pandas(partition_df, preserve_index=False)
+
+
+class PartitionSpool:
+    """Collect record batches per partition, spilling to Arrow IPC files past a row budget.
+
+    Batches come back in arrival order, spilled ones first, so "latest
+    ingestion wins" dedup sees rows in the same order as an in-memory run.
+    """
+
+    def __init__(self, spill_dir: Path, max_buffered_rows: int = DEFAULT_MAX_BUFFERED_ROWS):
+        self.spill_dir = spill_dir
+        self.max_buffered_rows = max_buffered_rows
+        self._buffered: dict[str, list[pa.RecordBatch]] = defaultdict(list)
+        self._buffered_rows = 0
+        self._spilled: dict[str, list[Path]] = defaultdict(list)
+        self._spill_count = 0
+
+    @property
+    def partitions(self) -> list[str]:
+        return sorted(set(self._buffered) | set(self._spilled))
+
+    def add(self, event_date: str, batch: pa.RecordBatch) -> None:
+        self._buffered[event_date].append(batch)
+        self._buffered_rows += batch.num_rows
+        if self._buffered_rows > self.max_buffered_rows:
+            self.spill()
+
+    def spill(self) -> None:
+        # One IPC file per batch: batches from different files may infer different types.
+        for event_date, batches in self._buffered.items():
+            for batch in batches:
+                self._spill_count += 1
+                spill_path = self.spill_dir / f"{self._spill_count:08d}.arrow"
+                with ipc.new_file(str(spill_path), batch.schema) as writer:
+                    writer.write_batch(batch)
+                self._spilled[event_date].append(spill_path)
+        self._buffered.clear()
+        self._buffered_rows = 0
+
+    def read_partition(self, event_date: str) -> pd.DataFrame:
+        """Load one partition's rows and release its buffer and spill files."""
+        frames = []
+        for spill_path in self._spilled.pop(event_date, []):
+            with ipc.open_file(str(spill_path)) as reader:
+                frames.append(reader.read_all().to_pandas())
+            spill_path.unlink()
+        frames.extend(batch.to_pandas() for batch in self._buffered.pop(event_date, []))
+        return pd.concat(frames, ignore_index=True)
+
+
+def stream_to_silver(
+    files: list[Path],
+    transform: Callable[[list[Path]], pd.DataFrame],
+    output_path: Path,
+    dataset_name: str,
+    dedup_keys: list[str],
+    batch_files: int = DEFAULT_BATCH_FILES,
+    max_buffered_rows: int = DEFAULT_MAX_BUFFERED_ROWS,
+    spill_dir: Path | None = None,
+    prepare: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+    dedup_index: DedupIndex | None = None,
+) -> list[Path]:
+    """Transform files in batches and merge them into silver one partition at a time.
+
+    Peak memory is bounded by one batch of files, the spool's row budget, and
+    the largest single partition rather than by the whole of bronze.
+    """
+    written_files = []
+    with tempfile.TemporaryDirectory(prefix=f"{dataset_name}_spill_", dir=spill_dir) as tmp:
+        spool = PartitionSpool(Path(tmp), max_buffered_rows)
+        for event_date, batch in iter_partition_batches(files, transform, batch_files):
+            spool.add(event_date, batch)
+
+        # merge_into_partitions deduplicates each partition against what is stored.
+        for event_date in spool.partitions:
+            written_files.extend(
+                merge_into_partitions(
+                    spool.read_partition(event_date),
+                    output_path,
+                    dataset_name,
+                    dedup_keys,
+                    prepare=prepare,
+                    dedup_index=dedup_index,
+                )
+            )
+    return written_files